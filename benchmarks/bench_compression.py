@@ -0,0 +1,81 @@
+""" Benchmark bytes transferred vs. CPU time per compression codec
+
+Saves and loads a DataFrame shaped like our daily listing/property extracts
+(ids, dates, categorical strings, prices and occupancy floats) as CSV and
+pickle with each codec of io.save_object/io.load_object. Files are written to
+a temporary local directory so the timings are the CPU cost of serializing
+and (de)compressing; the bytes column is what would cross the network to S3:
+
+    $ python benchmarks/bench_compression.py
+
+"zstd" and "lz4" are skipped unless the zstandard/lz4 packages are installed.
+"""
+import os
+import time
+import tempfile
+import importlib
+
+import numpy as np
+import pandas as pd
+
+from dna_util import io
+
+NUM_ROWS = 500000
+# (codec, level) pairs. A level of None uses the codec's default
+CODECS = [
+    (None, None),
+    ("gzip", 1), ("gzip", None),
+    ("bz2", None),
+    ("zstd", 1), ("zstd", None), ("zstd", 9),
+    ("lz4", None),
+]
+PACKAGES = {"zstd": "zstandard", "lz4": "lz4.frame"}
+
+
+def sample_frame(num_rows: int) -> pd.DataFrame:
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({
+        "property_id": rng.randint(1, 10 ** 7, num_rows),
+        "date": pd.date_range("2026-01-01", periods=365).strftime("%Y-%m-%d")[rng.randint(0, 365, num_rows)],
+        "market": rng.choice(["austin", "denver", "miami", "nashville", "san-diego"], num_rows),
+        "room_type": rng.choice(["entire_place", "private_room", "shared_room"], num_rows),
+        "price": rng.gamma(2.0, 90.0, num_rows).round(2),
+        "occupancy": rng.uniform(0, 1, num_rows),
+        "reviews": rng.poisson(20, num_rows),
+    })
+
+
+def timed(fun, *args, **kwargs):
+    start = time.process_time()
+    result = fun(*args, **kwargs)
+    return result, time.process_time() - start
+
+
+def main():
+    df = sample_frame(NUM_ROWS)
+
+    print(f"{'format':<8}{'codec':<10}{'level':>6}{'bytes':>14}{'ratio':>8}{'save cpu':>11}{'load cpu':>11}")
+    with tempfile.TemporaryDirectory() as root:
+        for file_type, extension, kwargs in (("csv", "csv", {"index": False}), ("pickle", "pkl", {})):
+            raw_size = None
+            for codec, level in CODECS:
+                if codec in PACKAGES:
+                    try:
+                        importlib.import_module(PACKAGES[codec])
+                    except ImportError:
+                        continue
+
+                path = os.path.join(root, f"data.{extension}")
+                compression = {"method": codec, "level": level} if codec else None
+                _, save_seconds = timed(io.save_object, df, path, file_type=file_type,
+                                        compression=compression, **kwargs)
+                _, load_seconds = timed(io.load_object, path, file_type=file_type, compression=compression)
+
+                size = os.path.getsize(path)
+                raw_size = raw_size or size
+                print(f"{file_type:<8}{codec or 'none':<10}{level if level is not None else '-':>6}"
+                      f"{size:>14,}{raw_size / size:>8.1f}{save_seconds:>10.2f}s{load_seconds:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+""" Benchmark the per-call latency saved by the shared S3FileSystem registry
+
+Compares repeated io.load_object/io.already_exists calls that build a new
+S3FileSystem every time against calls that reuse the registry's instance.
+Runs against an in-process moto S3 stand-in:
+
+    $ python benchmarks/bench_fs_registry.py
+"""
+import time
+import pickle
+
+import boto3
+import moto
+import s3fs
+
+from dna_util import io
+import dna_util.io._s3 as s3
+
+BUCKET = "bench-bucket"
+NUM_CALLS = 200
+
+
+def timed(fun, n=NUM_CALLS):
+    start = time.perf_counter()
+    for _ in range(n):
+        fun()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    with moto.mock_s3():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        client.put_object(Bucket=BUCKET, Key="obj.pkl", Body=pickle.dumps({"foo": "bar"}))
+        path = f"s3://{BUCKET}/obj.pkl"
+
+        results = {
+            "already_exists (new fs per call)": timed(lambda: io.already_exists(path, fs=s3fs.S3FileSystem())),
+            "already_exists (shared fs)": timed(lambda: io.already_exists(path)),
+            "load_object (new fs per call)": timed(lambda: io.load_object(path, fs=s3fs.S3FileSystem())),
+            "load_object (shared fs)": timed(lambda: io.load_object(path)),
+        }
+        s3.clear_fs_registry()
+
+    for name, ms in results.items():
+        print(f"{name:<40} {ms:8.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+""" Benchmark the "jsonl" file type per JSON backend
+
+Saves and loads newline-delimited JSON records shaped like our event dumps
+with each installed backend (orjson, ujson and the standard library's json),
+as a list of records and as DataFrame chunks. Files are written to a
+temporary local directory so the timings are the CPU cost of parsing and
+writing:
+
+    $ python benchmarks/bench_jsonl.py
+"""
+import os
+import time
+import random
+import tempfile
+import importlib
+
+from dna_util import io
+import dna_util.io._json as json_backend
+
+NUM_RECORDS = 500000
+CHUNKSIZE = 100000
+
+
+def sample_records(num_records: int):
+    rng = random.Random(0)
+    events = ["search", "view", "save", "book", "cancel"]
+    return [
+        {
+            "event_id": i,
+            "event": rng.choice(events),
+            "property_id": rng.randrange(10 ** 7),
+            "ts": f"2026-10-{rng.randint(1, 31):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+            "price": round(rng.gammavariate(2.0, 90.0), 2),
+            "filters": {"guests": rng.randint(1, 8), "pets": rng.random() < 0.2},
+            "tags": rng.sample(["pool", "wifi", "parking", "beach", "pets"], rng.randint(0, 3)),
+        }
+        for i in range(num_records)
+    ]
+
+
+def timed(fun, *args, **kwargs):
+    start = time.perf_counter()
+    result = fun(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    records = sample_records(NUM_RECORDS)
+
+    print(f"{'backend':<8}{'save':>9}{'load':>9}{'frames':>9}{'records/s (load)':>18}")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "events.jsonl")
+        for backend in json_backend.BACKENDS:
+            try:
+                importlib.import_module(backend)
+            except ImportError:
+                continue
+            json_backend.set_backend(backend)
+
+            _, save_seconds = timed(io.save_object, records, path)
+            loaded, load_seconds = timed(io.load_object, path)
+            assert loaded == records
+            _, frame_seconds = timed(lambda: sum(len(frame) for frame in io.load_object(path, chunksize=CHUNKSIZE)))
+
+            print(f"{backend:<8}{save_seconds:>8.2f}s{load_seconds:>8.2f}s{frame_seconds:>8.2f}s"
+                  f"{NUM_RECORDS / load_seconds:>18,.0f}")
+        json_backend.set_backend()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+""" Benchmark s3 -> s3 io.cp throughput for large objects
+
+Compares a single CopyObject request against io.cp's server-side
+UploadPartCopy copies with different part sizes, as used when promoting large
+model artifacts between buckets.
+
+Set DNA_UTIL_BENCH_BUCKET to run against a real bucket you can write to
+(objects are written under a "dna_util_bench/" prefix and removed afterwards):
+
+    $ DNA_UTIL_BENCH_BUCKET=my-scratch-bucket python benchmarks/bench_multipart_copy.py
+
+Otherwise an in-process moto S3 stand-in is used. moto reads stored objects
+through a shared file handle that is not safe for concurrent range reads above
+16MB, so the stand-in run is limited to a small object and mostly exercises
+the code path rather than measuring throughput.
+"""
+import os
+import time
+import contextlib
+
+import boto3
+import moto
+
+from dna_util import io
+import dna_util.io._s3 as s3
+
+BUCKET = os.environ.get("DNA_UTIL_BENCH_BUCKET")
+OBJECT_SIZE = 2 * 2 ** 30 if BUCKET else 15 * 2 ** 20
+PART_SIZES = (64 * 2 ** 20, 256 * 2 ** 20) if BUCKET else (5 * 2 ** 20,)
+
+
+def timed(fun, *args, **kwargs):
+    start = time.perf_counter()
+    fun(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    mb = OBJECT_SIZE / 2 ** 20
+
+    with contextlib.ExitStack() as stack:
+        if BUCKET:
+            bucket = BUCKET
+            client = boto3.client("s3")
+        else:
+            stack.enter_context(moto.mock_s3())
+            bucket = "bench-bucket"
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket=bucket)
+
+        prefix = "dna_util_bench"
+        io.save_object(os.urandom(OBJECT_SIZE), f"s3://{bucket}/{prefix}/staging/model.pkl",
+                       file_type="raw")
+
+        from_path = f"s3://{bucket}/{prefix}/staging/model.pkl"
+        to_path = f"s3://{bucket}/{prefix}/production/model.pkl"
+
+        results = {}
+        if OBJECT_SIZE <= 5 * 2 ** 30:
+            results["single CopyObject"] = timed(
+                client.copy_object, Bucket=bucket, Key=f"{prefix}/production/model.pkl",
+                CopySource={"Bucket": bucket, "Key": f"{prefix}/staging/model.pkl"}
+            )
+        for part_size in PART_SIZES:
+            results[f"UploadPartCopy, {part_size // 2 ** 20}MB parts"] = timed(
+                io.cp, from_path, to_path, part_size=part_size, multipart_threshold=part_size
+            )
+
+        io.rm(f"s3://{bucket}/{prefix}")
+        s3.clear_fs_registry()
+
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds:6.2f}s {mb / seconds:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+""" Benchmark io.save_object throughput for large payloads
+
+Compares a single-stream write (multipart disabled) against concurrent
+multipart uploads with different numbers of workers. Runs against an
+in-process moto S3 stand-in, so absolute numbers understate real S3 gains
+where each part is bound by network latency rather than local CPU:
+
+    $ python benchmarks/bench_multipart_upload.py
+"""
+import os
+import time
+
+import boto3
+import moto
+
+from dna_util import io
+import dna_util.io._s3 as s3
+
+BUCKET = "bench-bucket"
+PAYLOAD_SIZE = 256 * 2 ** 20
+PART_SIZE = 16 * 2 ** 20
+
+
+def timed_save(obj, path, **kwargs):
+    start = time.perf_counter()
+    io.save_object(obj, path, file_type="raw", **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    obj = os.urandom(PAYLOAD_SIZE)
+    mb = PAYLOAD_SIZE / 2 ** 20
+
+    with moto.mock_s3():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        path = f"s3://{BUCKET}/payload.bin"
+
+        results = {"single stream": timed_save(obj, path, multipart_threshold=PAYLOAD_SIZE + 1)}
+        for num_threads in (1, 4, 10, 20):
+            results[f"multipart, {num_threads} worker(s)"] = timed_save(
+                obj, path, part_size=PART_SIZE, multipart_threshold=PART_SIZE,
+                num_threads=num_threads
+            )
+        s3.clear_fs_registry()
+
+    for name, seconds in results.items():
+        print(f"{name:<30} {seconds:6.2f}s {mb / seconds:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
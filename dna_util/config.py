@@ -34,7 +34,7 @@ def parse_config(path: Optional[str] = None,
     # Attempt to default to a config file
     if path is None:
         possible_paths = ["~/.dna_util_config.yaml", "~/.dna_util_config.yml"]
-        possible_paths = list(filter(io.already_exists, possible_paths))
+        possible_paths = [p for p, exists in io.exists_many(possible_paths).items() if exists]
 
         if possible_paths:
             path = possible_paths[0]
@@ -1,10 +1,22 @@
 """
 io module deals with abstracting IO operations between local and s3 file systems
 """
-from ._io import cp, ls, rm, already_exists, load_object, save_object, get_size
+from ._io import cp, cp_many, ls, rm, already_exists, exists_many, load_object, save_object, load_many, save_many, get_size, du, iter_object, iter_lines, iter_records
 from ._s3 import is_s3path
+from ._sync import sync
+from ._metadata import enable_metadata_cache, disable_metadata_cache, metadata_cache_stats
+from ._disk_cache import enable_disk_cache, disable_disk_cache, disk_cache_stats
+from ._retry import RetryPolicy, set_retry_policy, retry_stats
+from ._metrics import enable_metrics, disable_metrics, MetricsSink, MemorySink, PrometheusSink, LoggingSink
+from ._object_cache import set_object_cache_size, clear_object_cache, object_cache_stats
 
-__all__ = ["cp", "ls", "rm", "already_exists", "load_object", "save_object", "is_s3path", "get_size"]
+__all__ = ["cp", "cp_many", "ls", "rm", "already_exists", "exists_many", "load_object", "save_object", "load_many", "save_many", "is_s3path", "get_size", "du", "sync",
+           "iter_object", "iter_lines", "iter_records",
+           "enable_metadata_cache", "disable_metadata_cache", "metadata_cache_stats",
+           "enable_disk_cache", "disable_disk_cache", "disk_cache_stats",
+           "RetryPolicy", "set_retry_policy", "retry_stats",
+           "enable_metrics", "disable_metrics", "MetricsSink", "MemorySink", "PrometheusSink", "LoggingSink",
+           "set_object_cache_size", "clear_object_cache", "object_cache_stats"]
 
 # # Load mlflow submodule if mlflow is installed
 try:
@@ -12,3 +24,10 @@ try:
     __all__.append("mlflow")
 except ModuleNotFoundError:
     pass
+
+# Load aio submodule if aiobotocore is installed
+try:
+    from . import aio
+    __all__.append("aio")
+except ModuleNotFoundError:
+    pass
@@ -0,0 +1,143 @@
+""" Streaming compression codecs for load_object and save_object
+
+A compression suffix on top of the format suffix (e.g. "features.csv.gz" or
+"model.pkl.zst") selects the codec. "gzip" and "bz2" use the standard
+library, "zstd" requires the zstandard package and "lz4" the lz4 package.
+"""
+import bz2
+import gzip
+import zlib
+import importlib
+import logging
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Compression suffix -> codec
+SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+    ".lz4": "lz4",
+}
+CODECS = ("gzip", "bz2", "zstd", "lz4")
+# Levels used when none is given, the defaults of each library
+DEFAULT_LEVELS = {"gzip": 6, "bz2": 9, "zstd": 3, "lz4": 0}
+# Packages the codecs not in the standard library need
+_PACKAGES = {"zstd": "zstandard", "lz4": "lz4.frame"}
+
+
+def split_suffix(path: str) -> Tuple[str, Optional[str]]:
+    """ Split a compression suffix off path
+
+    Returns
+    --------
+    Tuple[str, Optional[str]]
+        path without the suffix and the codec it names, or path and None
+    """
+    for suffix, codec in SUFFIXES.items():
+        if path.endswith(suffix):
+            return path[:-len(suffix)], codec
+    return path, None
+
+
+def resolve(path: str, compression: Union[str, Dict[str, Any], None]) -> Tuple[Optional[str], Optional[int]]:
+    """ Return the (codec, level) selected by the compression argument of
+        load_object/save_object for path
+
+    compression is "infer" (use the codec named by path's suffix, if any),
+    None (no compression), a codec name, or a dict with a "method" codec name
+    and optionally a "level". A ValueError is raised for unknown codecs
+    """
+    if compression == "infer":
+        return split_suffix(path)[1], None
+    if compression is None:
+        return None, None
+
+    if isinstance(compression, dict):
+        codec, level = compression.get("method"), compression.get("level")
+    else:
+        codec, level = compression, None
+
+    if codec not in CODECS:
+        raise ValueError(f"Compression {codec!r} is not supported. Supported options are {list(CODECS)!r}")
+    return codec, level
+
+
+def _import(codec: str):
+    try:
+        return importlib.import_module(_PACKAGES[codec])
+    except ImportError:
+        raise ImportError(f"The {_PACKAGES[codec].split('.')[0]!r} package is required for {codec!r} compression")
+
+
+def open_reader(f: BinaryIO, codec: str) -> BinaryIO:
+    """ Wrap an open binary file in a reader decompressing it as it is read
+
+    The underlying file is not closed with the reader
+    """
+    logger.debug(f"Decompressing {f!r} with {codec!r}")
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if codec == "bz2":
+        return bz2.BZ2File(f, mode="rb")
+    if codec == "zstd":
+        zstd = _import(codec)
+        return zstd.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=False)
+    if codec == "lz4":
+        return _import(codec).LZ4FrameFile(f, mode="rb")
+    raise ValueError(f"Compression {codec!r} is not supported. Supported options are {list(CODECS)!r}")
+
+
+class _LZ4Compressor(object):
+    """ lz4.frame.LZ4FrameCompressor with the compress/flush interface of
+        the other compressors
+    """
+    def __init__(self, level: int):
+        self._compressor = _import("lz4").LZ4FrameCompressor(compression_level=level)
+        self._started = False
+
+    def compress(self, data) -> bytes:
+        header = b""
+        if not self._started:
+            header = self._compressor.begin()
+            self._started = True
+        return header + self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compress(b"") + self._compressor.flush()
+
+
+def _compressor(codec: str, level: Optional[int]):
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    if codec == "gzip":
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if codec == "bz2":
+        return bz2.BZ2Compressor(level)
+    if codec == "zstd":
+        return _import(codec).ZstdCompressor(level=level).compressobj()
+    if codec == "lz4":
+        return _LZ4Compressor(level)
+    raise ValueError(f"Compression {codec!r} is not supported. Supported options are {list(CODECS)!r}")
+
+
+def compress_chunks(chunks: Iterable[Union[bytes, bytearray, memoryview]], codec: str,
+                    level: Optional[int] = None) -> Iterator[bytes]:
+    """ Compress a stream of chunks, yielding compressed chunks as the
+        compressor produces them
+    """
+    compressor = _compressor(codec, level)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    data = compressor.flush()
+    if data:
+        yield data
+
+
+def compress(data: Union[bytes, bytearray, memoryview], codec: str, level: Optional[int] = None) -> bytes:
+    """ Compress data held in memory
+    """
+    return b"".join(compress_chunks([data], codec, level))
@@ -0,0 +1,373 @@
+""" Opt-in read-through local disk cache for S3 objects """
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from urllib.parse import quote
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import s3fs
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dna_util", "s3")
+DEFAULT_MAX_BYTES = 10 * 2 ** 30
+# Temporary download files older than this are assumed to be left behind by a
+# crashed process and are removed during eviction
+_STALE_TMP_SECONDS = 3600
+_READ_SIZE = 2 ** 20
+# Longer path segments are hashed to fit in a file name
+_MAX_SEGMENT_LENGTH = 200
+
+
+class DiskCache(object):
+    """ Read-through cache of S3 objects on local disk
+
+    Objects are stored under a hash of their bucket, key and ETag, so a
+    changed object is never served from the cache. The ETag of a key is
+    revalidated with a HEAD request, or trusted for ttl seconds after it was
+    last validated. Once the cache holds more than max_bytes, the least
+    recently used objects are evicted.
+
+    Several processes can share a directory: objects are downloaded to a
+    temporary file and atomically renamed into place, and an evicted object
+    stays readable by anyone who already opened it. The size of the cache is
+    tracked in memory from a scan at startup and only rescanned once it
+    exceeds max_bytes, so objects added by other processes are counted at the
+    next eviction.
+
+    Parameters
+    -----------
+    directory : str (default DEFAULT_CACHE_DIR)
+        Directory the cached objects are stored in
+
+    max_bytes : int (default DEFAULT_MAX_BYTES)
+        Total size of the cached objects to evict down to
+
+    ttl : float (default None)
+        Number of seconds a validated ETag is trusted without a HEAD request.
+        If None, every read is revalidated
+    """
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = None):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes_hit = 0
+        self.bytes_downloaded = 0
+        self.evictions = 0
+        self._objects_dir = os.path.join(self.directory, "objects")
+        self._refs_dir = os.path.join(self.directory, "refs")
+        self._lock = threading.Lock()
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._refs_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    def open(self, path: str, fs: s3fs.S3FileSystem, etag: Optional[str] = None,
+             size: Optional[int] = None) -> BinaryIO:
+        """ Return the cached copy of an S3 object opened for reading,
+            downloading it first on a miss
+
+        Parameters
+        -----------
+        path : str
+            Normalized s3 path ("bucket/key")
+
+        fs : s3fs.S3FileSystem
+            The filesystem whose client is used for the requests
+
+        etag, size : str, int
+            The object's current ETag and size if already known (e.g. from a
+            listing), which skips revalidation
+
+        Returns
+        --------
+        BinaryIO
+        """
+        bucket, key = path.split("/", 1)
+
+        if etag is None:
+            etag, size = self._current_etag(path, fs)
+
+        object_path = self._object_path(bucket, key, etag)
+        try:
+            f = open(object_path, "rb")
+        except FileNotFoundError:
+            pass
+        else:
+            # Mark as recently used for eviction. Best effort: another process
+            # may have evicted it since it was opened, which leaves f readable
+            try:
+                os.utime(object_path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self.hits += 1
+                self.bytes_hit += os.fstat(f.fileno()).st_size
+            logger.debug(f"Disk cache hit for 's3://{path}'")
+            return f
+
+        with self._lock:
+            self.misses += 1
+        logger.debug(f"Disk cache miss for 's3://{path}', downloading {size} bytes")
+        num_bytes = self._download(bucket, key, etag, fs, object_path)
+        with self._lock:
+            self.bytes_downloaded += num_bytes
+            self._total_bytes += num_bytes
+
+        # Open before evicting so the new object can't be evicted from under us
+        f = open(object_path, "rb")
+        self._evict()
+        return f
+
+    def copy(self, path: str, to_path: str, fs: s3fs.S3FileSystem,
+             etag: Optional[str] = None, size: Optional[int] = None) -> None:
+        """ Copy an S3 object to a local file through the cache. See open
+        """
+        with self.open(path, fs, etag, size) as f, open(to_path, "wb") as out:
+            shutil.copyfileobj(f, out, _READ_SIZE)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """ Forget the validated ETags of path and anything underneath it
+
+        Only matters when a ttl is set; cached objects themselves are keyed by
+        ETag and never go stale
+        """
+        if self.ttl is None:
+            return
+        if path is None:
+            shutil.rmtree(self._refs_dir, ignore_errors=True)
+            os.makedirs(self._refs_dir, exist_ok=True)
+            return
+        # The refs of the keys under path are stored in the directory named after it
+        ref_path = self._ref_path(path.rstrip("/"))
+        _remove(ref_path)
+        shutil.rmtree(ref_path[:-len(".json")], ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        entries, total_bytes = 0, 0
+        for _, _, size in self._scan():
+            entries += 1
+            total_bytes += size
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_hit": self.bytes_hit,
+                "bytes_downloaded": self.bytes_downloaded,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": total_bytes,
+            }
+
+    def _ref_path(self, path: str) -> str:
+        """ Path of the file holding the validated ETag of an s3 path. Refs
+            mirror the bucket/key hierarchy so a prefix is invalidated by
+            removing one directory
+        """
+        return os.path.join(self._refs_dir, *(_segment_name(part) for part in path.split("/"))) + ".json"
+
+    def _current_etag(self, path: str, fs: s3fs.S3FileSystem) -> Tuple[str, int]:
+        ref_path = self._ref_path(path)
+        if self.ttl is not None:
+            try:
+                with open(ref_path) as f:
+                    ref = json.load(f)
+                if time.time() - ref["validated"] < self.ttl:
+                    return ref["etag"], ref["size"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        try:
+            info = fs.info(path, refresh=True)
+        except FileNotFoundError:
+            raise ValueError(f"'s3://{path}' does not exist")
+
+        if self.ttl is not None:
+            try:
+                os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+                _atomic_write(ref_path, json.dumps({"etag": info["ETag"], "size": info["Size"],
+                                                    "validated": time.time()}).encode())
+            except OSError as e:
+                # Raced with an invalidation removing the directory
+                logger.debug(f"Could not record the ETag of 's3://{path}': {e!r}")
+        return info["ETag"], info["Size"]
+
+    def _object_path(self, bucket: str, key: str, etag: str) -> str:
+        digest = _hash(f"{bucket}/{key}/" + etag.strip('"'))
+        return os.path.join(self._objects_dir, digest[:2], digest)
+
+    def _download(self, bucket: str, key: str, etag: str, fs: s3fs.S3FileSystem,
+                  object_path: str) -> int:
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(object_path))
+        num_bytes = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                try:
+                    # The ETag names the file, so only accept that version
+                    response = fs.s3.get_object(Bucket=bucket, Key=key, IfMatch=etag, **fs.req_kw)
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                        raise ValueError(f"'s3://{bucket}/{key}' does not exist") from e
+                    raise
+                body = response["Body"]
+                for chunk in iter(lambda: body.read(_READ_SIZE), b""):
+                    f.write(chunk)
+                    num_bytes += len(chunk)
+            os.replace(tmp_path, object_path)
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        return num_bytes
+
+    def _scan(self):
+        """ Yield (path, mtime, size) of every cached object, removing stale
+            temporary files
+        """
+        now = time.time()
+        for root, _, names in os.walk(self._objects_dir):
+            for name in names:
+                object_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(object_path)
+                except FileNotFoundError:
+                    continue
+                if name.startswith(".tmp-"):
+                    if now - stat.st_mtime > _STALE_TMP_SECONDS:
+                        _remove(object_path)
+                    continue
+                yield object_path, stat.st_mtime, stat.st_size
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+        # Over the limit by our count: scan to also see other processes' objects
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total_bytes = sum(size for _, _, size in entries)
+        for object_path, _, size in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            # Another process may already have removed it
+            _remove(object_path)
+            total_bytes -= size
+            with self._lock:
+                self.evictions += 1
+        with self._lock:
+            self._total_bytes = total_bytes
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _segment_name(part: str) -> str:
+    """ File name for one segment of an s3 path. The prefix keeps empty
+        segments, "." and ".." usable as names
+    """
+    name = quote(part, safe="")
+    if len(name) > _MAX_SEGMENT_LENGTH:
+        # "#" is escaped by quote, so hashed names can't collide with others
+        return "#" + _hash(part)
+    return "_" + name
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+
+# The active cache. None means disk caching is disabled
+_cache: Optional[DiskCache] = None
+
+
+def enable_disk_cache(directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                      ttl: Optional[float] = None) -> None:
+    """ Cache S3 objects read by load_object and s3 -> local cp on local disk
+
+    Once enabled, an object whose ETag is unchanged is read from disk instead
+    of being downloaded again. The directory can be shared by several
+    processes (e.g. jobs on the same box).
+
+    Parameters
+    -----------
+    directory : str (default DEFAULT_CACHE_DIR)
+        Directory the cached objects are stored in
+
+    max_bytes : int (default DEFAULT_MAX_BYTES)
+        Total size of the cached objects. Least recently used objects are
+        evicted beyond it
+
+    ttl : float (default None)
+        Number of seconds an object's ETag is trusted without a HEAD request.
+        If None, every read is revalidated with a HEAD request
+
+    Returns
+    --------
+    None
+    """
+    global _cache
+    logger.info(f"Enabling S3 disk cache in {directory!r} with a size limit of {max_bytes} bytes")
+    _cache = DiskCache(directory, max_bytes, ttl)
+
+
+def disable_disk_cache() -> None:
+    """ Stop reading S3 objects through the disk cache
+
+    Cached files are left on disk to be reused if the cache is enabled again
+    """
+    global _cache
+    _cache = None
+
+
+def disk_cache_stats() -> Dict[str, int]:
+    """ Return counters for the S3 disk cache
+
+    Returns
+    --------
+    Dict[str, int]
+        "hits" and "misses" count reads served from disk and downloads,
+        "bytes_hit" and "bytes_downloaded" the bytes read from disk and from
+        S3, "evictions" the number of objects evicted by this process and
+        "entries" and "bytes" the current contents of the cache directory.
+        All counters are 0 if the cache is disabled.
+    """
+    if _cache is None:
+        return {"hits": 0, "misses": 0, "bytes_hit": 0, "bytes_downloaded": 0,
+                "evictions": 0, "entries": 0, "bytes": 0}
+    return _cache.stats()
+
+
+def get_cache() -> Optional[DiskCache]:
+    """ Return the active disk cache, or None if it is disabled
+    """
+    return _cache
+
+
+def invalidate(path: str) -> None:
+    """ Invalidate cached ETags after a write to path
+    """
+    cache = _cache
+    if cache is not None:
+        cache.invalidate(path)
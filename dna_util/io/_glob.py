@@ -0,0 +1,85 @@
+""" Helpers for glob patterns in paths, shared by the local and s3 backends
+
+Patterns support "*" and "?" within a path component, "[...]" character
+sets, and "**" as a whole component matching any number of directories.
+A path naming an existing file/directory is taken literally even if it
+contains pattern characters; to match such names with a pattern, escape
+the characters as sets ("[[]", "[?]", "[*]").
+"""
+import re
+from typing import Callable, List, Pattern, Tuple
+
+MAGIC_CHARS = "*?["
+
+
+def has_magic(path: str) -> bool:
+    """ Does path contain glob pattern characters?
+    """
+    return any(char in str(path) for char in MAGIC_CHARS)
+
+
+def is_pattern(path: str, exists: Callable[[str], bool]) -> bool:
+    """ Should path be expanded as a glob pattern? Only checks whether it
+        exists (with exists) if it contains pattern characters
+    """
+    return has_magic(path) and not exists(path)
+
+
+def split_pattern(parts: List[str]) -> Tuple[List[str], List[str]]:
+    """ Split path components into the literal ones before the first pattern
+        component and the rest
+    """
+    for i, part in enumerate(parts):
+        if has_magic(part):
+            return parts[:i], parts[i:]
+    return parts, []
+
+
+def literal_head(part: str) -> str:
+    """ Return the characters of a pattern component before its first pattern
+        character, which every match starts with
+    """
+    for i, char in enumerate(part):
+        if char in MAGIC_CHARS:
+            return part[:i]
+    return part
+
+
+def translate(pattern: str) -> Pattern:
+    """ Compile a "/" separated glob pattern into a regex matching whole
+        paths. Unlike fnmatch, "*", "?" and sets never match "/", and a "**"
+        component matches zero or more directories
+    """
+    regex, i = "", 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            regex += "(?:[^/]+/)*"
+            i += 3
+            continue
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/") and i + 2 == len(pattern):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = i + 1
+            if pattern.startswith("!", end):
+                end += 1
+            if pattern.startswith("]", end):
+                end += 1
+            end = pattern.find("]", end)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                chars = pattern[i + 1:end].replace("\\", "\\\\")
+                # Negated sets mustn't match "/" either
+                regex += "[^/" + chars[1:] + "]" if chars.startswith("!") else "[" + chars + "]"
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(regex + r"\Z")
@@ -1,15 +1,42 @@
+import io
+import os
+import mmap
 import logging
 import json
-from typing import List, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 import pickle
+import itertools
+import threading
+from collections.abc import Iterator as IteratorABC
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 import pandas as pd
 
 from dna_util.io import _s3 as s3
 from dna_util.io import _local as local
+from dna_util.io import _glob as patterns
+from dna_util.io import _transfer as transfer
+from dna_util.io import _compression as codecs
+from dna_util.io import _pickle5 as pickle5
+from dna_util.io import _json as json_backend
+from dna_util.io import _metrics as metrics
+from dna_util.io import _object_cache as object_cache
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of bytes held in memory at a time when streaming a file
+DEFAULT_CHUNK_SIZE = 8 * 2 ** 20
+# Number of DataFrame rows converted to CSV at a time when saving a "csv" file
+CSV_CHUNK_ROWS = 100000
+# File types that can be saved from an iterator of chunks
+STREAMING_FILE_TYPES = {"raw", "csv", "jsonl"}
+# Number of records serialized at a time when saving a "jsonl" file
+JSONL_CHUNK_RECORDS = 10000
+# Number of files fetched and parsed at once when loading a directory or glob
+DEFAULT_LOAD_WORKERS = 16
+# Maximum number of objects loaded/saved at once by load_many and save_many
+DEFAULT_MANY_WORKERS = 32
+
 
 def cp(from_path: str, to_path: str, overwrite: bool = True,
        include_folder_name: bool = True, **kwargs) -> None:
@@ -18,7 +45,9 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
     Parameters
     -----------
     from_path : str
-        Directory/file path to copy
+        Directory/file path to copy, or a glob pattern ("*", "?", "[...]" and
+        "**" directories). Matches are copied into to_path keeping their paths
+        relative to the pattern's literal leading directory
 
     to_path : str
         Path to copy file(s) to.
@@ -41,9 +70,60 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
     None
     """
     if s3.is_s3path(from_path) or s3.is_s3path(to_path):
-        s3.cp(from_path, to_path, overwrite, include_folder_name, **kwargs)
+        with metrics.measure("cp", "s3"):
+            s3.cp(from_path, to_path, overwrite, include_folder_name, **kwargs)
     else:
-        local.cp(from_path, to_path, overwrite, include_folder_name)
+        with metrics.measure("cp", "local"):
+            local.cp(from_path, to_path, overwrite, include_folder_name)
+
+
+def cp_many(pairs: Union[str, Iterable[Tuple[str, str]]], overwrite: bool = True,
+            **kwargs) -> List[s3.CopyStatus]:
+    """ Copy many individual files, each from its own source to its own
+        destination, in any mix of local/s3 directions
+
+    Unlike calling cp per file, all copies share one S3FileSystem and one
+    thread pool. Every pair is attempted even if others fail, and the
+    outcome of each is returned rather than raised. See _s3.cp_many
+
+    Parameters
+    -----------
+    pairs : Union[str, Iterable[Tuple[str, str]]]
+        (source file, destination file) paths, or the local/s3 path of a
+        manifest file listing one pair per line as "src,dst" (or tab
+        separated), compressed or not (inferred from its suffix, e.g.
+        ".jsonl.gz"). Blank lines and lines starting with "#" are skipped
+
+    overwrite : bool (default True)
+        Should existing destinations be overwritten? If False, pairs whose
+        destination exists fail and the rest are copied
+
+    kwargs : Dict
+        fs: s3fs.S3FileSystem, acl, num_threads, progress, part_size and
+        multipart_threshold as for cp
+
+    Returns
+    --------
+    List[s3.CopyStatus]
+        (src, dst, size, error) of each pair in order. error is None if the
+        file was copied
+    """
+    if isinstance(pairs, str):
+        pairs = list(_read_manifest(pairs, kwargs.get("fs")))
+
+    with metrics.measure("cp_many", "s3"):
+        return s3.cp_many(pairs, overwrite, **kwargs)
+
+
+def _read_manifest(path: str, fs=None) -> Iterator[Tuple[str, str]]:
+    for line_number, line in enumerate(iter_lines(path, fs=fs), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        pair = [field.strip() for field in line.split("\t" if "\t" in line else ",")]
+        if len(pair) != 2 or not all(pair):
+            raise ValueError(f"Line {line_number} of manifest {path!r} is not a src,dst pair: {line!r}")
+        yield pair[0], pair[1]
 
 
 def ls(path: str, full_path: bool = False, recursive: bool = False,
@@ -53,7 +133,7 @@ def ls(path: str, full_path: bool = False, recursive: bool = False,
     Parameters
     -----------
     path : str
-        Local or S3 Path
+        Local or S3 Path, or a glob pattern
 
     full_path : bool
         Include the full path, or just the path relative to `path`
@@ -68,10 +148,11 @@ def ls(path: str, full_path: bool = False, recursive: bool = False,
     --------
     List[str]
     """
-    if s3.is_s3path(path):
-        return s3.ls(path, full_path, recursive, **kwargs)
-    else:
-        return local.ls(path, full_path, recursive)
+    with metrics.measure("ls", _backend(path)):
+        if s3.is_s3path(path):
+            return s3.ls(path, full_path, recursive, **kwargs)
+        else:
+            return local.ls(path, full_path, recursive)
 
 
 def rm(path: str, dry_run: bool = False, **kwargs) -> None:
@@ -80,7 +161,7 @@ def rm(path: str, dry_run: bool = False, **kwargs) -> None:
     Parameters
     -----------
     path : str
-        File path to delete
+        File path to delete, or a glob pattern
 
     dry_run : bool
         Print out number of files to be deleted and exit. If False, numbe of
@@ -93,10 +174,11 @@ def rm(path: str, dry_run: bool = False, **kwargs) -> None:
     --------
     None
     """
-    if s3.is_s3path(path):
-        s3.rm(path, dry_run, **kwargs)
-    else:
-        local.rm(path, dry_run)
+    with metrics.measure("rm", _backend(path)):
+        if s3.is_s3path(path):
+            s3.rm(path, dry_run, **kwargs)
+        else:
+            local.rm(path, dry_run)
 
 
 def already_exists(path: str, **kwargs) -> bool:
@@ -114,10 +196,38 @@ def already_exists(path: str, **kwargs) -> bool:
     --------
     bool
     """
-    if s3.is_s3path(path):
-        return s3.already_exists(path, **kwargs)
-    else:
-        return local.already_exists(path)
+    with metrics.measure("already_exists", _backend(path)):
+        if s3.is_s3path(path):
+            return s3.already_exists(path, **kwargs)
+        else:
+            return local.already_exists(path)
+
+
+def exists_many(paths: List[str], **kwargs) -> Dict[str, bool]:
+    """ Check whether each of many files/directories already exists
+
+    S3 paths that share a "directory" are answered from a listing instead of
+    a request per path. See _s3.exists_many
+
+    Parameters
+    -----------
+    paths : List[str]
+        Local and/or S3 file/directory paths
+
+    kwargs : Dict
+        fs: s3fs.S3FileSystem and num_threads can be optionally specified for
+        the S3 paths
+
+    Returns
+    --------
+    Dict[str, bool]
+        Whether each path exists, in the order of paths
+    """
+    paths = list(paths)
+    s3_paths = [path for path in paths if s3.is_s3path(path)]
+    with metrics.measure("exists_many", "s3" if s3_paths else "local"):
+        exists = s3.exists_many(s3_paths, **kwargs) if s3_paths else {}
+        return {path: exists[path] if path in exists else local.already_exists(path) for path in paths}
 
 
 def get_size(path: str, **kwargs) -> int:
@@ -126,7 +236,7 @@ def get_size(path: str, **kwargs) -> int:
     Parameters
     -----------
     path : str
-        File / Directory path
+        File / Directory path, or a glob pattern
 
     kwargs : Dict
         If path is an s3 path, fs: s3fs.S3FileSystem can be optionally specified
@@ -136,67 +246,451 @@ def get_size(path: str, **kwargs) -> int:
     int
     """
     fs = kwargs.pop("fs", None)
-    if s3.is_s3path(path):
-        return s3.get_size(path, fs)
-    else:
-        return local.get_size(path)
+    with metrics.measure("get_size", _backend(path)):
+        if s3.is_s3path(path):
+            return s3.get_size(path, fs)
+        else:
+            return local.get_size(path)
+
+
+def du(path: str, depth: int = 1, human_readable: bool = True,
+       **kwargs) -> Dict[str, Union[int, str]]:
+    """ Summarize disk usage of each sub-directory/prefix of path
+
+    S3 sizes are summed from a single listing of everything under path rather
+    than requesting the size of each file separately.
+
+    Parameters
+    -----------
+    path : str
+        File / Directory path
+
+    depth : int (default 1)
+        Number of levels below path to report totals for
+
+    human_readable : bool (default True)
+        Format sizes with util.sizeof_fmt (e.g. "1.5MB") instead of returning
+        the number of bytes
+
+    kwargs : Dict
+        If path is an s3 path, fs: s3fs.S3FileSystem can be optionally specified
+
+    Returns
+    --------
+    Dict[str, Union[int, str]]
+        Mapping of paths relative to path (sub-directories end in "/") to
+        their total size
+    """
+    fs = kwargs.pop("fs", None)
+    with metrics.measure("du", _backend(path)):
+        if s3.is_s3path(path):
+            totals = s3.du(path, depth, fs)
+        else:
+            totals = local.du(path, depth)
+
+    if human_readable:
+        from dna_util.util import sizeof_fmt
+        totals = {name: sizeof_fmt(size) for name, size in totals.items()}
+
+    return totals
 
 
-def load_object(path: str, file_type: Optional[str] = None, **kwargs) -> Any:
-    """ Load a file into memory
+def load_object(path: str, file_type: Optional[str] = None, cache: bool = False,
+                compression: Union[str, Dict[str, Any], None] = "infer", **kwargs) -> Any:
+    """ Load a file, or every file of a directory or glob pattern, into memory
+
+    The files of a directory (recursively; S3 prefixes must end with "/")
+    or glob pattern are fetched and parsed concurrently, skipping files
+    whose name starts with "_" or "." (e.g. _SUCCESS markers). Their objects
+    are combined in path order:
+    DataFrames with a single pd.concat, lists into one list and bytes into
+    one bytes object. Other objects are returned as a list. Parquet
+    directories are loaded as one dataset.
 
     Parameters
     -----------
     path : str
-        Path to the file. If file_type is not specified, an attempt will be
-        made to infer the file_type based on the extension.
+        Path to the file, directory or glob pattern. If file_type is not
+        specified, an attempt will be made to infer the file_type based on the
+        extension (of the first file, for a directory), ignoring a compression
+        suffix (e.g. "features.csv.gz").
 
     file_type : str
         Type of file to load.  Supported options are currently:
             "pickle"
                 kwargs are passed to pickle.loads
+            "pickle5"
+                A file saved with file_type="pickle5". Out-of-band buffers
+                (e.g. array data) are reconstructed without copying, straight
+                from the downloaded buffer or from an mmap of a local file, in
+                which case arrays are read-only. kwargs are passed to
+                pickle.loads
             "raw"
             "csv"
                 Load a CSV file into a pandas DataFrame. Additional kwargs are
-                passed to pd.read_csv
+                passed to pd.read_csv. If chunksize is passed, the file is
+                streamed and an iterator of DataFrames with chunksize rows each
+                is returned instead
             "json"
                 kwargs are passed to json.loads
+            "jsonl"
+                Load a JSON Lines (newline-delimited JSON) file as a list of
+                records, parsed with the fastest installed backend (see
+                _json). If chunksize is passed, the file is streamed and an
+                iterator of DataFrames with chunksize records each is returned
+                instead, with additional kwargs passed to pd.DataFrame. Use
+                iter_records to stream the records themselves
             "parquet"
                 Load a parquet dataset in as a pandas DataFrame. Additional
                 kwargs are passed to _parquet.load_parquet(). See that function
                 for more information
                 NOTE: This functionality is still in beta
 
+    cache : bool (default False)
+        If True, the deserialized object is kept in an in-process LRU (see
+        set_object_cache_size) keyed by path, file_type and kwargs. Later
+        loads send a single conditional request (If-None-Match on the ETag,
+        or compare modification time and size for local files) and only
+        download and deserialize the object again if it changed. Concurrent
+        loads of the same object share one request. The cached object itself
+        is returned, so callers must not mutate it. Not supported for
+        "parquet" or chunked "csv" loads
+
+    compression : Union[str, Dict, None] (default "infer")
+        Codec the file is compressed with: "gzip", "bz2", "zstd" or "lz4".
+        The file is decompressed as it is read. "infer" uses the codec named
+        by the path's suffix (".gz", ".bz2", ".zst", ".lz4"), if any, and
+        None reads the file as is. See _compression
+
     kwarg : Dict
         fs : s3fs.S3FileSystem
             Will be passed to s3.load_object if path is an s3path
+        part_size : int
+            Number of bytes requested per range when a large S3 object is
+            downloaded with concurrent range requests
+        multipart_threshold : int
+            S3 objects at least this many bytes are downloaded with concurrent
+            range requests
+        num_threads : int
+            Maximum number of ranges downloaded from S3 at once
+        max_workers : int
+            Maximum number of files of a directory or glob pattern fetched and
+            parsed at once (default DEFAULT_LOAD_WORKERS)
+        max_memory : int
+            Maximum total size in bytes (as stored) of the files of a
+            directory or glob pattern being fetched and parsed at once. A
+            larger file is still loaded, on its own
+        processes : int
+            If given, the files of a directory or glob pattern are parsed in
+            a pool of this many processes, while threads fetch them. Helps
+            with CPU bound parsing such as large CSVs, at the cost of copying
+            each file and its object between processes
 
     Returns
     --------
     Any : Depends on the file_type specified
     """
-    # Pop fs from kwargs
+    # Pop fs and transfer arguments from kwargs
     fs = kwargs.pop("fs", None)
+    multipart_args = _pop_multipart_args(kwargs)
+    files_args = {arg: kwargs.pop(arg) for arg in ("max_workers", "max_memory", "processes") if arg in kwargs}
+
+    if file_type != "parquet":
+        glob = patterns.is_pattern(path, lambda p: already_exists(p, fs=fs))
+        if glob or _is_directory(path):
+            if cache or kwargs.get("chunksize") is not None:
+                raise ValueError(f"cache=True and chunksize are not supported when loading the files of {path!r}")
+            return _load_files(path, glob, file_type, compression, fs, multipart_args, **files_args, **kwargs)
 
     if file_type is None:
         file_type = _file_type_helper(path)
+    codec, _ = codecs.resolve(path, compression)
+
+    if cache and (file_type == "parquet" or kwargs.get("chunksize") is not None):
+        raise ValueError(f"cache=True is not supported for {file_type!r} files loaded in chunks or as parquet")
+    if codec is not None and file_type == "parquet":
+        raise ValueError(f"compression={codec!r} is not supported for parquet datasets")
+
+    if file_type == "csv" and kwargs.get("chunksize") is not None:
+        logger.info(f"Streaming {path!r} as 'csv' chunks of {kwargs['chunksize']} rows")
+        return _iter_csv(_open_stream(path, DEFAULT_CHUNK_SIZE, fs), codec, **kwargs)
+
+    if file_type == "jsonl" and kwargs.get("chunksize") is not None:
+        logger.info(f"Streaming {path!r} as 'jsonl' chunks of {kwargs['chunksize']} records")
+        return _iter_jsonl_frames(_open_stream(path, DEFAULT_CHUNK_SIZE, fs), codec, **kwargs)
+
+    with metrics.measure("load_object", _backend(path), file_type):
+        if file_type == "parquet":
+            from ._parquet import load_parquet
+            return load_parquet(path, fs=fs, **kwargs)
+
+        if cache:
+            return _load_cached(path, file_type, codec, fs, **kwargs)
+
+        with metrics.phase("transfer"):
+            if s3.is_s3path(path):
+                logger.info(f"Loading {path!r} from S3")
+                data_file = s3.load_object(path, fs, **multipart_args)
+            else:
+                path = local._norm_path(path)
+                logger.info(f"Loading {path!r} from local directory")
+                data_file = open(path, "rb")
+
+        try:
+            with metrics.phase("serialize"):
+                obj = _deserialize(_decompressed(data_file, codec), file_type, **kwargs)
+            if metrics.enabled():
+                metrics.add_bytes(bytes_in=_bytes_read(data_file))
+            return obj
+        finally:
+            if hasattr(data_file, "close"):
+                logger.info(f"Closing data_file {data_file!r}")
+                data_file.close()
+
+
+def _load_cached(path: str, file_type: str, codec: Optional[str], fs, **kwargs) -> Any:
+    """ load_object(..., cache=True) without the argument handling
+    """
+    is_s3 = s3.is_s3path(path)
+    path = "s3://" + s3._norm_s3_path(path) if is_s3 else local._norm_path(path)
+
+    def _fetch(etag: Optional[str]):
+        with metrics.phase("transfer"):
+            if is_s3:
+                logger.info(f"Loading {path!r} from S3 unless its ETag is still {etag!r}")
+                loaded = s3.load_object_if_changed(path, etag, fs)
+            else:
+                logger.info(f"Loading {path!r} from local directory unless it is unchanged")
+                loaded = local.load_object_if_changed(path, etag)
+        if loaded is None:
+            logger.info(f"{path!r} is unchanged, using the cached object")
+            return None
+
+        new_etag, data_file = loaded
+        with data_file:
+            with metrics.phase("serialize"):
+                obj = _deserialize(_decompressed(data_file, codec), file_type, **kwargs)
+            size = _bytes_read(data_file)
+        metrics.add_bytes(bytes_in=size)
+        return new_etag, obj, size
+
+    key = (path, file_type, codec, repr(sorted(kwargs.items())))
+    return object_cache.get_cache().load(key, _fetch)
+
+
+def _is_directory(path: str) -> bool:
+    """ Does path name a directory rather than a single file?
+
+    S3 "directories" must end with "/", so loading a key never costs a
+    listing request
+    """
+    return path.endswith("/") or (not s3.is_s3path(path) and os.path.isdir(local._norm_path(path)))
 
+
+def _list_files(path: str, glob: bool, fs) -> List[Tuple[str, int]]:
+    """ Return the (path, size) of every file of a directory or glob pattern
+        in path order, skipping names starting with "_" or "."
+    """
+    if s3.is_s3path(path):
+        fs = s3.get_fs(fs)
+        if glob:
+            bucket, _, objects = s3._glob_files(path, fs)
+        else:
+            prefix = s3._norm_s3_path(path)
+            bucket = prefix.split("/")[0]
+            objects = s3._iter_objects(prefix, fs)
+        files = [(f"s3://{bucket}/{obj['Key']}", obj["Size"]) for obj in objects]
+    else:
+        if glob:
+            names = local._glob_files(path)[1]
+        else:
+            names = [os.path.join(root, name) for root, _, files in os.walk(local._norm_path(path))
+                     for name in files]
+        files = [(name, os.path.getsize(name)) for name in names]
+
+    return sorted((name, size) for name, size in files
+                  if not os.path.basename(name.rstrip("/")).startswith(("_", ".")))
+
+
+def _load_files(path: str, glob: bool, file_type: Optional[str], compression: Union[str, Dict[str, Any], None],
+                fs, multipart_args: Dict, max_workers: int = DEFAULT_LOAD_WORKERS,
+                max_memory: Optional[int] = None, processes: Optional[int] = None, **kwargs) -> Any:
+    """ load_object for a directory or glob pattern
+    """
+    files = _list_files(path, glob, fs)
+    if not files:
+        raise ValueError(f"{path!r} does not exist or contains no files")
+    if file_type is None:
+        file_type = _file_type_helper(files[0][0])
+
+    with metrics.measure("load_object", _backend(path), file_type):
+        if file_type == "parquet" and not glob:
+            from ._parquet import load_parquet
+            return load_parquet(path, fs=fs, **kwargs)
+
+        logger.info(f"Loading {len(files)} {file_type!r} file(s) of {path!r} with up to {max_workers} at once")
+        # Total size of the files being fetched and parsed
+        budget = threading.Condition()
+        in_flight = {"bytes": 0}
+
+        def _load(name: str, size: int, process_pool: Optional[ProcessPoolExecutor]):
+            try:
+                codec, _ = codecs.resolve(name, compression)
+                return _load_file(name, file_type, codec, fs, multipart_args, process_pool, **kwargs)
+            finally:
+                with budget:
+                    in_flight["bytes"] -= size
+                    budget.notify_all()
+
+        process_pool = ProcessPoolExecutor(processes) if processes else None
+        try:
+            with ThreadPoolExecutor(min(max_workers, len(files))) as executor:
+                futures = []
+                for name, size in files:
+                    with budget:
+                        while max_memory is not None and in_flight["bytes"] and \
+                                in_flight["bytes"] + size > max_memory:
+                            budget.wait()
+                        in_flight["bytes"] += size
+                    futures.append(executor.submit(_load, name, size, process_pool))
+                objs = [future.result() for future in futures]
+        finally:
+            if process_pool is not None:
+                process_pool.shutdown()
+
+        metrics.add_bytes(bytes_in=sum(size for _, size in files))
+        return _combine(objs)
+
+
+def _load_file(path: str, file_type: str, codec: Optional[str], fs, multipart_args: Dict,
+               process_pool: Optional[ProcessPoolExecutor] = None, **kwargs) -> Any:
+    """ Fetch and parse one file of a directory or glob pattern
+    """
     if file_type == "parquet":
         from ._parquet import load_parquet
         return load_parquet(path, fs=fs, **kwargs)
 
     if s3.is_s3path(path):
-        logger.info(f"Loading {path!r} from S3")
-        data_file = s3.load_object(path, fs)
+        data_file = s3.load_object(path, fs, **multipart_args)
     else:
-        path = local._norm_path(path)
-        logger.info(f"Loading {path!r} from local directory")
         data_file = open(path, "rb")
 
+    with data_file:
+        if process_pool is None:
+            return _deserialize(_decompressed(data_file, codec), file_type, **kwargs)
+        data = bytes(data_file.getbuffer()) if hasattr(data_file, "getbuffer") else data_file.read()
+    return process_pool.submit(_deserialize_bytes, data, file_type, codec, kwargs).result()
+
+
+def _deserialize_bytes(data: bytes, file_type: str, codec: Optional[str], kwargs: Dict) -> Any:
+    """ _deserialize for a file's contents, run in a worker process
+    """
+    return _deserialize(_decompressed(io.BytesIO(data), codec), file_type, **kwargs)
+
+
+def _combine(objs: List[Any]) -> Any:
+    """ Combine the objects loaded from several files, in order
+    """
+    if objs and all(isinstance(obj, pd.DataFrame) for obj in objs):
+        # A single concat allocates the result once
+        return pd.concat(objs, ignore_index=all(isinstance(obj.index, pd.RangeIndex) for obj in objs))
+    if objs and all(isinstance(obj, list) for obj in objs):
+        return list(itertools.chain.from_iterable(objs))
+    if objs and all(isinstance(obj, bytes) for obj in objs):
+        return b"".join(objs)
+    return objs
+
+
+def load_many(paths: Iterable[str], return_exceptions: bool = False, **kwargs) -> List[Any]:
+    """ Load many files into memory at once
+
+    Unlike calling load_object per path, all loads share one S3FileSystem
+    (and its connection pool) and run concurrently in one thread pool, with
+    the adaptive concurrency of transfer.run_transfers. Every path is
+    attempted even if others fail. Metrics record the loads as a single
+    load_many operation.
+
+    Parameters
+    -----------
+    paths : Iterable[str]
+        Local and/or S3 paths, of any file types load_object supports
+
+    return_exceptions : bool (default False)
+        If True, the exception of each failed load is returned in place of
+        its object. If False, a transfer.TransferError listing the failures
+        by path is raised once every load is done
+
+    kwargs : Dict
+        num_threads: maximum number of loads at once (default
+        DEFAULT_MANY_WORKERS), progress: called as
+        progress(files_done, files_total, 0) after each load.
+        Anything else is passed to load_object for every path
+
+    Returns
+    --------
+    List[Any]
+        The object loaded from each path, in order
+    """
+    paths = [str(path) for path in paths]
+    num_threads = kwargs.pop("num_threads", DEFAULT_MANY_WORKERS)
+    progress = kwargs.pop("progress", None)
+    backend = "s3" if any(s3.is_s3path(path) for path in paths) else "local"
+    if backend == "s3":
+        kwargs["fs"] = s3.get_fs(kwargs.get("fs"), pool_size=max(num_threads, s3.DEFAULT_NUM_THREADS))
+
+    with metrics.measure("load_many", backend):
+        # Each load is part of the load_many record rather than a record of its own
+        measurement = metrics.current()
+
+        def _load(path: str) -> Any:
+            with metrics.within(measurement):
+                return load_object(path, **kwargs)
+
+        transfers = [transfer.Transfer(path, _load, (path,), None) for path in paths]
+        return transfer.run_transfers(transfers, num_threads, progress=progress,
+                                      return_exceptions=return_exceptions)
+
+
+def _decompressed(data_file, codec: Optional[str]):
+    """ data_file, decompressed as it is read if codec isn't None
+    """
+    return codecs.open_reader(data_file, codec) if codec is not None else data_file
+
+
+def _backend(path: str) -> str:
+    return "s3" if s3.is_s3path(path) else "local"
+
+
+def _bytes_read(data_file) -> int:
+    """ Number of bytes read from a file that was deserialized
+    """
+    # Ranged S3 downloads are deserialized straight from their buffer
+    if hasattr(data_file, "getbuffer"):
+        return data_file.getbuffer().nbytes
+    # Local files may have been mapped into memory rather than read
+    if isinstance(data_file, io.BufferedReader):
+        try:
+            return os.fstat(data_file.fileno()).st_size
+        except (io.UnsupportedOperation, OSError):
+            pass
+    try:
+        return data_file.tell()
+    except (OSError, ValueError):
+        return 0
+
+
+def _deserialize(data_file, file_type: str, **kwargs) -> Any:
+    """ Read an object of the given file_type from an open binary file
+
+    Shared by load_object and aio.load_object. A ValueError is raised if the
+    file_type isn't supported
+    """
     if file_type == "pickle":
         logger.info(f"Loading file as a 'pickle' object. kwargs passed {kwargs!r}")
-        data_read = data_file.read()
-        obj = pickle.loads(data_read, **kwargs)
+        obj = pickle.loads(_file_buffer(data_file), **kwargs)
+    elif file_type == "pickle5":
+        logger.info(f"Loading file as a 'pickle5' object. kwargs passed {kwargs!r}")
+        obj = pickle5.loads(_file_buffer(data_file), **kwargs)
     elif file_type == "raw":
         logger.info("Loading file as a 'raw' object")
         obj = data_file.read()
@@ -207,46 +701,250 @@ def load_object(path: str, file_type: Optional[str] = None, **kwargs) -> Any:
     elif file_type == "json":
         logger.info(f"loading file as a 'json' object. kwargs passed {kwargs!r}")
         obj = json.load(data_file, **kwargs)
+    elif file_type == "jsonl":
+        logger.info(f"Loading file as a 'jsonl' object with {json_backend.get_backend()!r}")
+        obj = list(_parse_jsonl(_line_reader(data_file)))
     else:
-        if hasattr(data_file, "close"):
-            logger.info(f"Closing data_file {data_file!r}")
-            data_file.close()
         raise ValueError(f"File type {file_type!r} is not supported")
 
-    if hasattr(data_file, "close"):
-        logger.info(f"Closing data_file {data_file!r}")
-        data_file.close()
-
     return obj
 
 
+def _file_buffer(data_file) -> Union[bytes, memoryview, mmap.mmap]:
+    """ The contents of an open binary file, without a copy where possible
+    """
+    # Ranged S3 downloads expose their buffer
+    if hasattr(data_file, "getbuffer"):
+        return data_file.getbuffer()
+    # Local files are mapped into memory instead of read
+    if isinstance(data_file, io.BufferedReader):
+        try:
+            return mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (io.UnsupportedOperation, OSError, ValueError):
+            # Not backed by a file descriptor, or empty
+            pass
+    return data_file.read()
+
+
+def iter_object(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                **kwargs) -> Iterator[bytes]:
+    """ Stream a file in chunks of bytes
+
+    Only one chunk is held in memory at a time, however large the file is
+
+    Parameters
+    -----------
+    path : str
+        Local or S3 path of the file
+
+    chunk_size : int (default DEFAULT_CHUNK_SIZE)
+        Maximum number of bytes per chunk
+
+    kwargs : Dict
+        If path is an s3 path, fs: s3fs.S3FileSystem can be optionally specified
+
+    Returns
+    --------
+    Iterator[bytes]
+    """
+    fs = kwargs.pop("fs", None)
+    if s3.is_s3path(path):
+        return s3.iter_object(path, chunk_size, fs, **kwargs)
+    else:
+        return local.iter_object(path, chunk_size)
+
+
+def iter_lines(path: str, encoding: str = "utf-8", chunk_size: int = DEFAULT_CHUNK_SIZE,
+               compression: Union[str, Dict[str, Any], None] = "infer", **kwargs) -> Iterator[str]:
+    """ Stream the lines of a text file
+
+    The file is read in chunks, so memory is bounded by chunk_size plus the
+    longest line
+
+    Parameters
+    -----------
+    path : str
+        Local or S3 path of the file
+
+    encoding : str (default "utf-8")
+        Encoding used to decode the file
+
+    chunk_size : int (default DEFAULT_CHUNK_SIZE)
+        Number of bytes read from the file at a time
+
+    compression : Union[str, Dict, None] (default "infer")
+        Codec the file is compressed with. See load_object
+
+    kwargs : Dict
+        If path is an s3 path, fs: s3fs.S3FileSystem can be optionally specified
+
+    Returns
+    --------
+    Iterator[str]
+        Each line without its line ending
+    """
+    codec, _ = codecs.resolve(path, compression)
+    stream = _open_stream(path, chunk_size, kwargs.pop("fs", None), **kwargs)
+    return _iter_text_lines(stream, codec, encoding)
+
+
+def _iter_text_lines(stream: io.BufferedReader, codec: Optional[str], encoding: str) -> Iterator[str]:
+    with stream:
+        for line in io.TextIOWrapper(_decompressed(stream, codec), encoding=encoding):
+            yield line.rstrip("\n")
+
+
+def iter_records(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 compression: Union[str, Dict[str, Any], None] = "infer", **kwargs) -> Iterator[Any]:
+    """ Stream the records of a JSON Lines (newline-delimited JSON) file
+
+    The file is read in chunks and parsed a line at a time with the fastest
+    installed JSON backend (see _json), so memory is bounded by chunk_size
+    plus the longest record. Blank lines are skipped
+
+    Parameters
+    -----------
+    path : str
+        Local or S3 path of the file
+
+    chunk_size : int (default DEFAULT_CHUNK_SIZE)
+        Number of bytes read from the file at a time
+
+    compression : Union[str, Dict, None] (default "infer")
+        Codec the file is compressed with. See load_object
+
+    kwargs : Dict
+        If path is an s3 path, fs: s3fs.S3FileSystem can be optionally specified
+
+    Returns
+    --------
+    Iterator[Any]
+        Each parsed record
+    """
+    codec, _ = codecs.resolve(path, compression)
+    stream = _open_stream(path, chunk_size, kwargs.pop("fs", None), **kwargs)
+    return _iter_jsonl(stream, codec)
+
+
+def _iter_jsonl(stream: io.BufferedReader, codec: Optional[str] = None) -> Iterator[Any]:
+    with stream:
+        yield from _parse_jsonl(_line_reader(_decompressed(stream, codec)))
+
+
+def _iter_jsonl_frames(stream: io.BufferedReader, codec: Optional[str] = None, chunksize: int = None,
+                       **kwargs) -> Iterator[pd.DataFrame]:
+    records = []
+    for record in _iter_jsonl(stream, codec):
+        records.append(record)
+        if len(records) >= chunksize:
+            yield pd.DataFrame(records, **kwargs)
+            records = []
+    if records:
+        yield pd.DataFrame(records, **kwargs)
+
+
+def _line_reader(data_file):
+    """ A file object that can be iterated over line by line efficiently
+    """
+    # Raw files (e.g. ranged S3 downloads) would be read a byte at a time
+    if isinstance(data_file, io.RawIOBase):
+        return io.BufferedReader(data_file)
+    return data_file
+
+
+def _parse_jsonl(lines: Iterable[bytes]) -> Iterator[Any]:
+    for line in lines:
+        if line.strip():
+            yield json_backend.loads(line)
+
+
+def _iter_csv(stream: io.BufferedReader, codec: Optional[str] = None,
+              **kwargs) -> Iterator[pd.DataFrame]:
+    with stream:
+        yield from pd.read_csv(_decompressed(stream, codec), **kwargs)
+
+
+class _ChunkReader(io.RawIOBase):
+    """ Read-only file object over an iterator of bytes chunks
+    """
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not len(self._chunk):
+            try:
+                self._chunk = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        num_bytes = min(len(b), len(self._chunk))
+        b[:num_bytes] = self._chunk[:num_bytes]
+        self._chunk = self._chunk[num_bytes:]
+        return num_bytes
+
+    def close(self) -> None:
+        if hasattr(self._chunks, "close"):
+            self._chunks.close()
+        super().close()
+
+
+def _open_stream(path: str, chunk_size: int, fs=None, **kwargs) -> io.BufferedReader:
+    """ Open a buffered, read-only file object streaming path in chunks
+    """
+    return io.BufferedReader(_ChunkReader(iter_object(path, chunk_size, fs=fs, **kwargs)),
+                             buffer_size=chunk_size)
+
+
 def save_object(obj: object, path: str, file_type: Optional[str] = None,
                 overwrite: bool = True, protocol: int = pickle.HIGHEST_PROTOCOL,
-                **kwargs) -> None:
+                compression: Union[str, Dict[str, Any], None] = "infer", **kwargs) -> None:
     """ Save an object in memory to a file
 
+    For "raw" and "csv" files obj can also be an iterator (e.g. a generator)
+    of chunks, which are written progressively (as multipart parts on S3) so
+    the full output is never held in memory.
+
     Parameters
     -----------
     obj : object
-        Python object in memory
+        Python object in memory, or an iterator of bytes/str chunks or (for
+        "csv") DataFrames
 
     path : str
         Local or S3 path to save file. If file_type is not specified, an
-        attempt will be made to infer the file_type based on the extension.
+        attempt will be made to infer the file_type based on the extension,
+        ignoring a compression suffix (e.g. "features.csv.gz").
 
     file_type : str
         Type of file to save.
         Supported options are currently:
             "pickle"
                 Additional kwargs are passed to pickle.dumps
+            "pickle5"
+                Pickle with protocol 5, writing buffers of at least
+                min_buffer_size bytes (default _pickle5.MIN_BUFFER_SIZE) out
+                of band (see _pickle5). The data of NumPy arrays and pandas
+                DataFrames is written from obj's memory without being copied
+                into the pickle. Additional kwargs are passed to pickle.dumps
             "raw"
             "csv"
                 Save a pandas DataFrame as a CSV file.  Additional kwargs are
-                passed to obj.to_csv
+                passed to obj.to_csv. The DataFrame is converted and written
+                CSV_CHUNK_ROWS rows at a time. When obj is an iterator of
+                DataFrames, the header is only written for the first one
                 NOTE: A TypeError will be thrown in "csv" is specified and obj
-                is not a pandas DataFrame
+                is not a pandas DataFrame (or an iterator)
             "json"
                 Additional kwargs are passed to json.dumps
+            "jsonl"
+                Save a list or iterator of records (or a pandas DataFrame, or
+                an iterator of DataFrames) as JSON Lines, one record per line.
+                Records are written JSONL_CHUNK_RECORDS at a time with the
+                fastest installed JSON backend (see _json), DataFrames with
+                DataFrame.to_json, to which additional kwargs are passed
             "parquet"
                 Save a pandas DataFrame to a parquet dataset. Additional kwargs
                 are passed to the _save_parquet helper function and are applied
@@ -260,12 +958,27 @@ def save_object(obj: object, path: str, file_type: Optional[str] = None,
     protocol : int
         Used when calling pickle
 
+    compression : Union[str, Dict, None] (default "infer")
+        Codec to compress the file with: "gzip", "bz2", "zstd" or "lz4", or
+        a dict with the codec as "method" and a compression "level". Streamed
+        saves are compressed chunk by chunk. "infer" uses the codec named by
+        the path's suffix (".gz", ".bz2", ".zst", ".lz4"), if any, and None
+        saves the file uncompressed. See _compression
+
     kwargs : Dict
         The following extra parameters can be passed:
             fs : s3fs.S3FileSystem
                 Used when the path is an s3 path
             acl : str
                 Used to set the Access Control List settings when writing to S3
+            part_size : int
+                Size in bytes of each part when a large payload is uploaded to
+                S3 in parts
+            multipart_threshold : int
+                Payloads at least this many bytes are uploaded to S3 in
+                concurrent parts
+            num_threads : int
+                Maximum number of parts uploaded to S3 at once
 
     Returns
     --------
@@ -273,17 +986,141 @@ def save_object(obj: object, path: str, file_type: Optional[str] = None,
     """
     fs = kwargs.pop("fs", None)
     acl = kwargs.pop("acl", "bucket-owner-full-control")
-
-    # Check to see if path already exists
-    if not overwrite and already_exists(path, fs=fs):
-        raise ValueError(f"overwrite set to False and {path!r} already exists")
+    multipart_args = _pop_multipart_args(kwargs)
 
     if file_type is None:
         file_type = _file_type_helper(path)
+    codec, level = codecs.resolve(path, compression)
+    if codec is not None and file_type == "parquet":
+        raise ValueError(f"compression={codec!r} is not supported for parquet datasets")
+
+    with metrics.measure("save_object", _backend(path), file_type):
+        # Check to see if path already exists
+        if not overwrite and already_exists(path, fs=fs):
+            raise ValueError(f"overwrite set to False and {path!r} already exists")
+
+        if file_type == "parquet":
+            if not isinstance(obj, pd.DataFrame):
+                raise TypeError(f"Saving to parquet currently only supports a pandas DataFrame. {type(obj)!r} passed")
+            from ._parquet import save_parquet
+            return save_parquet(obj, path, fs=fs, **kwargs)
+
+        if file_type in ("pickle5", "jsonl") or isinstance(obj, IteratorABC) or \
+                (file_type == "csv" and isinstance(obj, pd.DataFrame)):
+            if file_type == "pickle5":
+                # Array data is written from obj's memory rather than copied
+                chunks = pickle5.dump_chunks(obj, **kwargs)
+            else:
+                chunks = _serialize_chunks(obj, file_type, **kwargs)
+            if codec is not None:
+                chunks = codecs.compress_chunks(chunks, codec, level)
+            if metrics.enabled():
+                chunks = _count_bytes_out(chunks)
+            if s3.is_s3path(path):
+                logger.info("Streaming object to S3")
+                multipart_args.pop("multipart_threshold", None)
+                s3.save_stream(chunks, path, fs, acl, **multipart_args)
+            else:
+                logger.info("Streaming object to local")
+                local.save_stream(chunks, path)
+            return
+
+        with metrics.phase("serialize"):
+            obj = _serialize(obj, file_type, protocol, **kwargs)
+            # Encoded once here rather than by every consumer of the payload
+            if isinstance(obj, str):
+                obj = obj.encode()
+            if codec is not None:
+                obj = codecs.compress(obj, codec, level)
+        metrics.add_bytes(bytes_out=len(obj))
+
+        # Save file to appropriate system
+        with metrics.phase("transfer"):
+            if s3.is_s3path(path):
+                logger.info("Saving object to S3")
+                # overwrite was already checked above
+                s3.save_object(obj, path, True, fs, acl, **multipart_args)
+            else:
+                logger.info("Saving object to local")
+                path = local._norm_path(path)
+                with open(path, "wb") as f:
+                    f.write(obj)
+
+
+def save_many(objs: Union[Dict[str, Any], Iterable[Tuple[str, Any]]], return_exceptions: bool = False,
+              **kwargs) -> List[Optional[BaseException]]:
+    """ Save many objects at once
+
+    Unlike calling save_object per object, all saves share one S3FileSystem
+    (and its connection pool) and run concurrently in one thread pool, so
+    objects are serialized while others upload. Every object is attempted
+    even if others fail. Metrics record the saves as a single save_many
+    operation.
+
+    Parameters
+    -----------
+    objs : Union[Dict[str, Any], Iterable[Tuple[str, Any]]]
+        Objects keyed by their local/S3 path, or (path, object) pairs
+
+    return_exceptions : bool (default False)
+        If True, the exception of each failed save is returned. If False, a
+        transfer.TransferError listing the failures by path is raised once
+        every save is done
+
+    kwargs : Dict
+        num_threads: maximum number of saves at once (default
+        DEFAULT_MANY_WORKERS), progress: called as
+        progress(files_done, files_total, 0) after each save.
+        Anything else is passed to save_object for every object
+
+    Returns
+    --------
+    List[Optional[BaseException]]
+        None for each object saved, or its exception, in order
+    """
+    pairs = list(objs.items()) if isinstance(objs, dict) else [(str(path), obj) for path, obj in objs]
+    num_threads = kwargs.pop("num_threads", DEFAULT_MANY_WORKERS)
+    progress = kwargs.pop("progress", None)
+    backend = "s3" if any(s3.is_s3path(path) for path, _ in pairs) else "local"
+    if backend == "s3":
+        kwargs["fs"] = s3.get_fs(kwargs.get("fs"), pool_size=max(num_threads, s3.DEFAULT_NUM_THREADS))
+
+    with metrics.measure("save_many", backend):
+        # Each save is part of the save_many record rather than a record of its own
+        measurement = metrics.current()
+
+        def _save(path: str, obj: object) -> None:
+            with metrics.within(measurement):
+                save_object(obj, path, **kwargs)
+
+        transfers = [transfer.Transfer(path, _save, (path, obj), None) for path, obj in pairs]
+        return transfer.run_transfers(transfers, num_threads, progress=progress,
+                                      return_exceptions=return_exceptions)
+
+
+def _count_bytes_out(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """ Pass chunks through, counting them as written by the measured operation.
+        Serialization and upload are interleaved, so streamed saves aren't split
+        into phases
+    """
+    for chunk in chunks:
+        metrics.add_bytes(bytes_out=len(chunk))
+        yield chunk
+
 
+def _serialize(obj: object, file_type: str, protocol: int = pickle.HIGHEST_PROTOCOL,
+               **kwargs) -> Union[bytes, str]:
+    """ Convert obj to the bytes/str written for the given file_type
+
+    Shared by save_object and aio.save_object. A ValueError is raised if the
+    file_type isn't supported
+    """
     if file_type == "pickle":
         logger.info(f"Saving obj as a pickle file. kwargs passed {kwargs!r}")
         obj = pickle.dumps(obj, protocol=protocol, **kwargs)
+    elif file_type == "pickle5":
+        logger.info(f"Saving obj as a pickle5 file. kwargs passed {kwargs!r}")
+        obj = pickle5.dumps(obj, **kwargs)
     elif file_type == "raw":
         logger.info(f"Saving obj as a raw file.")
         pass
@@ -295,28 +1132,73 @@ def save_object(obj: object, path: str, file_type: Optional[str] = None,
     elif file_type == "json":
         logger.info(f"Saving obj as a json file. kwargs passed {kwargs!r}")
         obj = json.dumps(obj, **kwargs)
-    elif file_type == "parquet":
-        if not isinstance(obj, pd.DataFrame):
-            raise TypeError(f"Saving to parquet currently only supports a pandas DataFrame. {type(obj)!r} passed")
-        from ._parquet import save_parquet
-        return save_parquet(obj, path, fs=fs, **kwargs)
+    elif file_type == "jsonl":
+        logger.info(f"Saving obj as a jsonl file with {json_backend.get_backend()!r}")
+        obj = b"".join(_jsonl_chunks(obj, **kwargs))
     else:
         raise ValueError(f"file_type={file_type!r} is not supported")
 
-    # Save file to appropriate system
-    if s3.is_s3path(path):
-        logger.info("Saving object to S3")
-        s3.save_object(obj, path, overwrite, fs, acl)
-    else:
-        logger.info("Saving object to local")
-        path = local._norm_path(path)
-        if isinstance(obj, (bytes, bytearray)):
-            mode = "wb"
-        else:
-            mode = "w"
+    return obj
 
-        with open(path, mode) as f:
-            f.write(obj)
+
+def _serialize_chunks(chunks: Union[Iterator, pd.DataFrame], file_type: str,
+                      **kwargs) -> Iterator[bytes]:
+    """ Convert an iterator of chunks (or a DataFrame to be saved as "csv") to
+        the bytes written for the given file_type, one chunk at a time
+    """
+    if file_type not in STREAMING_FILE_TYPES:
+        raise ValueError(f"Saving an iterator is only supported for file types "
+                         f"{sorted(STREAMING_FILE_TYPES)!r}. {file_type!r} passed")
+    if file_type == "jsonl":
+        yield from _jsonl_chunks(chunks, **kwargs)
+        return
+
+    if isinstance(chunks, pd.DataFrame):
+        df = chunks
+        chunks = (df.iloc[i: i + CSV_CHUNK_ROWS] for i in range(0, max(len(df), 1), CSV_CHUNK_ROWS))
+
+    header = kwargs.pop("header", True)
+    for chunk in chunks:
+        if isinstance(chunk, pd.DataFrame):
+            if file_type != "csv":
+                raise TypeError(f"DataFrame chunks can only be saved when file_type='csv'. "
+                                f"{file_type!r} passed")
+            chunk = chunk.to_csv(path_or_buf=None, header=header, **kwargs)
+            header = False
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        if not isinstance(chunk, (bytes, bytearray, memoryview)):
+            raise TypeError(f"Chunks must be bytes, str or DataFrames. {type(chunk)!r} passed")
+        yield chunk
+
+
+def _jsonl_chunks(obj: Union[Iterable, pd.DataFrame], **kwargs) -> Iterator[bytes]:
+    """ Convert records, a DataFrame, or an iterator of records and/or
+        DataFrames to JSON Lines, JSONL_CHUNK_RECORDS records at a time
+    """
+    if isinstance(obj, pd.DataFrame):
+        df = obj
+        obj = (df.iloc[i: i + JSONL_CHUNK_RECORDS] for i in range(0, len(df), JSONL_CHUNK_RECORDS))
+    elif isinstance(obj, (dict, str, bytes)):
+        raise TypeError(f"obj must be an iterable of records or a pandas DataFrame when file_type='jsonl'. "
+                        f"{type(obj)!r} passed")
+
+    lines = []
+    for item in obj:
+        if isinstance(item, pd.DataFrame):
+            if lines:
+                yield b"".join(lines)
+                lines = []
+            if len(item):
+                text = item.to_json(orient="records", lines=True, **kwargs)
+                yield text.encode() if text.endswith("\n") else (text + "\n").encode()
+            continue
+        lines.append(json_backend.dumps(item) + b"\n")
+        if len(lines) >= JSONL_CHUNK_RECORDS:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
 
 
 def _file_type_helper(path):
@@ -329,14 +1211,17 @@ def _file_type_helper(path):
     """
     type_dict = dict(
         pkl="pickle",
+        pkl5="pickle5",
         csv="csv",
         json="json",
+        jsonl="jsonl",
+        ndjson="jsonl",
         parquet="parquet",
         parq="parquet",
         txt="raw"
     )
 
-    extension = path.split(".")[-1]
+    extension = codecs.split_suffix(path)[0].split(".")[-1]
 
     if extension not in type_dict:
         raise ValueError(
@@ -347,3 +1232,12 @@ def _file_type_helper(path):
         )
 
     return type_dict[extension]
+
+
+def _pop_multipart_args(kwargs):
+    """ Remove the arguments controlling multipart S3 transfers from kwargs
+    """
+    return {
+        arg: kwargs.pop(arg) for arg in ("part_size", "multipart_threshold", "num_threads")
+        if arg in kwargs
+    }
@@ -0,0 +1,101 @@
+""" JSON backend for the "jsonl" file type
+
+The fastest installed library is used: orjson, then ujson, then the
+standard library's json module. Whichever it is, NaN and infinite floats are
+written as null, as orjson does (they aren't valid JSON).
+"""
+import json
+import math
+import logging
+import importlib
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# In order of preference
+BACKENDS = ("orjson", "ujson", "json")
+
+_backend: Optional[str] = None
+_loads: Optional[Callable[[Union[bytes, str]], Any]] = None
+_dumps: Optional[Callable[[Any], bytes]] = None
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """ Select the library used to parse and write JSON lines
+
+    Parameters
+    -----------
+    name : str
+        One of BACKENDS. If None, the first one installed is used
+
+    Returns
+    --------
+    str
+        The name of the selected backend
+    """
+    global _backend, _loads, _dumps
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not supported. Supported options are {list(BACKENDS)!r}")
+
+    for candidate in BACKENDS if name is None else (name,):
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+
+        if candidate == "orjson":
+            option = module.OPT_SERIALIZE_NUMPY
+            _dumps = lambda obj: module.dumps(obj, option=option)
+        elif candidate == "ujson":
+            _dumps = _null_non_finite(lambda obj: module.dumps(obj, ensure_ascii=False, allow_nan=False).encode())
+        else:
+            _dumps = _null_non_finite(
+                lambda obj: module.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode()
+            )
+        _loads = module.loads
+        _backend = candidate
+        logger.debug(f"Using {candidate!r} for JSON lines")
+        return candidate
+
+
+def _null_non_finite(dumps: Callable[[Any], bytes]) -> Callable[[Any], bytes]:
+    """ Wrap a dumps refusing NaN and infinite floats so that it writes them
+        as null instead. Documents without any only pay for the first attempt
+    """
+    def _dumps(obj: Any) -> bytes:
+        try:
+            return dumps(obj)
+        except (ValueError, OverflowError):
+            return dumps(_replace_non_finite(obj))
+    return _dumps
+
+
+def _replace_non_finite(obj: Any) -> Any:
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def loads(line: Union[bytes, str]) -> Any:
+    """ Parse one JSON document
+    """
+    return _loads(line)
+
+
+def dumps(obj: Any) -> bytes:
+    """ Serialize obj as one line of JSON, without the line ending
+    """
+    return _dumps(obj)
+
+
+set_backend()
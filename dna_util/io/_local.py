@@ -1,7 +1,11 @@
 import os
+import glob
+import uuid
 import shutil
 import logging
-from typing import List
+from typing import List, Dict, Iterable, Iterator, Tuple, Optional, BinaryIO, Union
+
+from dna_util.io import _glob as patterns
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +14,32 @@ def _norm_path(path: str):
     return os.path.expanduser(os.path.normpath(path))
 
 
+def _glob(pattern: str) -> Tuple[str, List[str]]:
+    """ Return the literal directory a glob pattern starts from and the sorted
+        paths (files and directories) matching it
+    """
+    pattern = _norm_path(pattern)
+    root_parts, _ = patterns.split_pattern(pattern.split(os.sep))
+    # A relative pattern without literal leading directories starts from the
+    # current directory, an absolute one from the filesystem root
+    root = os.sep.join(root_parts) or (os.sep if os.path.isabs(pattern) else os.curdir)
+    return root, sorted(glob.glob(pattern, recursive=True))
+
+
+def _glob_files(pattern: str) -> Tuple[str, List[str]]:
+    """ Like _glob, but matching directories are replaced by the files under
+        them
+    """
+    root, matches = _glob(pattern)
+    files = []
+    for match in matches:
+        if os.path.isdir(match):
+            files.extend(ls(match, full_path=True, recursive=True))
+        else:
+            files.append(match)
+    return root, sorted(set(files))
+
+
 def already_exists(path: str) -> bool:
     """ Test to see if a file/directory already exists
 
@@ -31,7 +61,8 @@ def ls(path: str, full_path: bool = False, recursive: bool = False) -> List[str]
     Parameters
     -----------
     path : str
-        Local file or directory path
+        Local file or directory path, or a glob pattern (see _glob). Matches
+        are listed relative to the pattern's literal leading directory
 
     full_path : bool (default False)
         Include the absolute path or just the file name.  If False and
@@ -45,6 +76,15 @@ def ls(path: str, full_path: bool = False, recursive: bool = False) -> List[str]
     --------
     List[str]
     """
+    if patterns.is_pattern(path, already_exists):
+        root, matches = _glob(path)
+        if recursive:
+            _, matches = _glob_files(path)
+        result = [m + "/" if os.path.isdir(m) else m for m in matches]
+        if not full_path:
+            result = [os.path.relpath(m, root) + ("/" if m.endswith("/") else "") for m in result]
+        return result
+
     path = _norm_path(path)
     result: List = []
 
@@ -95,6 +135,10 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
     --------
     None
     """
+    if patterns.is_pattern(from_path, already_exists):
+        _glob_cp(from_path, to_path, overwrite)
+        return
+
     from_path, to_path = _norm_path(from_path), _norm_path(to_path)
 
     if os.path.isdir(from_path):
@@ -119,6 +163,27 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
         shutil.copy(from_path, to_path)
 
 
+def _glob_cp(pattern: str, to_path: str, overwrite: bool) -> None:
+    """ Copy the files matching pattern into to_path, keeping their paths
+        relative to the pattern's literal leading directory
+    """
+    root, files = _glob_files(pattern)
+    if not files:
+        raise ValueError(f"{pattern!r} does not match any files")
+
+    to_path = _norm_path(to_path)
+    to_files = [os.path.join(to_path, os.path.relpath(f, root)) for f in files]
+    if not overwrite:
+        for to_file in to_files:
+            if already_exists(to_file):
+                raise ValueError(f"Overwrite set to false but {to_file!r} already exists")
+
+    logger.info(f"Copying {len(files)} file(s) matching {pattern!r} to {to_path!r}")
+    for from_file, to_file in zip(files, to_files):
+        os.makedirs(os.path.dirname(to_file), exist_ok=True)
+        shutil.copy(from_file, to_file)
+
+
 def get_size(path: str) -> int:
     """ Return size of file/directory in bytes
 
@@ -132,6 +197,9 @@ def get_size(path: str) -> int:
     int
         Size in bytes
     """
+    if patterns.is_pattern(path, already_exists):
+        return sum(os.path.getsize(f) for f in _glob_files(path)[1])
+
     path = _norm_path(path)
 
     if os.path.isdir(path):
@@ -145,6 +213,144 @@ def get_size(path: str) -> int:
     return total_size
 
 
+def load_object_if_changed(path: str, etag: Optional[str] = None) -> Optional[Tuple[str, BinaryIO]]:
+    """ Open a file unless it is unchanged since it had the given tag
+
+    Local files have no ETag, so their modification time and size stand in
+    for one
+
+    Parameters
+    -----------
+    path : str
+        Path to file
+
+    etag : str
+        Tag of the version already loaded. If None, the file is opened
+
+    Returns
+    --------
+    Optional[Tuple[str, BinaryIO]]
+        None if the file's tag is still etag, otherwise its current tag and
+        the open file
+    """
+    path = _norm_path(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise ValueError(f"{path!r} does not exist")
+
+    tag = f"{stat.st_mtime_ns}-{stat.st_size}"
+    if tag == etag:
+        return None
+    return tag, open(path, "rb")
+
+
+def save_stream(chunks: Iterable[Union[bytes, bytearray, memoryview]], path: str) -> int:
+    """ Write chunks to a file as they are produced
+
+    The chunks are written to a temporary file next to path, which then
+    replaces path. If producing or writing a chunk fails, the temporary file
+    is removed and an existing file at path is left untouched
+
+    Parameters
+    -----------
+    chunks : Iterable[Union[bytes, bytearray, memoryview]]
+        Contents of the file, in order
+
+    path : str
+        Path to file
+
+    Returns
+    --------
+    int
+        Number of bytes written
+    """
+    path = _norm_path(path)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    num_bytes = 0
+    # Created like open(path, "wb") would, so the umask applies
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                num_bytes += f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return num_bytes
+
+
+def iter_object(path: str, chunk_size: int) -> Iterator[bytes]:
+    """ Read a file in chunks of at most chunk_size bytes
+
+    Parameters
+    -----------
+    path : str
+        Path to file
+
+    chunk_size : int
+        Maximum number of bytes per chunk
+
+    Returns
+    --------
+    Iterator[bytes]
+    """
+    path = _norm_path(path)
+    if not os.path.isfile(path):
+        raise ValueError(f"{path!r} does not exist")
+
+    return _iter_file(open(path, "rb"), chunk_size)
+
+
+def _iter_file(f, chunk_size: int) -> Iterator[bytes]:
+    with f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield chunk
+
+
+def du(path: str, depth: int = 1) -> Dict[str, int]:
+    """ Return the total size in bytes of each subdirectory of path
+
+    Parameters
+    -----------
+    path : str
+        Path to file/directory
+
+    depth : int (default 1)
+        Number of levels below path to report totals for. Files found above
+        that depth are reported individually
+
+    Returns
+    --------
+    Dict[str, int]
+        Mapping of paths relative to path (subdirectories end in "/") to their
+        size in bytes
+    """
+    if depth < 1:
+        raise ValueError(f"depth must be at least 1. {depth!r} passed")
+
+    path = _norm_path(path)
+
+    if not os.path.isdir(path):
+        return {os.path.basename(path): os.path.getsize(path)}
+
+    totals: Dict[str, int] = {}
+    for root, dirs, files in os.walk(path):
+        for f in files:
+            fp = os.path.join(root, f)
+            parts = fp[len(path)+1:].split(os.sep)
+            name = "/".join(parts[:depth])
+            if len(parts) > depth:
+                name += "/"
+            totals[name] = totals.get(name, 0) + os.path.getsize(fp)
+
+    return dict(sorted(totals.items()))
+
+
 def rm(path: str, dry_run: bool = False) -> None:
     """ Delete a file
 
@@ -161,6 +367,20 @@ def rm(path: str, dry_run: bool = False) -> None:
     --------
     None
     """
+    if patterns.is_pattern(path, already_exists):
+        _, matches = _glob(path)
+        num_files = len(_glob_files(path)[1])
+        if dry_run:
+            print(f"Deleting {path!r} would remove {num_files} file(s)")
+            return
+        logger.info(f"Removing {num_files} file(s) matching {path!r}")
+        for match in matches:
+            if os.path.isdir(match):
+                shutil.rmtree(match)
+            elif os.path.exists(match):
+                os.remove(match)
+        return
+
     path = _norm_path(path)
 
     num_files = len(ls(path, recursive=True))
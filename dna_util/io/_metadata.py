@@ -0,0 +1,147 @@
+""" Opt-in TTL cache for S3 metadata requests (existence, listings, sizes) """
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache(object):
+    """ Thread-safe cache of S3 metadata responses with a time to live
+
+    Entries are keyed by the kind of request (e.g. "exists", "ls") and the
+    normalized path ("bucket/key") the request was made for.
+
+    Parameters
+    -----------
+    ttl : float (default 60)
+        Number of seconds an entry stays valid
+    """
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        # Bumped by every invalidate, so fetches that overlap one are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, kind: str, path: str, fetch: Callable[[], Any]) -> Any:
+        """ Return the cached value for (kind, path), calling fetch on a miss
+        """
+        key = (kind, path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = fetch()
+
+        with self._lock:
+            # A write invalidated the cache while fetching, so value may be stale
+            if self._generation == generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """ Drop entries made stale by a write to path
+
+        This removes entries for the path itself, its parent "directories" and
+        anything underneath it. If path is None the whole cache is cleared.
+        """
+        with self._lock:
+            if path is None:
+                stale = list(self._entries)
+            else:
+                path = path.rstrip("/")
+                stale = [
+                    key for key in self._entries
+                    if key[1] == path
+                    or path.startswith(key[1] + "/")
+                    or key[1].startswith(path + "/")
+                ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            self._generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+
+# The active cache. None means metadata caching is disabled
+_cache: Optional[MetadataCache] = None
+
+
+def enable_metadata_cache(ttl: float = 60.0) -> None:
+    """ Cache S3 existence, directory, listing and size checks
+
+    Once enabled, already_exists, is_dir, ls, get_size and cp reuse responses
+    for up to ttl seconds instead of sending the same HEAD/LIST request to S3
+    again. Writes made through dna_util.io invalidate the affected entries,
+    but changes made by other processes are only seen once an entry expires.
+
+    Parameters
+    -----------
+    ttl : float (default 60)
+        Number of seconds a cached response stays valid
+
+    Returns
+    --------
+    None
+    """
+    global _cache
+    logger.info(f"Enabling S3 metadata cache with a ttl of {ttl}s")
+    _cache = MetadataCache(ttl)
+
+
+def disable_metadata_cache() -> None:
+    """ Turn off the S3 metadata cache and drop all cached entries
+    """
+    global _cache
+    _cache = None
+
+
+def metadata_cache_stats() -> Dict[str, int]:
+    """ Return counters for the S3 metadata cache
+
+    Returns
+    --------
+    Dict[str, int]
+        "hits" is the number of S3 requests avoided, "misses" the number of
+        requests sent, "invalidations" the number of entries dropped because
+        of writes and "entries" the current number of cached responses.
+        All counters are 0 if the cache is disabled.
+    """
+    if _cache is None:
+        return {"hits": 0, "misses": 0, "invalidations": 0, "entries": 0}
+    return _cache.stats()
+
+
+def cached(kind: str, path: str, fetch: Callable[[], Any]) -> Any:
+    """ Return fetch() through the metadata cache if it is enabled
+    """
+    cache = _cache
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(kind, path, fetch)
+
+
+def invalidate(path: str) -> None:
+    """ Invalidate cached metadata after a write to path
+    """
+    cache = _cache
+    if cache is not None:
+        cache.invalidate(path)
@@ -0,0 +1,356 @@
+""" Opt-in instrumentation of dna_util.io operations
+
+Each public operation (cp, load_object, save_object, ...) produces one Record
+with its latency, bytes moved and time spent in its serialize/transfer phases,
+and every S3 request sent by a client from _s3.get_fs produces a "request"
+Record. Records are handed to the enabled sinks; with no sink enabled the
+instrumentation is a couple of attribute lookups per operation.
+"""
+import time
+import bisect
+import logging
+import threading
+from contextvars import ContextVar
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# kind is "operation" or "request" (a single S3 API call, named by operation).
+# phases maps phase names ("serialize", "transfer") to seconds spent in them
+Record = namedtuple("Record", ["kind", "operation", "backend", "file_type", "seconds",
+                               "phases", "bytes_in", "bytes_out", "error"])
+
+
+class MetricsSink(object):
+    """ Receives a Record for every instrumented operation and S3 request
+
+    Subclasses implement emit. It is called from whichever thread ran the
+    operation, so it must be thread-safe
+    """
+    def emit(self, record: Record) -> None:
+        raise NotImplementedError
+
+
+class MemorySink(MetricsSink):
+    """ Aggregates records in memory by (kind, operation, backend, file_type)
+    """
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str, str, Optional[str]], Dict] = {}
+        self._lock = threading.Lock()
+
+    def emit(self, record: Record) -> None:
+        key = (record.kind, record.operation, record.backend, record.file_type)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "count": 0, "errors": 0, "seconds": 0.0, "bytes_in": 0, "bytes_out": 0,
+                    "phases": {}, "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                }
+            stats["count"] += 1
+            stats["errors"] += record.error
+            stats["seconds"] += record.seconds
+            stats["bytes_in"] += record.bytes_in
+            stats["bytes_out"] += record.bytes_out
+            for phase, seconds in record.phases.items():
+                stats["phases"][phase] = stats["phases"].get(phase, 0.0) + seconds
+            stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS, record.seconds)] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str, str, Optional[str]], Dict]:
+        """ Return a copy of the aggregated stats
+
+        Returns
+        --------
+        Dict[Tuple[str, str, str, Optional[str]], Dict]
+            Keyed by (kind, operation, backend, file_type). Each value holds
+            "count", "errors", total "seconds", "bytes_in", "bytes_out",
+            seconds per phase in "phases" and per-bucket (non-cumulative)
+            latency counts in "buckets", the last bucket being everything
+            above LATENCY_BUCKETS[-1]
+        """
+        with self._lock:
+            return {key: dict(stats, phases=dict(stats["phases"]), buckets=list(stats["buckets"]))
+                    for key, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class PrometheusSink(MemorySink):
+    """ MemorySink that can render its stats in the Prometheus text format
+    """
+    def render(self) -> str:
+        """ Return the aggregated stats in the Prometheus text exposition format
+
+        Operations are reported as dna_util_io_* metrics and S3 requests as
+        dna_util_s3_request_* metrics
+        """
+        lines: Dict[str, List[str]] = {}
+
+        def _add(name, metric_type, labels, value, suffix=""):
+            if name not in lines:
+                lines[name] = [f"# TYPE {name} {metric_type}"]
+            lines[name].append(f"{name}{suffix}{{{_labels(labels)}}} {value}")
+
+        for (kind, operation, backend, file_type), stats in sorted(self.snapshot().items(), key=repr):
+            if kind == "request":
+                prefix = "dna_util_s3_request"
+                labels = [("operation", operation)]
+            else:
+                prefix = "dna_util_io"
+                labels = [("operation", operation), ("backend", backend), ("file_type", file_type or "")]
+
+            _add(f"{prefix}_total", "counter", labels, stats["count"])
+            _add(f"{prefix}_errors_total", "counter", labels, stats["errors"])
+            if kind != "request":
+                _add(f"{prefix}_bytes_in_total", "counter", labels, stats["bytes_in"])
+                _add(f"{prefix}_bytes_out_total", "counter", labels, stats["bytes_out"])
+                for phase, seconds in sorted(stats["phases"].items()):
+                    _add(f"{prefix}_phase_seconds_total", "counter", labels + [("phase", phase)], seconds)
+
+            name = f"{prefix}_seconds"
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), stats["buckets"]):
+                cumulative += count
+                _add(name, "histogram", labels + [("le", bound)], cumulative, "_bucket")
+            _add(name, "histogram", labels, stats["seconds"], "_sum")
+            _add(name, "histogram", labels, stats["count"], "_count")
+
+        return "".join(line + "\n" for name in lines for line in lines[name])
+
+
+def _labels(labels) -> str:
+    return ",".join(f'{label}="{value}"' for label, value in labels)
+
+
+class LoggingSink(MetricsSink):
+    """ Logs every operation at level, and every S3 request at DEBUG
+
+    Parameters
+    -----------
+    level : int (default logging.INFO)
+        Level operations are logged at
+
+    log : logging.Logger
+        Logger to use. If None, this module's logger is used
+    """
+    def __init__(self, level: int = logging.INFO, log: Optional[logging.Logger] = None):
+        self.level = level
+        self.log = log if log is not None else logger
+
+    def emit(self, record: Record) -> None:
+        status = "failed" if record.error else "ok"
+        if record.kind == "request":
+            self.log.debug(f"S3 {record.operation} {status} in {record.seconds:.3f}s")
+            return
+        phases = "".join(f", {phase} {seconds:.3f}s" for phase, seconds in sorted(record.phases.items()))
+        self.log.log(self.level, f"{record.operation} ({record.backend}, {record.file_type}) {status} "
+                                 f"in {record.seconds:.3f}s{phases}, {record.bytes_in} bytes in, "
+                                 f"{record.bytes_out} bytes out")
+
+
+class _Measurement(object):
+    """ Times an operation and collects its phases and bytes, emitting a
+        Record on exit
+    """
+    def __init__(self, operation: str, backend: str, file_type: Optional[str]):
+        self.operation = operation
+        self.backend = backend
+        self.file_type = file_type
+        self.phases: Dict[str, float] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Worker threads of load_many/save_many add to the same measurement
+        self._lock = threading.Lock()
+
+    def add(self, bytes_in: int = 0, bytes_out: int = 0) -> None:
+        with self._lock:
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def __enter__(self):
+        _local.measurement = self
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        _local.measurement = None
+        _emit(Record("operation", self.operation, self.backend, self.file_type, seconds,
+                     self.phases, self.bytes_in, self.bytes_out, exc_type is not None))
+        return False
+
+
+class _Phase(object):
+    def __init__(self, measurement: _Measurement, name: str):
+        self.measurement = measurement
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.measurement.add_phase(self.name, time.perf_counter() - self._start)
+        return False
+
+
+class _Within(object):
+    def __init__(self, measurement: _Measurement):
+        self.measurement = measurement
+
+    def __enter__(self):
+        self._previous = getattr(_local, "measurement", None)
+        _local.measurement = self.measurement
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.measurement = self._previous
+        return False
+
+
+class _NullContext(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL = _NullContext()
+
+# The enabled sinks. Replaced rather than mutated so readers need no lock
+_sinks: Tuple[MetricsSink, ...] = ()
+_sinks_lock = threading.Lock()
+# The operation being measured in each thread
+_local = threading.local()
+# Start time of the S3 request being sent by each thread or asyncio task
+_request_start: ContextVar = ContextVar("dna_util_request_start", default=None)
+
+
+def enable_metrics(sink: Optional[MetricsSink] = None) -> MetricsSink:
+    """ Start recording metrics for dna_util.io operations into sink
+
+    Can be called several times to record into several sinks
+
+    Parameters
+    -----------
+    sink : MetricsSink
+        Where records are sent, e.g. a MemorySink, PrometheusSink or
+        LoggingSink. If None, a new MemorySink is used
+
+    Returns
+    --------
+    MetricsSink
+        The sink that was enabled
+    """
+    global _sinks
+    if sink is None:
+        sink = MemorySink()
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks = _sinks + (sink,)
+    return sink
+
+
+def disable_metrics(sink: Optional[MetricsSink] = None) -> None:
+    """ Stop sending metrics to sink, or to every sink if sink is None
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if sink is not None and s is not sink)
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def measure(operation: str, backend: str, file_type: Optional[str] = None):
+    """ Return a context manager measuring an operation
+
+    Operations called from within another operation in the same thread (e.g.
+    the existence check of save_object) are attributed to the outer one
+    """
+    if not _sinks or getattr(_local, "measurement", None) is not None:
+        return _NULL
+    return _Measurement(operation, backend, file_type)
+
+
+def phase(name: str):
+    """ Return a context manager adding its duration to the named phase of
+        the operation being measured in this thread
+    """
+    measurement = getattr(_local, "measurement", None)
+    if measurement is None:
+        return _NULL
+    return _Phase(measurement, name)
+
+
+def add_bytes(bytes_in: int = 0, bytes_out: int = 0) -> None:
+    """ Count bytes read from / written to storage by the operation being
+        measured in this thread
+    """
+    measurement = getattr(_local, "measurement", None)
+    if measurement is not None:
+        measurement.add(bytes_in, bytes_out)
+
+
+def current() -> Optional[_Measurement]:
+    """ Return the operation being measured in this thread, if any
+    """
+    return getattr(_local, "measurement", None)
+
+
+def within(measurement: Optional[_Measurement]):
+    """ Return a context manager attributing what is measured in this thread to
+        measurement, an operation being measured in another thread (e.g. the
+        load_many a worker thread is loading a file for). Does nothing if
+        measurement is None
+    """
+    if measurement is None:
+        return _NULL
+    return _Within(measurement)
+
+
+def _emit(record: Record) -> None:
+    for sink in _sinks:
+        try:
+            sink.emit(record)
+        except Exception:
+            # Metrics must never break the I/O they describe
+            logger.exception(f"Metrics sink {sink!r} failed")
+
+
+def install(client) -> None:
+    """ Record every request sent by a boto3 or aiobotocore S3 client.
+        Installing on the same client again does nothing
+    """
+    if getattr(client, "_dna_util_metrics", False):
+        return
+    client.meta.events.register("before-send.s3", _request_started, unique_id="dna-util-metrics-start")
+    client.meta.events.register("needs-retry.s3", _request_finished, unique_id="dna-util-metrics-end")
+    client._dna_util_metrics = True
+
+
+def _request_started(**kwargs) -> None:
+    if _sinks:
+        _request_start.set(time.perf_counter())
+
+
+def _request_finished(response=None, caught_exception=None, operation=None, **kwargs) -> None:
+    start = _request_start.get()
+    if start is None:
+        return
+    _request_start.set(None)
+    error = caught_exception is not None or (response is not None and response[0].status_code >= 400)
+    _emit(Record("request", getattr(operation, "name", "unknown"), "s3", None,
+                 time.perf_counter() - start, {}, 0, 0, error))
@@ -0,0 +1,162 @@
+""" In-process LRU of deserialized objects for load_object(..., cache=True) """
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+class ObjectCache(object):
+    """ Size-bounded LRU of deserialized objects, keyed by what was loaded and
+        validated by the version (ETag) they were loaded from
+
+    Loads of the same key are single-flight: callers arriving while a load is
+    in progress wait for its result instead of sending their own requests.
+
+    Parameters
+    -----------
+    max_bytes : int (default DEFAULT_MAX_BYTES)
+        Total size of the cached objects, measured as the number of bytes they
+        were deserialized from. Least recently used objects are evicted beyond
+        it, and larger objects aren't cached at all
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._bytes = 0
+        # key -> (etag, obj, size)
+        self._entries: "OrderedDict[Hashable, Tuple[str, Any, int]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: Hashable,
+             fetch: Callable[[Optional[str]], Optional[Tuple[str, Any, int]]]) -> Any:
+        """ Return the object for key
+
+        fetch(etag) is called with the cached entry's ETag (None if there is
+        none) and returns None if the object hasn't changed since, or a new
+        (etag, obj, size) otherwise
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+            entry = self._entries.get(key)
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = fetch(entry[0] if entry is not None else None)
+            with self._lock:
+                if result is None:
+                    self.hits += 1
+                    obj = entry[1]
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                else:
+                    self.misses += 1
+                    obj = result[1]
+                    self._store(key, result)
+            future.set_result(obj)
+            return obj
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _store(self, key: Hashable, entry: Tuple[str, Any, int]) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        if entry[2] > self.max_bytes:
+            logger.debug(f"Not caching {key!r}: {entry[2]} bytes is above the {self.max_bytes} byte limit")
+            return
+        self._entries[key] = entry
+        self._bytes += entry[2]
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+_cache = ObjectCache()
+
+
+def get_cache() -> ObjectCache:
+    return _cache
+
+
+def set_object_cache_size(max_bytes: int) -> None:
+    """ Set the size limit of the cache used by load_object(..., cache=True)
+
+    Parameters
+    -----------
+    max_bytes : int
+        Total size of the cached objects, measured as the number of bytes they
+        were loaded from. Least recently used objects are evicted beyond it
+
+    Returns
+    --------
+    None
+    """
+    _cache.resize(max_bytes)
+
+
+def clear_object_cache() -> None:
+    """ Drop every object cached by load_object(..., cache=True) and reset
+        its counters
+    """
+    _cache.clear()
+
+
+def object_cache_stats() -> Dict[str, int]:
+    """ Return counters for the load_object(..., cache=True) cache
+
+    Returns
+    --------
+    Dict[str, int]
+        "hits" counts loads answered from the cache after checking the object
+        hadn't changed, "misses" loads that fetched and deserialized the
+        object, "coalesced" callers that waited for a load of the same key
+        already in progress, "evictions" objects evicted for space, and
+        "entries" and "bytes" the current contents
+    """
+    return _cache.stats()
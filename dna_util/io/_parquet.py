@@ -4,9 +4,9 @@ import subprocess
 import sys
 
 import pandas as pd
-import s3fs
 
 from dna_util.io import _s3 as s3
+from dna_util.io import _metrics as metrics
 from dna_util.util import parse_args
 
 logger = logging.getLogger(__name__)
@@ -42,10 +42,11 @@ def save_parquet(df: pd.DataFrame, path: str, engine: str = "auto",
         else:
             raise ImportError("Neither fastparquet nor pyarrow are installed")
 
-    if engine == "fastparquet":
-        save_parquet_fp(df, path, **kwargs)
-    else:
-        save_parquet_pa(df, path, **kwargs)
+    with metrics.measure("save_parquet", "s3" if s3.is_s3path(path) else "local", "parquet"):
+        if engine == "fastparquet":
+            save_parquet_fp(df, path, **kwargs)
+        else:
+            save_parquet_pa(df, path, **kwargs)
 
 
 def load_parquet(path: str, engine: str = "auto",
@@ -78,10 +79,11 @@ def load_parquet(path: str, engine: str = "auto",
         else:
             raise ImportError("Neither fastparquet nor pyarrow are installed")
 
-    if engine == "fastparquet":
-        return load_parquet_fp(path, **kwargs)
-    else:
-        return load_parquet_pa(path, **kwargs)
+    with metrics.measure("load_parquet", "s3" if s3.is_s3path(path) else "local", "parquet"):
+        if engine == "fastparquet":
+            return load_parquet_fp(path, **kwargs)
+        else:
+            return load_parquet_pa(path, **kwargs)
 
 
 def save_parquet_pa(df: pd.DataFrame, path: str, **kwargs) -> None:
@@ -145,28 +147,30 @@ def save_parquet_pa(df: pd.DataFrame, path: str, **kwargs) -> None:
     partition_cols = kwargs.pop("partition_cols", None)
 
     # Convert the dataframe into a pyArrow Table object
-    table = pa.Table.from_pandas(
-        df,
-        schema=schema,
-        preserve_index=preserve_index,
-        nthreads=nthreads,
-        columns=columns
-    )
+    with metrics.phase("serialize"):
+        table = pa.Table.from_pandas(
+            df,
+            schema=schema,
+            preserve_index=preserve_index,
+            nthreads=nthreads,
+            columns=columns
+        )
 
     if not s3.is_s3path(path):
         fs = None
-    elif fs is None:
-        fs = s3fs.S3FileSystem()
+    else:
+        fs = s3.get_fs(fs)
 
     logger.info("Writing Arrow Table to Parquet Dataset")
 
-    pq.write_to_dataset(
-        table,
-        path,
-        partition_cols=partition_cols,
-        filesystem=fs,
-        preserve_index=preserve_index
-    )
+    with metrics.phase("transfer"):
+        pq.write_to_dataset(
+            table,
+            path,
+            partition_cols=partition_cols,
+            filesystem=fs,
+            preserve_index=preserve_index
+        )
 
     logger.info("Done.")
 
@@ -219,7 +223,7 @@ def save_parquet_fp(df: pd.DataFrame, path: str, **kwargs) -> None:
     file_scheme = kwargs.pop("file_scheme", "hive")
 
     if s3.is_s3path(path):
-        fs = fs or s3fs.S3FileSystem()
+        fs = s3.get_fs(fs)
         myopen = fs.open
     else:
         myopen = open
@@ -282,21 +286,23 @@ def load_parquet_pa(path: str, **kwargs) -> pd.DataFrame:
 
     if not s3.is_s3path(path):
         fs = None
-    elif fs is None:
-        fs = s3fs.S3FileSystem()
+    else:
+        fs = s3.get_fs(fs)
 
-    dataset = pq.ParquetDataset(
-        path,
-        filesystem=fs,
-        split_row_groups=split_row_groups,
-        filters=filters
-    )
+    with metrics.phase("transfer"):
+        dataset = pq.ParquetDataset(
+            path,
+            filesystem=fs,
+            split_row_groups=split_row_groups,
+            filters=filters
+        )
 
-    table = dataset.read(columns=columns)
+        table = dataset.read(columns=columns)
 
     logger.info(f"Converting PyArrow Table to Pandas DataFrame. kwargs passed {kwargs!r}")
 
-    return table.to_pandas(**kwargs)
+    with metrics.phase("serialize"):
+        return table.to_pandas(**kwargs)
 
 
 def load_parquet_fp(path: str, **kwargs) -> pd.DataFrame:
@@ -328,7 +334,7 @@ def load_parquet_fp(path: str, **kwargs) -> pd.DataFrame:
     kwargs = {k: v for k, v in kwargs.items() if k in set(kwargs) - set(to_pandas_args)}
 
     if s3.is_s3path(path):
-        fs = fs or s3fs.S3FileSystem()
+        fs = s3.get_fs(fs)
         myopen = fs.open
     else:
         myopen = open
@@ -0,0 +1,138 @@
+""" Container format for the "pickle5" file type
+
+Objects are pickled with protocol 5, and the large buffers they expose (e.g.
+the data of NumPy arrays and pandas DataFrames) are written out-of-band after
+the pickle stream instead of being copied into it. On load the buffers are
+handed to pickle as slices of the file's buffer, so arrays are reconstructed
+without copying their data.
+
+Layout (little-endian):
+    header        MAGIC, format version (u32), number of buffers (u32),
+                  offset (u64) and length (u64) of the pickle stream
+    buffer table  offset (u64) and length (u64) of each buffer
+    the pickle stream, then each buffer starting at a multiple of ALIGNMENT
+
+Python < 3.8 needs the pickle5 backport package.
+"""
+import struct
+import pickle
+import logging
+from typing import Any, Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DNAPKL5\x00"
+VERSION = 1
+# Buffers start at multiples of this many bytes so arrays viewing them are aligned
+ALIGNMENT = 64
+# Buffers smaller than this are kept in the pickle stream
+MIN_BUFFER_SIZE = 64 * 2 ** 10
+
+_HEADER = struct.Struct("<8sIIQQ")
+_ENTRY = struct.Struct("<QQ")
+
+
+def _pickle_module():
+    if pickle.HIGHEST_PROTOCOL >= 5:
+        return pickle
+    try:
+        import pickle5
+        return pickle5
+    except ImportError:
+        raise ImportError("The 'pickle5' file type requires Python 3.8+ or the pickle5 package")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def dump_chunks(obj: object, min_buffer_size: int = MIN_BUFFER_SIZE,
+                **kwargs) -> Iterator[Union[bytes, memoryview]]:
+    """ Serialize obj into the container format, as chunks to be written in
+        order
+
+    The out-of-band buffers are yielded as views of obj's memory rather than
+    copies, so obj must not be modified until the chunks are consumed
+
+    Parameters
+    -----------
+    obj : object
+        Object to pickle
+
+    min_buffer_size : int (default MIN_BUFFER_SIZE)
+        Buffers of at least this many bytes are written out-of-band
+
+    kwargs : Dict
+        Passed to pickle.dumps
+
+    Returns
+    --------
+    Iterator[Union[bytes, memoryview]]
+    """
+    buffers: List[memoryview] = []
+
+    def _buffer_callback(buffer) -> bool:
+        raw = buffer.raw()
+        if raw.nbytes < min_buffer_size:
+            # Serialized in-band
+            return True
+        buffers.append(raw)
+        return False
+
+    data = _pickle_module().dumps(obj, protocol=5, buffer_callback=_buffer_callback, **kwargs)
+
+    pickle_offset = _HEADER.size + _ENTRY.size * len(buffers)
+    entries, offset = [], pickle_offset + len(data)
+    for raw in buffers:
+        offset = _align(offset)
+        entries.append((offset, raw.nbytes))
+        offset += raw.nbytes
+    logger.debug(f"Pickled {len(data)} bytes in-band and {len(buffers)} buffer(s) out-of-band")
+
+    yield _HEADER.pack(MAGIC, VERSION, len(buffers), pickle_offset, len(data)) + \
+        b"".join(_ENTRY.pack(*entry) for entry in entries)
+    yield data
+
+    position = pickle_offset + len(data)
+    for (offset, length), raw in zip(entries, buffers):
+        if offset > position:
+            yield bytes(offset - position)
+        yield raw
+        position = offset + length
+
+
+def dumps(obj: object, **kwargs) -> bytes:
+    """ Serialize obj into the container format in memory. See dump_chunks
+    """
+    return b"".join(dump_chunks(obj, **kwargs))
+
+
+def loads(buffer: Union[bytes, bytearray, memoryview], **kwargs) -> Any:
+    """ Load an object from a buffer holding the container format
+
+    Out-of-band buffers are passed to pickle as slices of buffer, so objects
+    such as NumPy arrays share its memory (and are read-only if it is)
+
+    Parameters
+    -----------
+    buffer : Union[bytes, bytearray, memoryview]
+        The whole container, e.g. a downloaded buffer or an mmap of a file
+
+    kwargs : Dict
+        Passed to pickle.loads
+
+    Returns
+    --------
+    Any
+    """
+    view = memoryview(buffer).cast("B")
+    if len(view) < _HEADER.size or bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a 'pickle5' file. It may have been saved with file_type='pickle'")
+
+    _, version, num_buffers, pickle_offset, pickle_length = _HEADER.unpack_from(view)
+    if version != VERSION:
+        raise ValueError(f"Unsupported 'pickle5' format version {version!r}")
+
+    table = view[_HEADER.size: _HEADER.size + _ENTRY.size * num_buffers]
+    buffers = [view[offset: offset + length] for offset, length in _ENTRY.iter_unpack(table)]
+    return _pickle_module().loads(view[pickle_offset: pickle_offset + pickle_length], buffers=buffers, **kwargs)
@@ -0,0 +1,338 @@
+""" Central retry policy and client-side rate limiting for S3 requests
+
+Every boto3 client handed out by _s3.get_fs (and every aiobotocore client
+handed out by aio.get_client) routes its retries through the shared
+RetryPolicy (replacing botocore's own retry handler), so every S3 call made by
+dna_util.io, including those made inside s3fs, backs off the same way and
+feeds the same TokenBucket.
+"""
+import time
+import asyncio
+import random
+import logging
+import threading
+from typing import Dict, Optional
+
+from botocore.exceptions import (ClientError, ConnectionClosedError, ConnectTimeoutError,
+                                 EndpointConnectionError, ReadTimeoutError)
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_CODES = {"SlowDown", "Throttling", "ThrottlingException", "RequestLimitExceeded",
+                  "TooManyRequests", "RequestThrottled", "503"}
+SERVER_ERROR_CODES = {"InternalError", "ServiceUnavailable", "RequestTimeout"}
+# Dropped connections and timeouts. Other botocore errors (missing credentials,
+# invalid parameters, ...) are configuration mistakes and fail fast
+CONNECTION_ERRORS = (EndpointConnectionError, ConnectionClosedError, ReadTimeoutError, ConnectTimeoutError,
+                     ConnectionError, TimeoutError)
+
+# Total number of attempts made for a request failing with each class of error
+DEFAULT_MAX_ATTEMPTS = {"throttle": 10, "server": 5, "connection": 5}
+DEFAULT_BASE_DELAY = 0.05
+DEFAULT_MAX_DELAY = 20.0
+
+# Bounds (requests per second) of the client-side rate limit
+MIN_RATE = 5.0
+MAX_RATE = 5500.0
+
+
+def classify(status: Optional[int] = None, code: Optional[str] = None,
+             exception: Optional[BaseException] = None) -> Optional[str]:
+    """ Return the class of a failed request ("throttle", "server" or
+        "connection"), or None if it shouldn't be retried
+    """
+    if exception is not None:
+        if isinstance(exception, CONNECTION_ERRORS):
+            return "connection"
+        return None
+    if code in THROTTLE_CODES or status in (429, 503):
+        return "throttle"
+    if code in SERVER_ERROR_CODES or (status or 0) >= 500:
+        return "server"
+    return None
+
+
+def _error_chain(err: Optional[BaseException]):
+    """ Yield err and the exceptions it was raised from. s3fs re-raises
+        botocore errors as e.g. IOError("Copy failed")
+    """
+    while err is not None:
+        yield err
+        err = err.__cause__ or err.__context__
+
+
+def classify_exception(err: BaseException) -> Optional[str]:
+    """ Return the class of the error a request failed with (see classify),
+        looking through the exceptions it was raised from
+    """
+    for e in _error_chain(err):
+        if isinstance(e, ClientError):
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            return classify(status, e.response.get("Error", {}).get("Code"))
+        error_class = classify(exception=e)
+        if error_class is not None:
+            return error_class
+    return None
+
+
+def is_throttle_error(err: BaseException) -> bool:
+    """ Did S3 ask us to slow down?
+    """
+    return classify_exception(err) == "throttle"
+
+
+def is_transient_error(err: BaseException) -> bool:
+    """ Is the error worth retrying (throttling, server errors, dropped
+        connections and timeouts)?
+    """
+    return classify_exception(err) is not None
+
+
+class TokenBucket(object):
+    """ Client-side limit on the rate of S3 requests
+
+    Requests aren't limited until S3 throttles one. The allowed rate is then
+    cut to half the rate requests were being sent at (and halved again on
+    every further throttle), and grows by 0.1% for every successful request.
+    Once it climbs past max_rate, limiting is switched off again.
+
+    Parameters
+    -----------
+    min_rate : float (default MIN_RATE)
+        Lowest allowed requests per second
+
+    max_rate : float (default MAX_RATE)
+        Rate above which requests are no longer limited
+    """
+    def __init__(self, min_rate: float = MIN_RATE, max_rate: float = MAX_RATE):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        # Requests per second, None while unlimited
+        self.rate: Optional[float] = None
+        self.throttles = 0
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self._window_start = self._last_refill
+        self._window_count = 0
+        self._measured_rate = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """ Block until a request may be sent
+        """
+        wait = self._try_acquire()
+        while wait:
+            time.sleep(wait)
+            wait = self._try_acquire(count=False)
+
+    async def acquire_async(self) -> None:
+        """ Wait, without blocking the event loop, until a request may be sent
+        """
+        wait = self._try_acquire()
+        while wait:
+            await asyncio.sleep(wait)
+            wait = self._try_acquire(count=False)
+
+    def _try_acquire(self, count: bool = True) -> float:
+        """ Take a token if one is available. Returns 0 if it was, otherwise
+            the number of seconds until the next one is
+        """
+        with self._lock:
+            now = time.monotonic()
+            if count:
+                self._measure(now)
+            if self.rate is None:
+                return 0.0
+            self._tokens = min(max(self.rate, 1.0),
+                               self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def throttled(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            current = self.rate if self.rate is not None else self._sending_rate(now)
+            self.rate = max(self.min_rate, current / 2)
+            self._tokens = min(self._tokens, 1.0)
+            self._last_refill = now
+            self.throttles += 1
+            logger.info(f"Throttled by S3, limiting requests to {self.rate:.0f}/s")
+
+    def succeeded(self) -> None:
+        with self._lock:
+            if self.rate is None:
+                return
+            self.rate *= 1.001
+            if self.rate > self.max_rate:
+                logger.info("No longer limiting the rate of S3 requests")
+                self.rate = None
+
+    def _measure(self, now: float) -> None:
+        self._window_count += 1
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self._measured_rate = self._window_count / elapsed
+            self._window_start, self._window_count = now, 0
+
+    def _sending_rate(self, now: float) -> float:
+        elapsed = now - self._window_start
+        if elapsed >= 0.1:
+            return max(self._measured_rate, self._window_count / elapsed)
+        return self._measured_rate or self.max_rate
+
+
+class RetryPolicy(object):
+    """ Decides whether and after how long a failed S3 request is retried
+
+    Delays grow exponentially with the number of attempts, with full jitter
+    (a uniformly random delay up to the exponential bound) so that threads
+    throttled together don't retry together.
+
+    Parameters
+    -----------
+    max_attempts : Dict[str, int] (default DEFAULT_MAX_ATTEMPTS)
+        Total attempts for a request failing with each class of error
+        ("throttle", "server" or "connection"). Missing classes use the default
+
+    base_delay : float (default DEFAULT_BASE_DELAY)
+        Upper bound in seconds of the first retry's delay
+
+    max_delay : float (default DEFAULT_MAX_DELAY)
+        Upper bound in seconds of any delay
+
+    token_bucket : TokenBucket
+        Rate limit shared by every request. If None, a new one is created
+    """
+    def __init__(self, max_attempts: Optional[Dict[str, int]] = None,
+                 base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 token_bucket: Optional[TokenBucket] = None):
+        self.max_attempts = dict(DEFAULT_MAX_ATTEMPTS, **(max_attempts or {}))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.token_bucket = token_bucket if token_bucket is not None else TokenBucket()
+        self.retries = {error_class: 0 for error_class in self.max_attempts}
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def delay(self, error_class: Optional[str], attempts: int) -> Optional[float]:
+        """ Return the number of seconds to wait before retrying a request that
+            failed for the attempts-th time, or None to give up
+        """
+        if error_class is None:
+            return None
+        with self._lock:
+            if attempts >= self.max_attempts.get(error_class, 1):
+                self.failures += 1
+                return None
+            self.retries[error_class] = self.retries.get(error_class, 0) + 1
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = {f"{error_class}_retries": count for error_class, count in self.retries.items()}
+            stats["failures"] = self.failures
+        stats["throttles"] = self.token_bucket.throttles
+        stats["rate_limit"] = self.token_bucket.rate
+        return stats
+
+
+# The policy used by every client passed through install
+_policy = RetryPolicy()
+
+
+def set_retry_policy(policy: Optional[RetryPolicy] = None) -> None:
+    """ Replace the retry policy used for every S3 request made by dna_util.io
+
+    Parameters
+    -----------
+    policy : RetryPolicy
+        The new policy. If None, a policy with the default settings is used
+
+    Returns
+    --------
+    None
+    """
+    global _policy
+    _policy = policy if policy is not None else RetryPolicy()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """ Return the retry policy used for every S3 request made by dna_util.io
+    """
+    return _policy
+
+
+def retry_stats() -> Dict[str, float]:
+    """ Return counters for the S3 retry policy
+
+    Returns
+    --------
+    Dict[str, float]
+        "<class>_retries" is the number of retries made for each error class,
+        "failures" the number of requests that ran out of attempts,
+        "throttles" the number of throttled responses and "rate_limit" the
+        current client-side limit in requests per second (None if unlimited)
+    """
+    return _policy.stats()
+
+
+def install(client) -> None:
+    """ Route the retries of a boto3 or aiobotocore S3 client through the
+        shared policy
+
+    botocore's own retry handler is removed, and every attempt waits for the
+    shared TokenBucket (asynchronously for aiobotocore clients, whose event
+    hooks await coroutine handlers). Installing on the same client again does
+    nothing
+    """
+    if getattr(client, "_dna_util_retry", False):
+        return
+    events = client.meta.events
+    before_send = _before_send_async if _is_async(client) else _before_send
+    events.unregister("needs-retry.s3", unique_id="retry-config-s3")
+    events.register("needs-retry.s3", _needs_retry, unique_id="dna-util-retry")
+    events.register("before-send.s3", before_send, unique_id="dna-util-rate-limit")
+    client._dna_util_retry = True
+
+
+def _is_async(client) -> bool:
+    return asyncio.iscoroutinefunction(getattr(client, "_make_api_call", None))
+
+
+def _before_send(**kwargs) -> None:
+    _policy.token_bucket.acquire()
+
+
+async def _before_send_async(**kwargs) -> None:
+    await _policy.token_bucket.acquire_async()
+
+
+def _needs_retry(response=None, attempts: int = 1, caught_exception=None,
+                 operation=None, **kwargs) -> Optional[float]:
+    """ botocore needs-retry handler. Returns the delay before the next
+        attempt, or None if the request shouldn't be retried
+    """
+    policy = _policy
+    status, code = None, None
+    if response is not None:
+        status = response[0].status_code
+        code = response[1].get("Error", {}).get("Code")
+
+    error_class = classify(status, code, caught_exception)
+    if error_class is None:
+        if caught_exception is None and (status or 0) < 400:
+            policy.token_bucket.succeeded()
+        return None
+
+    if error_class == "throttle":
+        policy.token_bucket.throttled()
+
+    delay = policy.delay(error_class, attempts)
+    if delay is not None:
+        name = getattr(operation, "name", "request")
+        logger.debug(f"Retrying {name} after {error_class} error "
+                     f"({code or caught_exception!r}), attempt {attempts}, in {delay:.2f}s")
+    return delay
@@ -1,14 +1,118 @@
 import os
-from typing import Optional, Tuple, List, io
+import json
+import functools
+import threading
+from typing import Optional, Tuple, List, Dict, Iterable, Iterator, Union, io
 import logging
+from collections import namedtuple
 from concurrent.futures import ThreadPoolExecutor
 
 import s3fs
+from botocore.exceptions import ClientError
 
 from dna_util.io import _local as local
+from dna_util.io import _glob as patterns
+from dna_util.io import _metadata as metadata
+from dna_util.io import _disk_cache as disk_cache
+from dna_util.io import _retry as retry
+from dna_util.io import _metrics as metrics
+from dna_util.io import _transfer as transfer
 
 logger = logging.getLogger(__name__)
 
+# Number of threads used when copying a directory of files. Shared
+# S3FileSystem instances size their connection pool to match.
+DEFAULT_NUM_THREADS = 100
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+# Number of DeleteObjects requests in flight at once
+DEFAULT_DELETE_THREADS = 10
+
+# Number of sub-prefixes of a large prefix listed at once
+DEFAULT_LIST_THREADS = 32
+# Maximum number of "/" levels of common prefixes expanded to find
+# sub-prefixes to list concurrently
+LIST_SHARD_DEPTH = 2
+
+# Paths in the same "directory" are checked by exists_many with ranged
+# listings, rather than a HEAD request each, once there are this many of them.
+# Listing stops, and the remaining paths get HEAD requests, as soon as a page
+# answers fewer than this many paths (the keys are too sparse)
+EXISTS_LIST_MIN_PATHS = 3
+# Keys per listing page requested by exists_many
+EXISTS_LIST_PAGE_SIZE = 1000
+
+# Outcome of one (src, dst) pair of cp_many. size is the number of bytes
+# copied and error the exception it failed with, or None if it was copied
+CopyStatus = namedtuple("CopyStatus", ["src", "dst", "size", "error"])
+
+# Process-wide S3FileSystem instances keyed by their configuration
+_fs_registry: Dict[str, s3fs.S3FileSystem] = {}
+_fs_registry_lock = threading.Lock()
+
+
+def get_fs(fs: Optional[s3fs.S3FileSystem] = None,
+           pool_size: int = DEFAULT_NUM_THREADS, **kwargs) -> s3fs.S3FileSystem:
+    """ Return a long-lived S3FileSystem shared across dna_util.io calls
+
+    A single instance is kept per process for each combination of arguments
+    (credentials, profile, endpoint, ...), so repeated calls reuse the same
+    session, resolved credentials and warm connection pool instead of building
+    a new client every time.
+
+    Parameters
+    -----------
+    fs : s3fs.S3FileSystem
+        If specified, it is returned as is. Its client keeps its own retry
+        settings and isn't instrumented by dna_util.io.metrics; call
+        dna_util.io._retry.install / _metrics.install on fs.s3 to opt in
+
+    pool_size : int (default DEFAULT_NUM_THREADS)
+        Maximum number of pooled connections. Should be at least the number of
+        threads used when copying files
+
+    **kwargs
+        Extra args to be passed to S3FileSystem.  e.g. passing
+        profile_name="..." will use that profile defined in your
+        ~/.aws/credentials file
+
+    Returns
+    --------
+    s3fs.S3FileSystem
+    """
+    if fs is not None:
+        return fs
+
+    config_kwargs = dict(kwargs.pop("config_kwargs", None) or {})
+    config_kwargs["max_pool_connections"] = max(
+        pool_size, config_kwargs.get("max_pool_connections", 0)
+    )
+
+    key = json.dumps([os.getpid(), kwargs, config_kwargs], sort_keys=True, default=repr)
+    with _fs_registry_lock:
+        fs = _fs_registry.get(key)
+        if fs is None:
+            logger.debug(f"Creating shared S3FileSystem with pool size {config_kwargs['max_pool_connections']}")
+            fs = s3fs.S3FileSystem(config_kwargs=config_kwargs, **kwargs)
+            retry.install(fs.s3)
+            metrics.install(fs.s3)
+            _fs_registry[key] = fs
+
+    return fs
+
+
+def clear_fs_registry() -> None:
+    """ Drop all shared S3FileSystem instances held by get_fs
+    """
+    with _fs_registry_lock:
+        _fs_registry.clear()
+
+
+# A forked child must not reuse the parent's connections
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=clear_fs_registry)
+
 
 def _norm_s3_path(path: str) -> str:
     new_path = os.path.normpath(path.replace("s3://", "").replace("s3n://", ""))
@@ -16,6 +120,66 @@ def _norm_s3_path(path: str) -> str:
     return new_path
 
 
+def _ls_detail(path: str, fs: s3fs.S3FileSystem) -> List[Dict]:
+    """ fs.ls(path, detail=True) through the metadata cache """
+    path = _norm_s3_path(path)
+    return metadata.cached("ls", path, lambda: _list_dir(path, fs))
+
+
+def _list_dir(path: str, fs: s3fs.S3FileSystem) -> List[Dict]:
+    """ fs.ls(path, detail=True) without s3fs's listing cache
+
+    s3fs keeps listings until they are invalidated and takes the size of the
+    files it opens from them, so a listing cached by one call could truncate
+    a read of a file rewritten since. The metadata cache is the only cache of
+    listings shared between calls
+    """
+    bucket, prefix = _list_prefix(path)
+    try:
+        objects, prefixes = _list_objects(bucket, prefix, fs, delimiter=True)
+    except ClientError:
+        # Not accessible, as in s3fs
+        objects, prefixes = [], []
+
+    files = [dict(obj, Key=f"{bucket}/{obj['Key']}") for obj in objects if len(obj["Key"]) > len(prefix)]
+    files += [{"Key": f"{bucket}/{p[:-1]}", "Size": 0, "StorageClass": "DIRECTORY"} for p in prefixes]
+    if not files:
+        if not prefix:
+            raise FileNotFoundError(path)
+        # Not a "directory", so path should be a single file
+        files = [fs.info(path, refresh=True)]
+    return files
+
+
+def _exists(path: str, fs: s3fs.S3FileSystem) -> bool:
+    """ fs.exists(path) without s3fs's listing cache (see _list_dir)
+    """
+    path = _norm_s3_path(path)
+    if "/" not in path and path in fs.ls("", refresh=True):
+        return True
+    try:
+        _list_dir(path, fs)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _walk(path: str, fs: s3fs.S3FileSystem) -> List[str]:
+    """ Every file key (prefixed with the bucket) below path through the
+        metadata cache
+    """
+    path = _norm_s3_path(path)
+    bucket = path.split("/")[0]
+    return metadata.cached("walk", path, lambda: [f"{bucket}/{obj['Key']}" for obj in _iter_objects(path, fs)])
+
+
+def _invalidate(path: str) -> None:
+    """ Drop cached metadata and ETags made stale by a write to path
+    """
+    metadata.invalidate(path)
+    disk_cache.invalidate(path)
+
+
 def already_exists(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> bool:
     """ Test to see if a file/directory already exists
 
@@ -36,9 +200,110 @@ def already_exists(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs)
     --------
     bool
     """
-    if fs is None:
-        fs = s3fs.S3FileSystem(**kwargs)
-    return fs.exists(path)
+    fs = get_fs(fs, **kwargs)
+    return metadata.cached("exists", _norm_s3_path(path), lambda: _exists(path, fs))
+
+
+def exists_many(paths: Iterable[str], fs: Optional[s3fs.S3FileSystem] = None,
+                num_threads: int = DEFAULT_LIST_THREADS, **kwargs) -> Dict[str, bool]:
+    """ Test which of many files/directories already exist
+
+    Paths are grouped by their parent "directory". Groups of at least
+    EXISTS_LIST_MIN_PATHS paths are answered by delimited listings of the
+    parent, each page starting at the next unanswered path so gaps between
+    keys are skipped. Once a page answers fewer than EXISTS_LIST_MIN_PATHS
+    paths, the keys are deemed sparse and the group's remaining paths are
+    checked with already_exists, like those of smaller groups. Groups and
+    the individual checks run concurrently.
+
+    Parameters
+    -----------
+    paths : Iterable[str]
+        S3 file/directory paths
+
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    num_threads : int (default DEFAULT_LIST_THREADS)
+        Maximum number of listings/requests in flight at once
+
+    **kwargs
+        Extra args to be passed to S3FileSystem if one wasn't provided
+
+    Returns
+    --------
+    Dict[str, bool]
+        Whether each path exists, in the order of paths
+    """
+    paths = list(paths)
+    fs = get_fs(fs, **kwargs)
+
+    groups: Dict[Tuple[str, Optional[str]], List[str]] = {}
+    for path in paths:
+        bucket, _, key = _norm_s3_path(path).partition("/")
+        parent = key.rpartition("/")[0]
+        # Buckets themselves are always checked on their own
+        prefix = (parent + "/" if parent else "") if key else None
+        groups.setdefault((bucket, prefix), []).append(path)
+
+    exists: Dict[str, bool] = {}
+    with ThreadPoolExecutor(max(1, min(num_threads, len(paths)))) as executor:
+        listings, to_head = [], []
+        for (bucket, prefix), group in groups.items():
+            if prefix is not None and len(group) >= EXISTS_LIST_MIN_PATHS:
+                listings.append(executor.submit(_exists_listed, bucket, prefix, group, fs))
+            else:
+                to_head.extend(group)
+        heads = [executor.submit(already_exists, path, fs) for path in to_head]
+        for listing in listings:
+            listed, sparse = listing.result()
+            exists.update(listed)
+            heads.extend(executor.submit(already_exists, path, fs) for path in sparse)
+            to_head.extend(sparse)
+        exists.update(zip(to_head, (head.result() for head in heads)))
+
+    return {path: exists[path] for path in paths}
+
+
+def _exists_listed(bucket: str, prefix: str, paths: List[str],
+                   fs: s3fs.S3FileSystem) -> Tuple[Dict[str, bool], List[str]]:
+    """ Check paths directly under bucket/prefix with delimited listings
+        covering just the ranges of keys around them
+
+    Returns
+    --------
+    Tuple[Dict[str, bool], List[str]]
+        Whether each path answered by the listings exists, and the paths left
+        unanswered because the keys around them are too sparse to list
+    """
+    remaining = sorted(paths, key=lambda path: _norm_s3_path(path).partition("/")[2])
+    keys = {path: _norm_s3_path(path).partition("/")[2] for path in paths}
+    exists: Dict[str, bool] = {}
+    pages = 0
+
+    while remaining:
+        # Keys sort right after key[:-1], so the page starts just before the next key
+        page = fs.s3.list_objects_v2(Bucket=bucket, Prefix=prefix, Delimiter="/",
+                                     StartAfter=keys[remaining[0]][:-1],
+                                     MaxKeys=EXISTS_LIST_PAGE_SIZE, **fs.req_kw)
+        pages += 1
+        names = [obj["Key"] for obj in page.get("Contents", [])]
+        names += [p["Prefix"] for p in page.get("CommonPrefixes", [])]
+        # Sub-prefixes are "directories", which exist as well
+        found = {name.rstrip("/") for name in names}
+
+        # A key is answered once the page reaches past the "directory" it could be
+        end = max(names) if names and page.get("IsTruncated") else None
+        answered = [path for path in remaining if end is None or keys[path] + "/" <= end]
+        exists.update((path, keys[path] in found) for path in answered)
+        remaining = [path for path in remaining if path not in exists]
+
+        if len(answered) < EXISTS_LIST_MIN_PATHS:
+            break
+
+    logger.debug(f"Checked {len(exists)} path(s) under 's3://{bucket}/{prefix}' with {pages} listing(s), "
+                 f"{len(remaining)} left to check individually")
+    return exists, remaining
 
 
 def is_s3path(path: str) -> bool:
@@ -100,11 +365,10 @@ def is_dir(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> bool:
     if not is_s3path(path):
         raise ValueError(f"{path!r} is not a valid s3path.")
 
-    if fs is None:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, **kwargs)
 
     path = _norm_s3_path(path)
-    lst = fs.ls(path)
+    lst = [f["Key"] for f in _ls_detail(path, fs)]
 
     if len(lst) == 1 and path == lst[0]:
         return False
@@ -120,7 +384,10 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
     Parameters
     -----------
     from_path : str
-        File path containing file(s) to copy
+        File path containing file(s) to copy, or a glob pattern (see _glob).
+        Matching files and directories are copied into to_path keeping their
+        paths relative to the pattern's literal leading directory, and
+        include_folder_name is ignored
 
     to_path : str
         File path to copy file(s) to
@@ -139,21 +406,47 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
 
     **kwargs
         "acl" to specify how file permission are set
-        "num_threads" to specify number of threads when copying (default 100)
+        "num_threads" to specify the maximum number of files copied at once
+            (default DEFAULT_NUM_THREADS). The actual concurrency is tuned to
+            the measured throughput and backs off when S3 throttles requests
             NOTE: This is only used when copying a directory of files
+        "progress" a callback called as progress(files_done, files_total,
+            bytes_done) as each file of a directory finishes copying
+        "multipart_threshold" when copying s3 -> s3, files at least this many
+            bytes are copied server-side in concurrent parts (default
+            transfer.DEFAULT_MULTIPART_THRESHOLD)
+        "part_size" size in bytes of each part of those copies (default
+            transfer.DEFAULT_PART_SIZE)
         Extra args to be passed to S3FileSystem
 
     Returns
     --------
     None
+
+    Raises
+    -------
+    transfer.TransferError
+        If any file of a directory failed to copy after retries. Its errors
+        attribute holds the exception for each failed file
     """
     s3FileArgs = {
         "acl": kwargs.pop("acl", "bucket-owner-full-control"),
-        "num_threads": kwargs.pop("num_threads", 100)
+        "num_threads": kwargs.pop("num_threads", DEFAULT_NUM_THREADS),
+        "progress": kwargs.pop("progress", None)
+    }
+    # Only used for s3 -> s3 copies
+    multipart_args = {
+        arg: kwargs.pop(arg) for arg in ("part_size", "multipart_threshold")
+        if arg in kwargs
     }
 
-    if fs is None:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, pool_size=s3FileArgs["num_threads"], **kwargs)
+
+    if patterns.is_pattern(from_path, lambda p: already_exists(p, fs) if is_s3path(p) else local.already_exists(p)):
+        _glob_cp(from_path, to_path, overwrite, fs, **s3FileArgs, **multipart_args)
+        if is_s3path(to_path):
+            _invalidate(_norm_s3_path(to_path))
+        return
 
     if is_s3path(from_path):
         ##################################
@@ -173,7 +466,8 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
             # s3 -> s3 copy #
             #################
             logger.debug(f"Copying s3 files: {from_path!r} to s3 location: {to_path!r}")
-            _s3_to_s3_cp(from_path, to_path, overwrite, fs, **s3FileArgs)
+            _s3_to_s3_cp(from_path, to_path, overwrite, fs, **s3FileArgs, **multipart_args)
+            _invalidate(_norm_s3_path(to_path))
         else:
             #####################
             # s3 --> local copy #
@@ -195,6 +489,7 @@ def cp(from_path: str, to_path: str, overwrite: bool = True,
 
         logger.debug(f"Copying local files: {from_path!r} to s3 location: {to_path!r}")
         _local_to_s3_cp(from_path, to_path, overwrite, fs, **s3FileArgs)
+        _invalidate(_norm_s3_path(to_path))
 
 
 def ls(path: str, full_path: bool = False, recursive: bool = False,
@@ -206,7 +501,8 @@ def ls(path: str, full_path: bool = False, recursive: bool = False,
     Parameters
     -----------
     path : str
-        Full s3 path
+        Full s3 path, or a glob pattern (see _glob). Matches are listed
+        relative to the pattern's literal leading "directory"
 
     full_path : bool (default False)
         Include full path, or just the path relative to path
@@ -226,17 +522,19 @@ def ls(path: str, full_path: bool = False, recursive: bool = False,
     --------
     List[str]
     """
-    if fs is None:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, **kwargs)
 
     if not is_s3path(path):
         raise ValueError(f"{path!r} is not a valid s3 path")
 
+    if patterns.is_pattern(path, lambda p: already_exists(p, fs)):
+        return _glob_ls(path, full_path, recursive, fs)
+
     if is_dir(path, fs):
         if recursive:
-            files = fs.walk(path)
+            files = _walk(path, fs)
         else:
-            files = fs.ls(path, detail=True)
+            files = _ls_detail(path, fs)
             files = [f["Key"]+"/" if f["StorageClass"] == "DIRECTORY" else f["Key"] for f in files]
     else:
         files = [_norm_s3_path(path)]
@@ -252,9 +550,15 @@ def ls(path: str, full_path: bool = False, recursive: bool = False,
 
 
 def rm(path: str, dry_run: bool = False,
-       fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> None:
+       fs: Optional[s3fs.S3FileSystem] = None,
+       num_threads: int = DEFAULT_DELETE_THREADS, **kwargs) -> None:
     """ Delete a file/directory
 
+    The prefix is listed once. Its keys are then removed with DeleteObjects
+    requests of up to 1000 keys each, several of which are sent concurrently.
+    An IOError listing the failed keys is raised if any key couldn't be
+    deleted.
+
     Parameters
     -----------
     path : str
@@ -267,6 +571,9 @@ def rm(path: str, dry_run: bool = False,
     fs : s3fs.S3FileSystem
         If None, an instance of S3FileSystem will be created
 
+    num_threads : int (default DEFAULT_DELETE_THREADS)
+        Maximum number of DeleteObjects requests in flight at once
+
     **kwargs
         Extra args to be passed to S3FileSystem if one wasn't provided.  e.g.
         passing profile_name="..." will use that profile defined in your
@@ -279,28 +586,88 @@ def rm(path: str, dry_run: bool = False,
     if not is_s3path(path):
         raise ValueError(f"{path!r} is not a valid s3 path.")
 
-    if fs is None:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, **kwargs)
+    bucket, prefix = _list_prefix(path)
+
+    if patterns.is_pattern(path, lambda p: already_exists(p, fs)):
+        bucket, root, objects = _glob_files(path, fs, directories=True)
+        keys = [obj["Key"] for obj in objects]
+        num_files = sum(1 for key in keys if not key.endswith("/"))
+        if dry_run:
+            print(f"Deleting {path!r} would remove {num_files} file(s)")
+            return
+        logger.info(f"Removing {num_files} file(s) matching {path!r}")
+        try:
+            _delete_keys(bucket, keys, fs, num_threads)
+        finally:
+            _invalidate(f"{bucket}/{root}".rstrip("/"))
+            fs.invalidate_cache(f"{bucket}/{root}".rstrip("/"))
+        return
+
+    # Directory markers are removed too but aren't counted as files
+    keys = [obj["Key"] for obj in _iter_objects(path, fs, directories=True)]
+    num_files = sum(1 for key in keys if not key.endswith("/"))
 
-    num_files = len(ls(path, recursive=True, fs=fs))
+    is_file = not keys
+    if is_file:
+        # Nothing under the prefix, so path should be a single file
+        fs.info(_norm_s3_path(path))
+        keys, num_files = [prefix.rstrip("/")], 1
 
     if dry_run:
         print(f"Deleting {path!r} would remove {num_files} file(s)")
         return
 
-    if is_dir(path, fs):
-        logger.info(f"Removing {num_files} file(s) located in directory {path!r}")
-        fs.rm(path, recursive=True)
-    else:
+    if is_file:
         logger.info(f"Removing 1 file located at {path!r}")
-        fs.rm(path)
+    else:
+        logger.info(f"Removing {num_files} file(s) located in directory {path!r}")
+
+    try:
+        _delete_keys(bucket, keys, fs, num_threads)
+    finally:
+        _invalidate(_norm_s3_path(path))
+        fs.invalidate_cache(_norm_s3_path(path))
+
+
+def _delete_keys(bucket: str, keys: List[str], fs: s3fs.S3FileSystem,
+                 num_threads: int = DEFAULT_DELETE_THREADS) -> None:
+    """ Delete keys from a bucket with concurrent DeleteObjects batches
+
+    Raises an IOError listing every key that couldn't be deleted
+    """
+    def _delete_batch(batch: List[str]) -> List[Dict]:
+        response = fs.s3.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            **fs.req_kw
+        )
+        return response.get("Errors", [])
+
+    batches = [keys[i: i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+    logger.debug(f"Deleting {len(keys)} key(s) from {bucket!r} in {len(batches)} batch(es)")
+
+    with ThreadPoolExecutor(num_threads) as executor:
+        results = list(executor.map(_delete_batch, batches))
+
+    errors = [error for batch_errors in results for error in batch_errors]
+    if errors:
+        details = ", ".join(f"{e['Key']!r} ({e.get('Code')})" for e in errors[:10])
+        raise IOError(f"Failed to delete {len(errors)} of {len(keys)} key(s) from {bucket!r}: {details}")
 
 
 def save_object(obj: object, path: str, overwrite: bool = True,
                 fs: Optional[s3fs.S3FileSystem] = None,
-                acl: str = "bucket-owner-full-control", **kwargs) -> None:
+                acl: str = "bucket-owner-full-control",
+                part_size: int = transfer.DEFAULT_PART_SIZE,
+                multipart_threshold: int = transfer.DEFAULT_MULTIPART_THRESHOLD,
+                num_threads: int = transfer.DEFAULT_MAX_WORKERS,
+                **kwargs) -> None:
     """ Save an object from memory to s3
 
+    Payloads of at least multipart_threshold bytes are split into parts of
+    part_size bytes which are uploaded concurrently
+
     Parameters
     -----------
     obj : object
@@ -320,28 +687,98 @@ def save_object(obj: object, path: str, overwrite: bool = True,
         Access Control List for writing data to s3; be default give the bucket
         owner full control over the data.
 
+    part_size : int (default transfer.DEFAULT_PART_SIZE)
+        Size in bytes of each part of a multipart upload. Must be at least 5MB
+
+    multipart_threshold : int (default transfer.DEFAULT_MULTIPART_THRESHOLD)
+        Payloads at least this many bytes are uploaded in parts
+
+    num_threads : int (default transfer.DEFAULT_MAX_WORKERS)
+        Maximum number of parts uploaded at once
+
     Returns
     --------
     None
     """
-    if not fs:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, pool_size=max(num_threads, DEFAULT_NUM_THREADS), **kwargs)
 
     if not overwrite and already_exists(path, fs):
         raise ValueError(f"Overwrite set to False and {path!r} already exists")
 
-    if isinstance(obj, (bytes, bytearray)):
-        mode = "wb"
+    # Text is encoded once, so the threshold is compared with its size in bytes
+    data = obj.encode() if isinstance(obj, str) else obj
+
+    if len(data) >= multipart_threshold:
+        bucket, key = split_s3path(path)
+        transfer.upload_bytes(data, bucket, key, fs, acl, part_size, num_threads)
     else:
-        mode = "w"
+        with fs.open(path, "wb", acl=acl) as f:
+            f.write(data)
+
+    _invalidate(_norm_s3_path(path))
+
+
+def save_stream(chunks: Iterable[Union[bytes, bytearray]], path: str,
+                fs: Optional[s3fs.S3FileSystem] = None,
+                acl: str = "bucket-owner-full-control",
+                part_size: int = transfer.DEFAULT_PART_SIZE,
+                num_threads: int = transfer.DEFAULT_MAX_WORKERS,
+                **kwargs) -> None:
+    """ Save an iterable of byte chunks to s3 as they are produced
+
+    The chunks are uploaded as concurrent multipart parts while the rest are
+    produced, so the full object is never held in memory. See
+    transfer.upload_stream
+
+    Parameters
+    -----------
+    chunks : Iterable[Union[bytes, bytearray]]
+        The data to save, in order
+
+    path : str
+        The s3 path to save to
+
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    acl : str
+        Access Control List to apply to the object
 
-    with fs.open(path, mode, acl=acl) as f:
-        f.write(obj)
+    part_size : int (default transfer.DEFAULT_PART_SIZE)
+        Size in bytes of each part
 
+    num_threads : int (default transfer.DEFAULT_MAX_WORKERS)
+        Maximum number of parts uploaded at once
 
-def load_object(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> io:
+    **kwargs
+        Extra args to be passed to S3FileSystem if one wasn't provided
+
+    Returns
+    --------
+    None
+    """
+    fs = get_fs(fs, pool_size=max(num_threads, DEFAULT_NUM_THREADS), **kwargs)
+    bucket, key = split_s3path(path)
+
+    try:
+        transfer.upload_stream(chunks, bucket, key, fs, acl, part_size, num_threads)
+    finally:
+        _invalidate(_norm_s3_path(path))
+
+
+def load_object(path: str, fs: Optional[s3fs.S3FileSystem] = None,
+                part_size: int = transfer.DEFAULT_PART_SIZE,
+                multipart_threshold: int = transfer.DEFAULT_MULTIPART_THRESHOLD,
+                num_threads: int = transfer.DEFAULT_MAX_WORKERS,
+                **kwargs) -> io:
     """ Load an object from s3 into memory
 
+    Objects of at least multipart_threshold bytes (according to their HEAD
+    response) are downloaded with concurrent byte-range requests into a single
+    in-memory buffer. Smaller objects are streamed through fs.open. If the
+    disk cache is enabled (see enable_disk_cache), the object is read from its
+    cached copy instead.
+
     Parameters
     -----------
     path : str
@@ -350,20 +787,139 @@ def load_object(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs) ->
     fs : s3fs.S3FileSystem
         If None, an instance of S3FileSystem will be created
 
+    part_size : int (default transfer.DEFAULT_PART_SIZE)
+        Number of bytes requested per range
+
+    multipart_threshold : int (default transfer.DEFAULT_MULTIPART_THRESHOLD)
+        Objects at least this many bytes are downloaded in concurrent ranges
+
+    num_threads : int (default transfer.DEFAULT_MAX_WORKERS)
+        Maximum number of ranges downloaded at once
+
     Returns
     --------
     typing.io
-        An open instance of the file (that can be read via read())
+        An open instance of the file (that can be read via read()). Objects
+        downloaded in ranges are returned as a transfer.BufferReader whose
+        getbuffer() exposes the downloaded bytes without a copy
     """
-    if not fs:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, pool_size=max(num_threads, DEFAULT_NUM_THREADS), **kwargs)
+
+    cache = disk_cache.get_cache()
+    if cache is not None:
+        return cache.open(_norm_s3_path(path), fs)
 
-    if not already_exists(path, fs):
+    try:
+        info = fs.info(_norm_s3_path(path), refresh=True)
+    except FileNotFoundError:
         raise ValueError(f"{path!r} does not exist")
 
+    if info["Size"] >= multipart_threshold:
+        bucket, key = split_s3path(path)
+        buffer = transfer.download_bytes(bucket, key, info["Size"], fs, info.get("ETag"),
+                                         part_size, num_threads)
+        return transfer.BufferReader(buffer)
+
     return fs.open(path)
 
 
+def load_object_if_changed(path: str, etag: Optional[str] = None,
+                           fs: Optional[s3fs.S3FileSystem] = None,
+                           **kwargs) -> Optional[Tuple[str, io]]:
+    """ Load an object from s3 unless it still has the given ETag
+
+    A single GET is sent, conditional on the ETag (If-None-Match) if one is
+    given
+
+    Parameters
+    -----------
+    path : str
+        The path of the s3 file
+
+    etag : str
+        ETag of the version already loaded. If None, the object is loaded
+
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    Returns
+    --------
+    Optional[Tuple[str, typing.io]]
+        None if the object's ETag is still etag, otherwise its current ETag
+        and an open instance of the file
+    """
+    fs = get_fs(fs, **kwargs)
+    bucket, key = split_s3path(path)
+    condition = {"IfNoneMatch": etag} if etag is not None else {}
+
+    try:
+        response = fs.s3.get_object(Bucket=bucket, Key=key, **condition, **fs.req_kw)
+    except ClientError as e:
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        code = e.response.get("Error", {}).get("Code")
+        if status == 304 or code == "304":
+            return None
+        if code in ("404", "NoSuchKey"):
+            raise ValueError(f"{path!r} does not exist") from e
+        raise
+
+    body = response["Body"]
+    try:
+        # Not every S3 compatible store honors If-None-Match
+        if etag is not None and response["ETag"] == etag:
+            return None
+        return response["ETag"], transfer.BufferReader(body.read())
+    finally:
+        body.close()
+
+
+def iter_object(path: str, chunk_size: int, fs: Optional[s3fs.S3FileSystem] = None,
+                **kwargs) -> Iterator[bytes]:
+    """ Stream an object from s3 in chunks
+
+    The object is read from a single GET response, so only one chunk is held
+    in memory at a time
+
+    Parameters
+    -----------
+    path : str
+        The path of the s3 file
+
+    chunk_size : int
+        Maximum number of bytes per chunk
+
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    **kwargs
+        Extra args to be passed to S3FileSystem if one wasn't provided
+
+    Returns
+    --------
+    Iterator[bytes]
+    """
+    fs = get_fs(fs, **kwargs)
+    bucket, key = split_s3path(path)
+
+    try:
+        response = fs.s3.get_object(Bucket=bucket, Key=key, **fs.req_kw)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            raise ValueError(f"{path!r} does not exist") from e
+        raise
+
+    logger.debug(f"Streaming {response['ContentLength']} bytes from {path!r}")
+    return _iter_body(response["Body"], chunk_size)
+
+
+def _iter_body(body, chunk_size: int) -> Iterator[bytes]:
+    try:
+        for chunk in iter(lambda: body.read(chunk_size), b""):
+            yield chunk
+    finally:
+        body.close()
+
+
 def get_size(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> int:
     """ Return size of file/directory in bytes
 
@@ -384,39 +940,328 @@ def get_size(path: str, fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> int
     --------
     int
     """
-    if not fs:
-        fs = s3fs.S3FileSystem(**kwargs)
+    fs = get_fs(fs, **kwargs)
+    norm_path = _norm_s3_path(path)
 
-    if is_dir(path, fs):
-        return sum(map(lambda fpath: get_size(fpath, fs), ls(path, full_path=True, recursive=True, fs=fs)))
+    if patterns.is_pattern(path, lambda p: already_exists(p, fs)):
+        return sum(obj["Size"] for obj in _glob_files(path, fs)[2])
+
+    def _fetch_size():
+        # Sum sizes straight from the listing; a path with nothing under it
+        # is a single file
+        total_size, num_files = 0, 0
+        for obj in _iter_objects(path, fs):
+            total_size += obj["Size"]
+            num_files += 1
+
+        if num_files:
+            return total_size
+        return fs.info(norm_path)["Size"]
+
+    return metadata.cached("size", norm_path, _fetch_size)
+
+
+def du(path: str, depth: int = 1, fs: Optional[s3fs.S3FileSystem] = None,
+       **kwargs) -> Dict[str, int]:
+    """ Return the total size in bytes of each sub-prefix of path
+
+    Sizes are summed from a single paginated listing of everything under path
+
+    Parameters
+    -----------
+    path : str
+        Path to s3 file/directory
+
+    depth : int (default 1)
+        Number of levels below path to report totals for. Files found above
+        that depth are reported individually
+
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    **kwargs
+        Extra args to be passed to S3FileSystem if one wasn't provided.  e.g.
+        passing profile_name="..." will use that profile defined in your
+        ~/.aws/credentials file
+
+    Returns
+    --------
+    Dict[str, int]
+        Mapping of paths relative to path (sub-prefixes end in "/") to their
+        size in bytes
+    """
+    if depth < 1:
+        raise ValueError(f"depth must be at least 1. {depth!r} passed")
+
+    fs = get_fs(fs, **kwargs)
+    _, prefix = _list_prefix(path)
+
+    totals: Dict[str, int] = {}
+    for obj in _iter_objects(path, fs):
+        parts = obj["Key"][len(prefix):].split("/")
+        name = "/".join(parts[:depth])
+        if len(parts) > depth:
+            name += "/"
+        totals[name] = totals.get(name, 0) + obj["Size"]
+
+    if not totals:
+        totals[os.path.basename(_norm_s3_path(path))] = fs.info(_norm_s3_path(path))["Size"]
+
+    return dict(sorted(totals.items()))
+
+
+def _list_prefix(path: str) -> Tuple[str, str]:
+    """ Return the bucket and the key prefix used to list everything under path
+    """
+    bucket, _, key = _norm_s3_path(path).partition("/")
+    prefix = key.rstrip("/") + "/" if key else ""
+    return bucket, prefix
+
+
+def _iter_objects(path: str, fs: s3fs.S3FileSystem, directories: bool = False,
+                  num_threads: int = DEFAULT_LIST_THREADS) -> Iterator[Dict]:
+    """ Yield the listing entry (Key, Size, ETag, LastModified) of every object
+        under path, sorted by key
+
+    The first levels (up to LIST_SHARD_DEPTH) of "/" common prefixes are found
+    with delimited listings, then every sub-prefix is listed concurrently
+    instead of paging through the whole prefix one request at a time. A path
+    without sub-prefixes costs a single listing as before.
+
+    Keys are relative to the bucket. "Directory" marker keys (ending in "/")
+    are skipped unless directories is True
+    """
+    bucket, prefix = _list_prefix(path)
+
+    def _list(list_prefix: str, delimiter: bool = False) -> Tuple[List[Dict], List[str]]:
+        return _list_objects(bucket, list_prefix, fs, delimiter)
+
+    objects, shards = _list(prefix, delimiter=True)
+    if not shards:
+        yield from (obj for obj in objects if directories or not obj["Key"].endswith("/"))
+        return
+
+    executor = ThreadPoolExecutor(num_threads)
+    futures = {}
+    try:
+        # Expand sub-prefixes until there are enough to keep the workers busy
+        depth = 1
+        while shards and len(shards) < num_threads and depth < LIST_SHARD_DEPTH:
+            shards, parent_shards = [], shards
+            for level_objects, level_prefixes in executor.map(lambda p: _list(p, True), parent_shards):
+                objects.extend(level_objects)
+                shards.extend(level_prefixes)
+            depth += 1
+
+        logger.debug(f"Listing {path!r} as {len(shards)} sub-prefix(es) using {num_threads} thread(s)")
+        futures = {shard: executor.submit(_list, shard) for shard in shards}
+
+        # Every key under a sub-prefix sorts next to the sub-prefix itself, so
+        # merging by name keeps the whole stream sorted
+        entries = [(obj["Key"], obj) for obj in objects] + [(shard, None) for shard in shards]
+        for name, obj in sorted(entries, key=lambda entry: entry[0]):
+            for obj in ([obj] if obj is not None else futures[name].result()[0]):
+                if directories or not obj["Key"].endswith("/"):
+                    yield obj
+    finally:
+        # Stop listing if the caller stopped consuming
+        for future in futures.values():
+            future.cancel()
+        executor.shutdown()
+
+
+def _list_objects(bucket: str, prefix: str, fs: s3fs.S3FileSystem,
+                  delimiter: bool = False) -> Tuple[List[Dict], List[str]]:
+    """ List the objects under prefix, and its "/" sub-prefixes if delimiter
+        is True
+    """
+    paginator = fs.s3.get_paginator("list_objects_v2")
+    delimiter_kw = {"Delimiter": "/"} if delimiter else {}
+    objects, prefixes = [], []
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, **delimiter_kw, **fs.req_kw):
+        objects.extend(page.get("Contents", []))
+        prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+    return objects, prefixes
+
+
+def _glob(pattern: str, fs: s3fs.S3FileSystem,
+          num_threads: int = DEFAULT_LIST_THREADS) -> Tuple[str, str, List[Dict], List[str]]:
+    """ Expand an s3 glob pattern
+
+    The literal leading "directories" of the pattern are the prefix of every
+    listing. From there each pattern component is expanded one level at a
+    time with delimited listings of the matching sub-prefixes so far (each
+    narrowed by the component's own literal start, e.g. "date=2026-10-" for
+    "date=2026-10-*"), so the listings scale with the matches rather than
+    with everything under the prefix. A "**" component lists everything
+    under the prefixes reached so far and matches the rest of the pattern.
+
+    Returns
+    --------
+    Tuple[str, str, List[Dict], List[str]]
+        The bucket, the literal leading prefix ("" or ending in "/"), the
+        listing entries of matching objects and the matching "directory"
+        prefixes (ending in "/"), both sorted. "**" only matches objects
+    """
+    bucket, _, key = _norm_s3_path(pattern).partition("/")
+    if patterns.has_magic(bucket):
+        raise ValueError(f"Bucket names can't contain patterns. {pattern!r} passed")
+
+    root_parts, pattern_parts = patterns.split_pattern(key.split("/"))
+    root = "".join(part + "/" for part in root_parts)
+    candidates, objects, prefixes = [root], [], []
+
+    with ThreadPoolExecutor(num_threads) as executor:
+        for i, part in enumerate(pattern_parts):
+            if part == "**":
+                regex = patterns.translate("/".join(pattern_parts[i:]))
+                walks = executor.map(lambda c: list(_iter_objects(f"{bucket}/{c}", fs)), candidates)
+                for candidate, walk in zip(candidates, walks):
+                    objects.extend(obj for obj in walk if regex.match(obj["Key"][len(candidate):]))
+                break
+
+            last = i == len(pattern_parts) - 1
+            if not last and not patterns.has_magic(part):
+                candidates = [candidate + part + "/" for candidate in candidates]
+                continue
+
+            regex = patterns.translate(part)
+            head = patterns.literal_head(part)
+            levels = executor.map(lambda c: _list_objects(bucket, c + head, fs, delimiter=True), candidates)
+            next_candidates = []
+            for candidate, (level_objects, level_prefixes) in zip(candidates, levels):
+                if last:
+                    objects.extend(obj for obj in level_objects
+                                   if not obj["Key"].endswith("/") and regex.match(obj["Key"][len(candidate):]))
+                for prefix in level_prefixes:
+                    if regex.match(prefix[len(candidate):-1]):
+                        (prefixes if last else next_candidates).append(prefix)
+            candidates = next_candidates
+            if not candidates:
+                break
+
+    logger.debug(f"{pattern!r} matched {len(objects)} object(s) and {len(prefixes)} prefix(es)")
+    return bucket, root, sorted(objects, key=lambda obj: obj["Key"]), sorted(prefixes)
+
+
+def _glob_files(pattern: str, fs: s3fs.S3FileSystem,
+                directories: bool = False) -> Tuple[str, str, List[Dict]]:
+    """ Like _glob, but matching "directories" are replaced by the listing
+        entries of every object under them
+    """
+    bucket, root, objects, prefixes = _glob(pattern, fs)
+    if prefixes:
+        with ThreadPoolExecutor(min(len(prefixes), DEFAULT_LIST_THREADS)) as executor:
+            for listing in executor.map(lambda p: list(_iter_objects(f"{bucket}/{p}", fs, directories)),
+                                        prefixes):
+                objects.extend(listing)
+    unique = {obj["Key"]: obj for obj in objects}
+    return bucket, root, [unique[key] for key in sorted(unique)]
+
+
+def _glob_ls(pattern: str, full_path: bool, recursive: bool,
+             fs: s3fs.S3FileSystem) -> List[str]:
+    if recursive:
+        bucket, root, objects = _glob_files(pattern, fs)
+        prefixes = []
+    else:
+        bucket, root, objects, prefixes = _glob(pattern, fs)
+
+    files = [f"{bucket}/{obj['Key']}" for obj in objects] + [f"{bucket}/{p}" for p in prefixes]
+    if full_path:
+        files = [os.path.join("s3://", f) for f in files]
+    else:
+        files = [f[len(f"{bucket}/{root}"):] for f in files]
+    return sorted(files)
+
+
+def _glob_cp(pattern: str, to_path: str, overwrite: bool, fs: s3fs.S3FileSystem,
+             **kwargs) -> None:
+    """ Copy the files matching pattern (s3 or local) into to_path, keeping
+        their paths relative to the pattern's literal leading directory
+    """
+    num_threads = kwargs.pop("num_threads", DEFAULT_NUM_THREADS)
+    progress = kwargs.pop("progress", None)
+    part_size = kwargs.pop("part_size", transfer.DEFAULT_PART_SIZE)
+    multipart_threshold = kwargs.pop("multipart_threshold", transfer.DEFAULT_MULTIPART_THRESHOLD)
+
+    if is_s3path(pattern):
+        bucket, root, objects = _glob_files(pattern, fs)
+        sources = [(f"{bucket}/{obj['Key']}", obj["Key"][len(root):], obj) for obj in objects]
     else:
-        return fs.info(path)["Size"]
+        root, files = local._glob_files(pattern)
+        sources = [(f, os.path.relpath(f, root), {"Size": os.path.getsize(f)}) for f in files]
+
+    if not sources:
+        raise ValueError(f"from_path: {pattern!r} does not match any files")
+
+    if is_s3path(to_path):
+        to_root = _norm_s3_path(to_path)
+        to_files = [f"{to_root}/{rel}" for _, rel, _ in sources]
+        existing = [f for f, exists in exists_many(to_files, fs).items() if exists] if not overwrite else []
+    else:
+        to_root = local._norm_path(to_path)
+        to_files = [os.path.join(to_root, rel) for _, rel, _ in sources]
+        existing = [f for f in to_files if local.already_exists(f)] if not overwrite else []
+    if existing:
+        raise ValueError(f"Overwrite set to False and {existing[0]!r} exists")
+
+    cache = disk_cache.get_cache()
+    transfers = []
+    for (from_file, _, obj), to_file in zip(sources, to_files):
+        if not is_s3path(pattern):
+            copy_file = functools.partial(fs.put, **kwargs)
+        elif is_s3path(to_path) and obj["Size"] >= multipart_threshold:
+            copy_file = functools.partial(_multipart_copy, size=obj["Size"], fs=fs,
+                                          part_size=part_size, **kwargs)
+        elif is_s3path(to_path):
+            copy_file = functools.partial(fs.copy, **kwargs)
+        else:
+            os.makedirs(os.path.dirname(to_file), exist_ok=True)
+            if cache is not None:
+                copy_file = functools.partial(cache.copy, fs=fs, etag=obj["ETag"], size=obj["Size"])
+            else:
+                copy_file = functools.partial(fs.get, **kwargs)
+        transfers.append(transfer.Transfer(from_file, copy_file, (from_file, to_file), obj["Size"]))
+
+    logger.debug(f"Copying {len(transfers)} file(s) matching {pattern!r} to {to_path!r}")
+    transfer.run_transfers(transfers, num_threads, progress=progress)
 
 
 def _s3_to_s3_cp(from_path: str, to_path: str, overwrite: bool,
                  fs: s3fs.S3FileSystem, **kwargs) -> None:
     from_path = _norm_s3_path(from_path)
     to_path = _norm_s3_path(to_path)
-    files = fs.walk(from_path)
+    part_size = kwargs.pop("part_size", transfer.DEFAULT_PART_SIZE)
+    multipart_threshold = kwargs.pop("multipart_threshold", transfer.DEFAULT_MULTIPART_THRESHOLD)
+    objects = list(_iter_objects(from_path, fs))
 
-    if files:
+    if objects:
         ################################
         # Copying a directory of files #
         ################################
+        files = [f"{from_path.split('/')[0]}/{obj['Key']}" for obj in objects]
         to_files = [os.path.join(to_path, f.replace(from_path+"/", "")) for f in files]
 
         # Ensure we aren't overwriting any files
         if not overwrite:
-            for to_file in to_files:
-                if already_exists(to_file, fs):
+            for to_file, exists in exists_many(to_files, fs).items():
+                if exists:
                     raise ValueError(f"Overwrite set to False and {to_file!r} exists")
 
-        num_threads = kwargs.pop("num_threads", 100)
-        # Turn off connectionpool warnings
-        logging.getLogger("urllib3.connectionpool").setLevel(logging.CRITICAL)
-        with ThreadPoolExecutor(num_threads) as executor:
-            for from_file, to_file in zip(files, to_files):
-                executor.submit(fs.copy, from_file, to_file, **kwargs)
+        num_threads = kwargs.pop("num_threads", DEFAULT_NUM_THREADS)
+        progress = kwargs.pop("progress", None)
+        transfers = []
+        for from_file, to_file, obj in zip(files, to_files, objects):
+            if obj["Size"] >= multipart_threshold:
+                # Large files are copied in concurrent parts
+                copy_file = functools.partial(_multipart_copy, size=obj["Size"], fs=fs,
+                                              part_size=part_size, **kwargs)
+            else:
+                copy_file = functools.partial(fs.copy, **kwargs)
+            transfers.append(transfer.Transfer(from_file, copy_file, (from_file, to_file), obj["Size"]))
+
+        transfer.run_transfers(transfers, num_threads, progress=progress)
     else:
         #########################
         # Copying a single file #
@@ -424,18 +1269,38 @@ def _s3_to_s3_cp(from_path: str, to_path: str, overwrite: bool,
 
         # Ensure we aren't overwriting the file
         if not overwrite and already_exists(to_path, fs):
-            raise ValueError(f"Overwrite set to False and {to_file!r} exists")
+            raise ValueError(f"Overwrite set to False and {to_path!r} exists")
+
+        kwargs.pop("num_threads", None)
+        kwargs.pop("progress", None)
+        size = fs.info(from_path)["Size"]
+        if size >= multipart_threshold:
+            _multipart_copy(from_path, to_path, size, fs, part_size, **kwargs)
+        else:
+            fs.copy(from_path, to_path, **kwargs)
+        metrics.add_bytes(bytes_in=size, bytes_out=size)
+
 
-        fs.copy(from_path, to_path, **kwargs)
+def _multipart_copy(from_path: str, to_path: str, size: int,
+                    fs: s3fs.S3FileSystem, part_size: int, **kwargs) -> None:
+    """ Helper for copying a large file server-side in concurrent parts
+    """
+    from_bucket, from_key = from_path.split("/", 1)
+    to_bucket, to_key = to_path.split("/", 1)
+    transfer.copy_object(from_bucket, from_key, to_bucket, to_key, size, fs,
+                         acl=kwargs.get("acl", "bucket-owner-full-control"),
+                         part_size=part_size)
 
 
 def _s3_to_local_cp(from_path: str, to_path: str, overwrite: bool,
                     fs: s3fs.S3FileSystem, **kwargs) -> None:
     from_path = _norm_s3_path(from_path)
     to_path = local._norm_path(to_path)
-    files = fs.walk(from_path)
+    num_threads = kwargs.pop("num_threads", DEFAULT_NUM_THREADS)
+    progress = kwargs.pop("progress", None)
+    objects = list(_iter_objects(from_path, fs, directories=True))
 
-    if files:
+    if objects:
         ################################
         # Copying a directory of files #
         ################################
@@ -450,30 +1315,46 @@ def _s3_to_local_cp(from_path: str, to_path: str, overwrite: bool,
         # Make the root directory to fill in
         os.makedirs(to_path)
 
-        # Need to create any additional subfolders
-        _local_create_subfolders(from_path, to_path, fs)
-
-        to_files = [os.path.join(to_path, f.replace(from_path+"/", "")) for f in files]
-
-        num_threads = kwargs.pop("num_threads", 100)
-        # Turn off connectionpool warnings
-        logging.getLogger("urllib3.connectionpool").setLevel(logging.CRITICAL)
-        with ThreadPoolExecutor(num_threads) as executor:
-            for from_file, to_file in zip(files, to_files):
-                executor.submit(fs.get, from_file, to_file, **kwargs)
+        bucket = from_path.split("/")[0]
+        cache = disk_cache.get_cache()
+        transfers = []
+        for obj in objects:
+            from_file = f"{bucket}/{obj['Key']}"
+            to_file = os.path.join(to_path, from_file.replace(from_path+"/", ""))
+            # Create the subfolders from the listing rather than listing each one
+            os.makedirs(os.path.dirname(to_file), exist_ok=True)
+            if obj["Key"].endswith("/"):
+                continue
+            if cache is not None:
+                # The listing already has the ETag, so no HEAD request is needed
+                get_file = functools.partial(cache.copy, fs=fs, etag=obj["ETag"], size=obj["Size"])
+            else:
+                get_file = functools.partial(fs.get, **kwargs)
+            transfers.append(transfer.Transfer(from_file, get_file, (from_file, to_file), obj["Size"]))
+
+        transfer.run_transfers(transfers, num_threads, progress=progress)
     else:
         ######################
         # Copy a single file #
         ######################
-        if not overwrite and local.already_exists(to_path, fs):
+        if not overwrite and local.already_exists(to_path):
             raise ValueError(f"Overwrite set to False and {to_path!r} already "
                              f"exists")
 
-        fs.get(from_path, to_path, **kwargs)
+        cache = disk_cache.get_cache()
+        if cache is not None:
+            cache.copy(from_path, to_path, fs)
+        else:
+            fs.get(from_path, to_path, **kwargs)
+        if metrics.enabled():
+            size = os.path.getsize(to_path)
+            metrics.add_bytes(bytes_in=size, bytes_out=size)
 
 
 def _local_to_s3_cp(from_path, to_path, overwrite, fs, **kwargs):
     from_path = local._norm_path(from_path)
+    num_threads = kwargs.pop("num_threads", DEFAULT_NUM_THREADS)
+    progress = kwargs.pop("progress", None)
 
     if not overwrite and already_exists(to_path, fs):
         raise ValueError(f"Overwrite set to False and {to_path!r} "
@@ -486,32 +1367,140 @@ def _local_to_s3_cp(from_path, to_path, overwrite, fs, **kwargs):
         files = local.ls(from_path, full_path=True, recursive=True)
         to_files = [os.path.join(to_path, f) for f in local.ls(from_path, recursive=True)]
 
-        num_threads = kwargs.pop("num_threads", 100)
-        # Turn off connectionpool warnings
-        logging.getLogger("urllib3.connectionpool").setLevel(logging.CRITICAL)
-        with ThreadPoolExecutor(num_threads) as executor:
-            for from_file, to_file in zip(files, to_files):
-                executor.submit(fs.put, from_file, to_file, **kwargs)
+        put_file = functools.partial(fs.put, **kwargs)
+        transfers = [
+            transfer.Transfer(from_file, put_file, (from_file, to_file), os.path.getsize(from_file))
+            for from_file, to_file in zip(files, to_files)
+        ]
+
+        transfer.run_transfers(transfers, num_threads, progress=progress)
     else:
         ######################
         # Copy a single file #
         ######################
         fs.put(from_path, to_path, **kwargs)
+        if metrics.enabled():
+            size = os.path.getsize(from_path)
+            metrics.add_bytes(bytes_in=size, bytes_out=size)
 
 
-def _local_create_subfolders(from_path: str, to_path: str,
-                             fs: s3fs.S3FileSystem) -> None:
-    """ Helper for creating subdirectories when calling _s3_to_local_cp
-    """
-    files = fs.ls(from_path, detail=True)
+def cp_many(pairs: Iterable[Tuple[str, str]], overwrite: bool = True,
+            fs: Optional[s3fs.S3FileSystem] = None, **kwargs) -> List[CopyStatus]:
+    """ Copy many individual files, each from its own source to its own
+        destination, in any mix of local/s3 directions
 
-    subfolders = [f["Key"].replace(from_path+"/", "") for f in files if f["StorageClass"] == "DIRECTORY"]
+    All copies share one S3FileSystem (and its connection pool) and one
+    thread pool, with the adaptive concurrency of
+    transfer.run_transfers. Every pair is attempted even if others fail.
 
-    for sub in subfolders:
-        from_sub_path = os.path.join(from_path, sub)
-        path_to_create = os.path.join(to_path, sub)
+    Parameters
+    -----------
+    pairs : Iterable[Tuple[str, str]]
+        (source file, destination file) paths, local or s3. Sources must be
+        files; use cp for directories and glob patterns
 
-        logger.debug(f"Creating local subfolder {to_path!r}")
+    overwrite : bool (default True)
+        Should existing destinations be overwritten? If False, pairs whose
+        destination exists fail with a ValueError and the rest are copied
 
-        os.makedirs(path_to_create)
-        _local_create_subfolders(from_sub_path, path_to_create, fs)
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    **kwargs
+        "acl", "num_threads", "progress", "multipart_threshold" and
+        "part_size" as for cp
+        Extra args to be passed to S3FileSystem
+
+    Returns
+    --------
+    List[CopyStatus]
+        The outcome of each pair, in order
+    """
+    acl = kwargs.pop("acl", "bucket-owner-full-control")
+    num_threads = kwargs.pop("num_threads", DEFAULT_NUM_THREADS)
+    progress = kwargs.pop("progress", None)
+    part_size = kwargs.pop("part_size", transfer.DEFAULT_PART_SIZE)
+    multipart_threshold = kwargs.pop("multipart_threshold", transfer.DEFAULT_MULTIPART_THRESHOLD)
+
+    pairs = [(str(src), str(dst)) for src, dst in pairs]
+    fs = get_fs(fs, pool_size=num_threads, **kwargs)
+
+    errors: Dict[int, BaseException] = {}
+    if not overwrite:
+        s3_dsts = [dst for _, dst in pairs if is_s3path(dst)]
+        exists = exists_many(s3_dsts, fs) if s3_dsts else {}
+        for i, (_, dst) in enumerate(pairs):
+            if exists[dst] if dst in exists else local.already_exists(dst):
+                errors[i] = ValueError(f"Overwrite set to False and {dst!r} exists")
+
+    copy_file = functools.partial(_copy_file, fs=fs, acl=acl, part_size=part_size,
+                                  multipart_threshold=multipart_threshold)
+    todo = [i for i in range(len(pairs)) if i not in errors]
+    # Sizes of s3 sources come from the HEAD request made as they are copied
+    transfers = [
+        transfer.Transfer(f"{pairs[i][0]} -> {pairs[i][1]}", copy_file, pairs[i], _local_file_size(pairs[i][0]))
+        for i in todo
+    ]
+
+    logger.debug(f"Copying {len(transfers)} file(s), skipping {len(errors)}")
+    results = transfer.run_transfers(transfers, num_threads, progress=progress, return_exceptions=True)
+
+    sizes: Dict[int, int] = {}
+    for i, t, result in zip(todo, transfers, results):
+        if isinstance(result, BaseException):
+            errors[i] = result
+            continue
+        sizes[i] = result
+        if t.size is None:
+            metrics.add_bytes(bytes_in=result, bytes_out=result)
+        if is_s3path(pairs[i][1]):
+            _invalidate(_norm_s3_path(pairs[i][1]))
+
+    if errors:
+        logger.warning(f"{len(errors)} of {len(pairs)} file(s) failed to copy")
+    return [CopyStatus(src, dst, sizes.get(i), errors.get(i)) for i, (src, dst) in enumerate(pairs)]
+
+
+def _local_file_size(path: str) -> Optional[int]:
+    if is_s3path(path):
+        return None
+    try:
+        return os.path.getsize(local._norm_path(path))
+    except OSError:
+        return None
+
+
+def _copy_file(from_path: str, to_path: str, fs: s3fs.S3FileSystem, acl: str,
+               part_size: int, multipart_threshold: int) -> int:
+    """ Copy a single file for cp_many and return its size
+    """
+    if is_s3path(from_path):
+        from_path = _norm_s3_path(from_path)
+        info = fs.info(from_path, refresh=True)
+        size = info["Size"]
+        if is_s3path(to_path):
+            to_path = _norm_s3_path(to_path)
+            if size >= multipart_threshold:
+                _multipart_copy(from_path, to_path, size, fs, part_size, acl=acl)
+            else:
+                fs.copy(from_path, to_path, acl=acl)
+        else:
+            to_path = local._norm_path(to_path)
+            os.makedirs(os.path.dirname(to_path) or ".", exist_ok=True)
+            cache = disk_cache.get_cache()
+            if cache is not None:
+                cache.copy(from_path, to_path, fs, etag=info.get("ETag"), size=size)
+            else:
+                fs.get(from_path, to_path)
+        return size
+
+    from_path = local._norm_path(from_path)
+    if not os.path.isfile(from_path):
+        raise ValueError(f"{from_path!r} is not a file")
+    if is_s3path(to_path):
+        fs.put(from_path, _norm_s3_path(to_path), acl=acl)
+    else:
+        to_path = local._norm_path(to_path)
+        os.makedirs(os.path.dirname(to_path) or ".", exist_ok=True)
+        local.cp(from_path, to_path)
+    return os.path.getsize(from_path)
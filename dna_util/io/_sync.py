@@ -0,0 +1,236 @@
+""" Incremental copying of directories between local and s3 file systems """
+import os
+import shutil
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import s3fs
+
+from dna_util.io import _s3 as s3
+from dna_util.io import _local as local
+from dna_util.io import _transfer as transfer
+from dna_util.io import _metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+COMPARE_OPTIONS = {"size", "etag", "mtime"}
+
+
+def sync(from_path: str, to_path: str, compare: str = "size",
+         delete: bool = False, fs: Optional[s3fs.S3FileSystem] = None,
+         **kwargs) -> Dict[str, int]:
+    """ Copy only new or changed files from one directory to another
+
+    Both local and s3 paths are supported for either side. The contents of
+    from_path are synced into to_path (i.e. like cp with
+    include_folder_name=False). Both sides are listed concurrently before
+    anything is transferred.
+
+    Parameters
+    -----------
+    from_path : str
+        Directory containing the files to sync
+
+    to_path : str
+        Directory to sync the files to
+
+    compare : ["size", "etag", "mtime"] (default "size")
+        How to decide whether a file that exists on both sides has changed
+            "size"
+                The sizes differ
+            "etag"
+                The sizes or content hashes differ. Local files are hashed with
+                md5; multipart S3 ETags can't be compared to a local md5, in
+                which case only the size is compared
+            "mtime"
+                The sizes differ or the source file was modified more recently
+
+    delete : bool (default False)
+        Remove files in to_path that don't exist in from_path
+
+    fs : s3fs.S3FileSystem
+        If None, an instance of S3FileSystem will be created
+
+    **kwargs
+        "acl" to specify how file permission are set on s3
+        "num_threads" to specify the maximum number of files copied at once
+            (default 100)
+        "part_size" and "multipart_threshold" as for cp, for s3 -> s3
+            copies of large files
+        "progress" a callback called as progress(files_done, files_total,
+            bytes_done) as each file finishes copying
+        Extra args to be passed to S3FileSystem
+
+    Returns
+    --------
+    Dict[str, int]
+        Counts of the files_copied, bytes_copied, files_skipped, bytes_skipped
+        and files_deleted
+    """
+    if compare not in COMPARE_OPTIONS:
+        raise ValueError(f"compare must be one of {sorted(COMPARE_OPTIONS)!r}. {compare!r} passed")
+
+    backend = "s3" if s3.is_s3path(from_path) or s3.is_s3path(to_path) else "local"
+    with metrics.measure("sync", backend):
+        acl = kwargs.pop("acl", "bucket-owner-full-control")
+        num_threads = kwargs.pop("num_threads", s3.DEFAULT_NUM_THREADS)
+        progress = kwargs.pop("progress", None)
+        part_size = kwargs.pop("part_size", transfer.DEFAULT_PART_SIZE)
+        multipart_threshold = kwargs.pop("multipart_threshold", transfer.DEFAULT_MULTIPART_THRESHOLD)
+
+        if s3.is_s3path(from_path) or s3.is_s3path(to_path):
+            fs = s3.get_fs(fs, pool_size=num_threads, **kwargs)
+
+        if s3.is_s3path(from_path):
+            from_path = "s3://" + s3._norm_s3_path(from_path)
+        else:
+            from_path = local._norm_path(from_path)
+        if s3.is_s3path(to_path):
+            to_path = "s3://" + s3._norm_s3_path(to_path)
+        else:
+            to_path = local._norm_path(to_path)
+
+        # List both sides concurrently
+        with ThreadPoolExecutor(2) as executor:
+            from_future = executor.submit(_list_files, from_path, fs)
+            to_future = executor.submit(_list_files, to_path, fs)
+            from_files, to_files = from_future.result(), to_future.result()
+
+        if not from_files:
+            raise ValueError(f"from_path: {from_path!r} does not exist or is empty")
+
+        to_copy = []
+        summary = dict(files_copied=0, bytes_copied=0, files_skipped=0, bytes_skipped=0, files_deleted=0)
+        for name, from_info in from_files.items():
+            to_info = to_files.get(name)
+            if to_info is not None and not _changed(from_info, to_info, compare):
+                summary["files_skipped"] += 1
+                summary["bytes_skipped"] += from_info["size"]
+            else:
+                to_copy.append(name)
+                summary["files_copied"] += 1
+                summary["bytes_copied"] += from_info["size"]
+
+        to_delete = sorted(set(to_files) - set(from_files)) if delete else []
+
+        logger.info(f"Syncing {from_path!r} to {to_path!r}: copying {len(to_copy)} file(s), "
+                    f"skipping {summary['files_skipped']} unchanged file(s), "
+                    f"deleting {len(to_delete)} file(s)")
+
+        copy_file = _copy_function(from_path, to_path, fs, acl, part_size, multipart_threshold)
+        transfer.run_transfers(
+            [
+                transfer.Transfer(name, copy_file,
+                                  (_join(from_path, name), _join(to_path, name), from_files[name]["size"]),
+                                  from_files[name]["size"])
+                for name in to_copy
+            ],
+            num_threads,
+            progress=progress
+        )
+
+        if to_delete:
+            if s3.is_s3path(to_path):
+                bucket, prefix = s3._list_prefix(to_path)
+                s3._delete_keys(bucket, [prefix + name for name in to_delete], fs)
+            else:
+                for name in to_delete:
+                    os.remove(_join(to_path, name))
+            summary["files_deleted"] = len(to_delete)
+
+        if s3.is_s3path(to_path):
+            s3._invalidate(s3._norm_s3_path(to_path))
+
+        return summary
+
+
+def _join(path: str, name: str) -> str:
+    return path.rstrip("/") + "/" + name
+
+
+def _list_files(path: str, fs: Optional[s3fs.S3FileSystem]) -> Dict[str, Dict]:
+    """ Map the path of every file under path (relative to path) to its size,
+        etag and mtime
+    """
+    files = {}
+    if s3.is_s3path(path):
+        _, prefix = s3._list_prefix(path)
+        for obj in s3._iter_objects(path, fs):
+            files[obj["Key"][len(prefix):]] = {
+                "size": obj["Size"],
+                "etag": obj["ETag"].strip('"'),
+                "mtime": obj["LastModified"].timestamp(),
+            }
+    elif os.path.isdir(path):
+        for root, dirs, names in os.walk(path):
+            for f in names:
+                fpath = os.path.join(root, f)
+                stat = os.stat(fpath)
+                files[fpath[len(path)+1:].replace(os.sep, "/")] = {
+                    "size": stat.st_size,
+                    "path": fpath,
+                    "mtime": stat.st_mtime,
+                }
+    return files
+
+
+def _changed(from_info: Dict, to_info: Dict, compare: str) -> bool:
+    if from_info["size"] != to_info["size"]:
+        return True
+    if compare == "mtime":
+        return from_info["mtime"] > to_info["mtime"]
+    if compare == "etag":
+        from_etag, to_etag = _etag(from_info), _etag(to_info)
+        if from_etag is None or to_etag is None:
+            return False
+        return from_etag != to_etag
+    return False
+
+
+def _etag(info: Dict) -> Optional[str]:
+    """ Return a comparable content hash for a listing entry, hashing local
+        files on demand. None is returned for multipart S3 ETags
+    """
+    if "etag" not in info:
+        md5 = hashlib.md5()
+        with open(info["path"], "rb") as f:
+            for chunk in iter(lambda: f.read(2 ** 20), b""):
+                md5.update(chunk)
+        info["etag"] = md5.hexdigest()
+    if "-" in info["etag"]:
+        return None
+    return info["etag"]
+
+
+def _copy_function(from_path: str, to_path: str, fs: Optional[s3fs.S3FileSystem], acl: str,
+                   part_size: int, multipart_threshold: int):
+    """ Return a function copying a single file of the given size for the
+        given direction
+    """
+    from_s3, to_s3 = s3.is_s3path(from_path), s3.is_s3path(to_path)
+
+    if from_s3 and to_s3:
+        def _copy_object(src, dst, size):
+            src, dst = s3._norm_s3_path(src), s3._norm_s3_path(dst)
+            # As in cp: large files (and anything over CopyObject's 5GB
+            # limit) are copied server-side in concurrent parts
+            if size >= multipart_threshold:
+                s3._multipart_copy(src, dst, size, fs, part_size, acl=acl)
+            else:
+                # s3fs only forwards CopyObject's own parameter names
+                fs.copy(src, dst, ACL=acl)
+        return _copy_object
+    elif from_s3:
+        def _get(src, dst, size):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            fs.get(src, dst)
+        return _get
+    elif to_s3:
+        return lambda src, dst, size: fs.put(src, dst, acl=acl)
+    else:
+        def _copy(src, dst, size):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+        return _copy
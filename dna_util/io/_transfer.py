@@ -0,0 +1,612 @@
+""" Helpers for moving files and large objects to and from S3 concurrently """
+import io
+import time
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import s3fs
+
+from dna_util.io import _metrics as metrics
+from dna_util.io import _retry as retry
+
+logger = logging.getLogger(__name__)
+
+# S3 rejects multipart uploads with (non-final) parts smaller than 5MB
+MIN_PART_SIZE = 5 * 2 ** 20
+# ... or with more than 10000 parts
+MAX_PARTS = 10000
+# ... or with parts larger than 5GB
+MAX_PART_SIZE = 5 * 2 ** 30
+DEFAULT_PART_SIZE = 16 * 2 ** 20
+# Payloads at least this large are uploaded/downloaded in parts
+DEFAULT_MULTIPART_THRESHOLD = 64 * 2 ** 20
+# Number of parts transferred at once for a single object
+DEFAULT_MAX_WORKERS = 10
+# Size of the reads used to fill the download buffer from a response stream
+_READ_SIZE = 2 ** 20
+
+# Upper bound on the number of files transferred at once by run_transfers
+DEFAULT_NUM_THREADS = 100
+# run_transfers starts with this many concurrent files and adapts from there
+MIN_CONCURRENCY = 4
+# Number of times a whole transfer failing with a transient error is rerun.
+# Each S3 request is already retried by the shared retry policy (see _retry),
+# so rerunning transfers on top of it would multiply the attempts
+DEFAULT_RETRIES = 0
+
+# A single file transfer for run_transfers. fun(*args) performs the transfer
+# and size is the number of bytes it moves (used for throughput and progress)
+Transfer = namedtuple("Transfer", ["name", "fun", "args", "size"])
+
+
+class TransferError(IOError):
+    """ Raised by run_transfers when one or more transfers failed
+
+    Attributes
+    -----------
+    errors : Dict[str, BaseException]
+        The final exception of each failed transfer keyed by its name
+    """
+    def __init__(self, errors: Dict[str, BaseException], total: int):
+        self.errors = errors
+        details = "; ".join(f"{name!r}: {err!r}" for name, err in list(errors.items())[:10])
+        super().__init__(f"{len(errors)} of {total} transfer(s) failed: {details}")
+
+
+class BufferReader(io.RawIOBase):
+    """ Read-only, seekable file object over an in-memory buffer
+
+    Unlike io.BytesIO, the buffer is not copied. getbuffer() returns a
+    memoryview of the whole buffer so it can be handed to e.g. pickle.loads
+    directly.
+    """
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]):
+        self._view = memoryview(buffer)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        num_bytes = max(min(len(b), len(self._view) - self._pos), 0)
+        b[:num_bytes] = self._view[self._pos: self._pos + num_bytes]
+        self._pos += num_bytes
+        return num_bytes
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence {whence!r}")
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def getbuffer(self) -> memoryview:
+        return self._view
+
+
+def upload_bytes(data: Union[bytes, bytearray, memoryview], bucket: str,
+                 key: str, fs: s3fs.S3FileSystem, acl: str = "bucket-owner-full-control",
+                 part_size: int = DEFAULT_PART_SIZE,
+                 max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """ Upload a bytes payload to S3 as a multipart upload
+
+    Parts of part_size bytes are uploaded concurrently by at most max_workers
+    threads. If any part fails the multipart upload is aborted so no partial
+    object or orphaned parts are left behind, and the error is re-raised.
+
+    Parameters
+    -----------
+    data : bytes-like
+        The serialized payload
+
+    bucket : str
+        Bucket to save the object to
+
+    key : str
+        Key to save the object under
+
+    fs : s3fs.S3FileSystem
+        The filesystem whose client is used for the requests
+
+    acl : str
+        Access Control List to apply to the uploaded object
+
+    part_size : int (default DEFAULT_PART_SIZE)
+        Size of each part in bytes. Must be at least MIN_PART_SIZE
+
+    max_workers : int (default DEFAULT_MAX_WORKERS)
+        Maximum number of parts uploaded at once
+
+    Returns
+    --------
+    None
+    """
+    if part_size < MIN_PART_SIZE:
+        raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes. {part_size!r} passed")
+
+    path = f"s3://{bucket}/{key}"
+    view = memoryview(data)
+    part_size = _fit_part_size(len(view), part_size)
+    offsets = range(0, max(len(view), 1), part_size)
+
+    logger.info(f"Uploading {len(view)} bytes to {path!r} in {len(offsets)} part(s) "
+                f"using {max_workers} worker(s)")
+
+    mpu = fs.s3.create_multipart_upload(Bucket=bucket, Key=key, ACL=acl, **fs.req_kw)
+    upload_id = mpu["UploadId"]
+
+    def _upload_part(part_number: int, offset: int):
+        # Only the parts in flight are copied out of the payload
+        body = bytes(view[offset: offset + part_size])
+        response = fs.s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                     PartNumber=part_number, Body=body, **fs.req_kw)
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    executor = ThreadPoolExecutor(max_workers)
+    futures = [executor.submit(_upload_part, i + 1, offset) for i, offset in enumerate(offsets)]
+    try:
+        parts = [future.result() for future in futures]
+        fs.s3.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                        MultipartUpload={"Parts": parts}, **fs.req_kw)
+    except BaseException:
+        _abort(futures, executor, fs, bucket, key, upload_id)
+        raise
+    finally:
+        executor.shutdown()
+
+
+def copy_object(from_bucket: str, from_key: str, to_bucket: str, to_key: str,
+                size: int, fs: s3fs.S3FileSystem,
+                acl: str = "bucket-owner-full-control",
+                part_size: int = DEFAULT_PART_SIZE,
+                max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """ Copy an S3 object server-side with concurrent UploadPartCopy requests
+
+    Unlike a single CopyObject request this works for objects over 5GB, and
+    large objects are copied in parallel ranges. If any range fails the
+    multipart upload is aborted and the error is re-raised.
+
+    Parameters
+    -----------
+    from_bucket, from_key : str
+        Location of the object to copy
+
+    to_bucket, to_key : str
+        Location to copy the object to
+
+    size : int
+        Size of the source object in bytes
+
+    fs : s3fs.S3FileSystem
+        The filesystem whose client is used for the requests
+
+    acl : str
+        Access Control List to apply to the copied object
+
+    part_size : int (default DEFAULT_PART_SIZE)
+        Number of bytes copied per part. Must be at least MIN_PART_SIZE
+
+    max_workers : int (default DEFAULT_MAX_WORKERS)
+        Maximum number of parts copied at once
+
+    Returns
+    --------
+    None
+    """
+    if part_size < MIN_PART_SIZE:
+        raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes. {part_size!r} passed")
+
+    part_size = _fit_part_size(size, part_size)
+    offsets = range(0, max(size, 1), part_size)
+    copy_source = {"Bucket": from_bucket, "Key": from_key}
+
+    logger.info(f"Copying {size} bytes from 's3://{from_bucket}/{from_key}' to "
+                f"'s3://{to_bucket}/{to_key}' in {len(offsets)} part(s) using {max_workers} worker(s)")
+
+    mpu = fs.s3.create_multipart_upload(Bucket=to_bucket, Key=to_key, ACL=acl, **fs.req_kw)
+    upload_id = mpu["UploadId"]
+
+    def _copy_part(part_number: int, offset: int):
+        end = min(offset + part_size, size) - 1
+        response = fs.s3.upload_part_copy(Bucket=to_bucket, Key=to_key, UploadId=upload_id,
+                                          PartNumber=part_number, CopySource=copy_source,
+                                          CopySourceRange=f"bytes={offset}-{max(end, 0)}",
+                                          **fs.req_kw)
+        return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+    executor = ThreadPoolExecutor(max_workers)
+    futures = [executor.submit(_copy_part, i + 1, offset) for i, offset in enumerate(offsets)]
+    try:
+        parts = [future.result() for future in futures]
+        fs.s3.complete_multipart_upload(Bucket=to_bucket, Key=to_key, UploadId=upload_id,
+                                        MultipartUpload={"Parts": parts}, **fs.req_kw)
+    except BaseException:
+        _abort(futures, executor, fs, to_bucket, to_key, upload_id)
+        raise
+    finally:
+        executor.shutdown()
+
+
+def upload_stream(chunks: Iterable[Union[bytes, bytearray, memoryview]], bucket: str,
+                  key: str, fs: s3fs.S3FileSystem, acl: str = "bucket-owner-full-control",
+                  part_size: int = DEFAULT_PART_SIZE,
+                  max_workers: int = DEFAULT_MAX_WORKERS) -> int:
+    """ Upload an iterable of byte chunks to S3 as they are produced
+
+    Chunks are gathered into parts which are uploaded concurrently while the
+    next part is filled, so at most max_workers + 1 parts are held in memory.
+    Since the total size isn't known up front, the part size doubles every
+    1000 parts to stay within MAX_PARTS. If the chunks fit in a single part
+    they are written with a single PutObject request instead. If anything
+    fails (including the iterable itself) the multipart upload is aborted and
+    the error is re-raised.
+
+    Parameters
+    -----------
+    chunks : Iterable[Union[bytes, bytearray, memoryview]]
+        The data to upload, in order
+
+    bucket : str
+        Bucket to upload to
+
+    key : str
+        Key to upload to
+
+    fs : s3fs.S3FileSystem
+        The filesystem whose client is used for the requests
+
+    acl : str
+        Access Control List to apply to the uploaded object
+
+    part_size : int (default DEFAULT_PART_SIZE)
+        Number of bytes in each of the first 1000 parts. Must be at least
+        MIN_PART_SIZE
+
+    max_workers : int (default DEFAULT_MAX_WORKERS)
+        Maximum number of parts uploaded at once
+
+    Returns
+    --------
+    int
+        Number of bytes uploaded
+    """
+    if part_size < MIN_PART_SIZE:
+        raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes. {part_size!r} passed")
+
+    path = f"s3://{bucket}/{key}"
+    buffer = bytearray()
+    total = 0
+    upload = {"id": None, "executor": None}
+    futures = []
+    # Bounds the parts in flight, and so the memory used
+    slots = threading.BoundedSemaphore(max_workers)
+
+    def _upload_part(part_number: int, body: bytes):
+        try:
+            response = fs.s3.upload_part(Bucket=bucket, Key=key, UploadId=upload["id"],
+                                         PartNumber=part_number, Body=body, **fs.req_kw)
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        finally:
+            slots.release()
+
+    def _next_part_size() -> int:
+        return min(MAX_PART_SIZE, part_size * 2 ** (len(futures) // 1000))
+
+    def _submit_part(body: bytes) -> None:
+        if upload["id"] is None:
+            logger.info(f"Streaming upload to {path!r} in parts of {part_size} bytes "
+                        f"using {max_workers} worker(s)")
+            mpu = fs.s3.create_multipart_upload(Bucket=bucket, Key=key, ACL=acl, **fs.req_kw)
+            upload["id"], upload["executor"] = mpu["UploadId"], ThreadPoolExecutor(max_workers)
+        if len(futures) >= MAX_PARTS:
+            raise ValueError(f"Streaming upload to {path!r} exceeded {MAX_PARTS} parts")
+        slots.acquire()
+        # Stop producing data as soon as a part has failed
+        for future in futures[-max_workers:]:
+            if future.done() and future.exception() is not None:
+                slots.release()
+                raise future.exception()
+        futures.append(upload["executor"].submit(_upload_part, len(futures) + 1, body))
+
+    try:
+        for chunk in chunks:
+            buffer += chunk
+            total += len(chunk)
+            while len(buffer) >= _next_part_size():
+                size = _next_part_size()
+                _submit_part(bytes(buffer[:size]))
+                del buffer[:size]
+
+        if upload["id"] is None:
+            logger.info(f"Uploading {total} bytes to {path!r}")
+            fs.s3.put_object(Bucket=bucket, Key=key, Body=bytes(buffer), ACL=acl, **fs.req_kw)
+            return total
+
+        if buffer:
+            _submit_part(bytes(buffer))
+            del buffer[:]
+        parts = [future.result() for future in futures]
+        fs.s3.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload["id"],
+                                        MultipartUpload={"Parts": parts}, **fs.req_kw)
+        logger.info(f"Uploaded {total} bytes to {path!r} in {len(parts)} part(s)")
+    except BaseException:
+        if upload["id"] is not None:
+            _abort(futures, upload["executor"], fs, bucket, key, upload["id"])
+        raise
+    finally:
+        if upload["executor"] is not None:
+            upload["executor"].shutdown()
+
+    return total
+
+
+def _fit_part_size(size: int, part_size: int) -> int:
+    """ Grow part_size if needed so that size bytes fit in MAX_PARTS parts
+    """
+    return max(part_size, -(-size // MAX_PARTS))
+
+
+def _abort(futures, executor: ThreadPoolExecutor, fs: s3fs.S3FileSystem,
+           bucket: str, key: str, upload_id: str) -> None:
+    """ Cancel outstanding parts and abort a multipart upload
+    """
+    logger.warning(f"Aborting multipart upload to 's3://{bucket}/{key}'")
+    for future in futures:
+        future.cancel()
+    # Parts still in flight would otherwise be stored after the abort
+    executor.shutdown(wait=True)
+    fs.s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id, **fs.req_kw)
+
+
+def download_bytes(bucket: str, key: str, size: int, fs: s3fs.S3FileSystem,
+                   etag: Optional[str] = None,
+                   part_size: int = DEFAULT_PART_SIZE,
+                   max_workers: int = DEFAULT_MAX_WORKERS) -> bytearray:
+    """ Download an S3 object with concurrent byte-range GET requests
+
+    Every range is written straight into its slice of a single preallocated
+    buffer, so the object is held in memory once.
+
+    Parameters
+    -----------
+    bucket : str
+        Bucket containing the object
+
+    key : str
+        Key of the object
+
+    size : int
+        Size of the object in bytes (from its HEAD response)
+
+    fs : s3fs.S3FileSystem
+        The filesystem whose client is used for the requests
+
+    etag : str
+        If specified, every range request is made conditional on the object
+        still having this ETag so a concurrent overwrite can't produce a mix of
+        two versions
+
+    part_size : int (default DEFAULT_PART_SIZE)
+        Number of bytes requested per range
+
+    max_workers : int (default DEFAULT_MAX_WORKERS)
+        Maximum number of ranges downloaded at once
+
+    Returns
+    --------
+    bytearray
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    offsets = range(0, size, part_size)
+    conditions = {"IfMatch": etag} if etag else {}
+
+    logger.info(f"Downloading {size} bytes from 's3://{bucket}/{key}' in {len(offsets)} "
+                f"range(s) using {max_workers} worker(s)")
+
+    def _download_range(offset: int):
+        end = min(offset + part_size, size)
+        response = fs.s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={offset}-{end - 1}",
+                                    **conditions, **fs.req_kw)
+        body = response["Body"]
+        pos = offset
+        while pos < end:
+            chunk = body.read(min(_READ_SIZE, end - pos))
+            if not chunk:
+                break
+            view[pos: pos + len(chunk)] = chunk
+            pos += len(chunk)
+        if pos != end:
+            raise IOError(f"Incomplete read of 's3://{bucket}/{key}' range {offset}-{end - 1}")
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(_download_range, offset) for offset in offsets]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    return buffer
+
+
+class AdaptiveLimiter(object):
+    """ Concurrency limit that adapts to measured throughput and throttling
+
+    The limit grows while throughput keeps improving, shrinks when throughput
+    drops and is halved whenever S3 throttles a request.
+
+    Parameters
+    -----------
+    max_workers : int
+        Upper bound of the limit
+
+    min_workers : int (default MIN_CONCURRENCY)
+        Lower bound of the limit, also the starting value
+    """
+    def __init__(self, max_workers: int, min_workers: int = MIN_CONCURRENCY):
+        self.max_workers = max(max_workers, 1)
+        self.min_workers = max(min(min_workers, self.max_workers), 1)
+        self.limit = self.min_workers
+        self._active = 0
+        self._cond = threading.Condition()
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_count = 0
+        self._last_throughput = 0.0
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, num_bytes: int = 0) -> None:
+        with self._cond:
+            self._active -= 1
+            self._window_bytes += num_bytes
+            self._window_count += 1
+            # Re-evaluate once per "round" of transfers at the current limit
+            if self._window_count >= self.limit:
+                self._adapt()
+            self._cond.notify_all()
+
+    def throttled(self) -> None:
+        with self._cond:
+            new_limit = max(self.min_workers, self.limit // 2)
+            if new_limit != self.limit:
+                logger.info(f"Throttled by S3, reducing concurrency from {self.limit} to {new_limit}")
+                self.limit = new_limit
+            self._reset_window()
+
+    def _adapt(self) -> None:
+        elapsed = max(time.monotonic() - self._window_start, 1e-6)
+        throughput = (self._window_bytes or self._window_count) / elapsed
+        step = max(1, self.limit // 4)
+        if throughput >= self._last_throughput * 1.05:
+            self.limit = min(self.max_workers, self.limit + step)
+        elif throughput < self._last_throughput * 0.9:
+            self.limit = max(self.min_workers, self.limit - step)
+        logger.debug(f"Transfer throughput {throughput:.0f}/s, concurrency limit {self.limit}")
+        self._last_throughput = throughput
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_count = 0
+
+
+def run_transfers(transfers: List[Transfer],
+                  max_workers: int = DEFAULT_NUM_THREADS,
+                  retries: int = DEFAULT_RETRIES,
+                  progress: Optional[Callable[[int, int, int], Any]] = None,
+                  return_exceptions: bool = False) -> List[Any]:
+    """ Run file transfers concurrently and collect their results
+
+    Concurrency starts low and is tuned to the measured throughput, backing
+    off whenever S3 throttles requests. The S3 requests of each transfer are
+    retried by the shared retry policy installed on every client; whole
+    transfers are only rerun if retries is given. Every transfer is attempted
+    even if others fail; failures are then raised together.
+
+    Parameters
+    -----------
+    transfers : List[Transfer]
+        The transfers to run
+
+    max_workers : int (default DEFAULT_NUM_THREADS)
+        Maximum number of transfers running at once
+
+    retries : int (default DEFAULT_RETRIES)
+        Number of times a transfer is rerun after a transient error, e.g. a
+        connection dropped while streaming a response, which the client
+        can't retry. Delays and attempt limits come from the shared
+        RetryPolicy
+
+    progress : Callable[[int, int, int], Any]
+        Called as progress(files_done, files_total, bytes_done) after each
+        transfer completes (successfully or not)
+
+    return_exceptions : bool (default False)
+        If True, the final exception of each failed transfer is returned in
+        place of its result instead of raising a TransferError
+
+    Returns
+    --------
+    List[Any]
+        The result of each transfer, in order
+
+    Raises
+    -------
+    TransferError
+        If any transfer failed and return_exceptions is False
+    """
+    total = len(transfers)
+    if not total:
+        return []
+
+    limiter = AdaptiveLimiter(min(max_workers, total))
+    lock = threading.Lock()
+    done = {"files": 0, "bytes": 0}
+
+    def _run(transfer: Transfer):
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    return transfer.fun(*transfer.args)
+                except Exception as err:
+                    error_class = retry.classify_exception(err)
+                    if error_class == "throttle":
+                        limiter.throttled()
+                    delay = retry.get_retry_policy().delay(error_class, attempt + 1) \
+                        if attempt < retries else None
+                    if delay is None:
+                        raise
+                    logger.info(f"Retrying {transfer.name!r} in {delay:.2f}s after {err!r}")
+                    time.sleep(delay)
+        finally:
+            limiter.release(transfer.size or 0)
+            with lock:
+                done["files"] += 1
+                done["bytes"] += transfer.size or 0
+                if progress is not None:
+                    progress(done["files"], total, done["bytes"])
+
+    logger.info(f"Running {total} transfer(s) with up to {max_workers} at once")
+    with ThreadPoolExecutor(limiter.max_workers) as executor:
+        futures = []
+        for transfer in transfers:
+            limiter.acquire()
+            futures.append(executor.submit(_run, transfer))
+
+    results, errors = [], {}
+    bytes_copied = 0
+    for transfer, future in zip(transfers, futures):
+        err = future.exception()
+        if err is not None:
+            errors[transfer.name] = err
+            results.append(err if return_exceptions else None)
+        else:
+            results.append(future.result())
+            bytes_copied += transfer.size or 0
+    metrics.add_bytes(bytes_in=bytes_copied, bytes_out=bytes_copied)
+
+    if errors and not return_exceptions:
+        raise TransferError(errors, total)
+    return results
@@ -0,0 +1,761 @@
+""" Coroutine versions of the dna_util.io functions
+
+S3 requests are made with a shared aiobotocore client per event loop, so
+thousands of concurrent calls are multiplexed over one connection pool instead
+of each blocking a thread. Local paths (and parquet datasets) are handled by
+the blocking dna_util.io functions in the event loop's default executor.
+
+Like the clients of _s3.get_fs, the shared clients retry through the shared
+retry policy (see retry_stats) and record their requests in the enabled
+metrics sinks.
+
+NOTE: aiobotocore is not a requirement for this package. If it is not
+installed, this submodule will not appear in dna_util.io
+"""
+import os
+import json
+import asyncio
+import functools
+import logging
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from aiobotocore.session import AioSession
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
+
+from dna_util.io import _io
+from dna_util.io import _s3 as s3
+from dna_util.io import _local as local
+from dna_util.io import _transfer as transfer
+from dna_util.io import _compression as codecs
+from dna_util.io import _glob as patterns
+from dna_util.io import _retry as retry
+from dna_util.io import _metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of files/parts transferred at once by a single call
+DEFAULT_MAX_CONCURRENCY = 100
+# Connection pool size of the shared clients
+DEFAULT_POOL_SIZE = 100
+
+# Arguments of io.load_object that don't apply to a single GET request
+_IO_ONLY_LOAD_ARGS = ("fs", "cache", "part_size", "multipart_threshold", "num_threads",
+                      "max_workers", "max_memory", "processes")
+
+# Shared clients keyed by event loop and configuration. Values are the loop
+# and the task creating the (context, client) pair, so concurrent first calls
+# share a single client. Entries of closed loops are dropped by get_client
+_clients = {}
+
+
+async def get_client(client=None, profile_name: Optional[str] = None,
+                     pool_size: int = DEFAULT_POOL_SIZE, **kwargs):
+    """ Return the shared aiobotocore S3 client for the running event loop
+
+    Parameters
+    -----------
+    client : aiobotocore S3 client
+        If specified, it is returned unchanged
+
+    profile_name : str
+        Profile defined in your ~/.aws/credentials file to create the client
+        with
+
+    pool_size : int (default DEFAULT_POOL_SIZE)
+        Maximum number of connections kept open by the client
+
+    **kwargs
+        Extra args to be passed to AioSession.create_client, e.g.
+        region_name or endpoint_url
+
+    Returns
+    --------
+    aiobotocore S3 client
+    """
+    if client is not None:
+        return client
+
+    loop = asyncio.get_event_loop()
+    _prune_closed_loops()
+    key = json.dumps([id(loop), profile_name, pool_size, kwargs], sort_keys=True, default=repr)
+    entry = _clients.get(key)
+    # A closed loop's id can be reused by a new loop
+    if entry is None or entry[0] is not loop:
+        logger.debug(f"Creating shared S3 client for event loop {id(loop)}")
+        task = loop.create_task(_create_client(profile_name, pool_size, kwargs))
+        entry = _clients[key] = (loop, task)
+
+    try:
+        _, client = await asyncio.shield(entry[1])
+    except Exception:
+        if _clients.get(key) is entry:
+            del _clients[key]
+        raise
+    return client
+
+
+def _prune_closed_loops() -> None:
+    """ Forget the clients of event loops closed without close_clients, so
+        they (and their connection pools) can be garbage collected
+    """
+    for key, (client_loop, _) in list(_clients.items()):
+        if client_loop.is_closed():
+            logger.debug(f"Dropping the shared S3 client of closed event loop {id(client_loop)}")
+            _clients.pop(key, None)
+
+
+async def _create_client(profile_name: Optional[str], pool_size: int, kwargs: Dict):
+    session = AioSession(profile=profile_name)
+    context = session.create_client("s3", config=AioConfig(max_pool_connections=pool_size), **kwargs)
+    client = await context.__aenter__()
+    retry.install(client)
+    metrics.install(client)
+    return context, client
+
+
+async def close_clients() -> None:
+    """ Close the shared clients created on the running event loop
+
+    Call this before the event loop is closed to release its connections.
+    Otherwise they are only dropped the next time a client is requested
+    """
+    loop = asyncio.get_event_loop()
+    for key, (client_loop, task) in list(_clients.items()):
+        if client_loop is not loop:
+            continue
+        del _clients[key]
+        try:
+            context, _ = await task
+        except Exception:
+            continue
+        await context.__aexit__(None, None, None)
+
+
+async def cp(from_path: str, to_path: str, overwrite: bool = True,
+             include_folder_name: bool = True, **kwargs) -> None:
+    """ Copy a file or directory of files from local/s3 to local/s3
+
+    Parameters
+    -----------
+    from_path : str
+        Directory/file path to copy
+
+    to_path : str
+        Path to copy file(s) to.
+
+    overwrite : bool (default True)
+        Should the to_path be overwritten if it already exists?
+
+    include_folder_name : bool (default True)
+        If copying a directory, add the directory name automatically to the
+        to_path.  i.e. if True, the entire folder will be copied to the
+        to_path. If False, the *contents* of the directory will be copied to
+        the to_path
+
+    **kwargs
+        "client" an aiobotocore S3 client to use instead of the shared one
+        "acl" to specify how file permission are set
+        "max_concurrency" to specify the maximum number of files copied at
+            once (default DEFAULT_MAX_CONCURRENCY)
+        "part_size" and "multipart_threshold": files at least
+            multipart_threshold bytes are copied/uploaded in parts of
+            part_size bytes, as in io.cp
+        "progress" a callback called as progress(files_done, files_total,
+            bytes_done) as each file of a directory finishes copying
+        Extra args to be passed to get_client
+
+    Returns
+    --------
+    None
+
+    Raises
+    -------
+    transfer.TransferError
+        If any file of a directory failed to copy. Its errors attribute holds
+        the exception for each failed file
+    """
+    if not (s3.is_s3path(from_path) or s3.is_s3path(to_path)):
+        return await _run_blocking(local.cp, from_path, to_path, overwrite, include_folder_name)
+
+    acl = kwargs.pop("acl", "bucket-owner-full-control")
+    max_concurrency = kwargs.pop("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    progress = kwargs.pop("progress", None)
+    part_size = kwargs.pop("part_size", transfer.DEFAULT_PART_SIZE)
+    multipart_threshold = kwargs.pop("multipart_threshold", transfer.DEFAULT_MULTIPART_THRESHOLD)
+    client = await get_client(**kwargs)
+
+    # Map each source file to its destination as (from, to, size)
+    if s3.is_s3path(from_path):
+        bucket, prefix = s3._list_prefix(from_path)
+        objects = [obj async for obj in _iter_objects(from_path, client)]
+        if objects:
+            if include_folder_name:
+                to_path = _join(to_path, os.path.basename(os.path.normpath(from_path)))
+            files = [(f"s3://{bucket}/{obj['Key']}", _join(to_path, obj["Key"][len(prefix):]), obj["Size"])
+                     for obj in objects]
+        else:
+            head = await _head(from_path, client)
+            if head is None:
+                raise ValueError(f"from_path: {from_path!r} does not exist")
+            files = [(from_path, to_path, head["ContentLength"])]
+    else:
+        from_path = local._norm_path(from_path)
+        if not local.already_exists(from_path):
+            raise ValueError(f"{from_path!r} does not exist")
+        if os.path.isdir(from_path):
+            if include_folder_name:
+                to_path = _join(to_path, os.path.basename(from_path))
+            files = [(os.path.join(from_path, f), _join(to_path, f), os.path.getsize(os.path.join(from_path, f)))
+                     for f in local.ls(from_path, recursive=True)]
+        else:
+            files = [(from_path, to_path, os.path.getsize(from_path))]
+
+    if not overwrite:
+        exists = await asyncio.gather(*(already_exists(to_file, client=client) for _, to_file, _ in files))
+        for (_, to_file, _), to_exists in zip(files, exists):
+            if to_exists:
+                raise ValueError(f"Overwrite set to False and {to_file!r} exists")
+
+    logger.debug(f"Copying {len(files)} file(s) from {from_path!r} to {to_path!r}")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    done = {"files": 0, "bytes": 0}
+
+    async def _copy(from_file: str, to_file: str, size: int) -> None:
+        try:
+            async with semaphore:
+                await _copy_file(from_file, to_file, size, client, acl, part_size, multipart_threshold)
+        finally:
+            done["files"] += 1
+            done["bytes"] += size
+            if progress is not None:
+                progress(done["files"], len(files), done["bytes"])
+
+    results = await asyncio.gather(*(_copy(*f) for f in files), return_exceptions=True)
+
+    if s3.is_s3path(to_path):
+        s3._invalidate(s3._norm_s3_path(to_path))
+
+    errors = {f[0]: err for f, err in zip(files, results) if isinstance(err, BaseException)}
+    if errors:
+        raise transfer.TransferError(errors, len(files))
+
+
+async def _copy_file(from_file: str, to_file: str, size: int, client, acl: str,
+                     part_size: int = transfer.DEFAULT_PART_SIZE,
+                     multipart_threshold: int = transfer.DEFAULT_MULTIPART_THRESHOLD) -> None:
+    """ Copy a single file where at least one side is on S3
+
+    Files of at least multipart_threshold bytes are copied server-side or
+    uploaded in parts, and downloads are streamed to disk, so at most
+    max(multipart_threshold, part_size * DEFAULT_MAX_WORKERS) bytes of a file
+    are held in memory
+    """
+    if s3.is_s3path(from_file) and s3.is_s3path(to_file):
+        from_bucket, from_key = _split(from_file)
+        to_bucket, to_key = _split(to_file)
+        if size >= multipart_threshold:
+            # A single CopyObject is limited to 5GB
+            await _copy_object(from_bucket, from_key, to_bucket, to_key, size, client, acl, part_size)
+        else:
+            await client.copy_object(Bucket=to_bucket, Key=to_key, ACL=acl,
+                                     CopySource={"Bucket": from_bucket, "Key": from_key})
+    elif s3.is_s3path(from_file):
+        await _download_file(from_file, to_file, client)
+    elif size >= multipart_threshold:
+        bucket, key = _split(to_file)
+
+        async def _read_part(offset: int, length: int) -> bytes:
+            return await _run_blocking(_read_range, from_file, offset, length)
+
+        await _upload_parts(bucket, key, size, _read_part, client, acl, part_size)
+    else:
+        with open(from_file, "rb") as f:
+            data = await _run_blocking(f.read)
+        await _put_bytes(data, to_file, client, acl, multipart_threshold=multipart_threshold)
+
+
+def _read_range(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+async def _download_file(from_file: str, to_file: str, client) -> None:
+    """ Stream an S3 object to a local file in chunks
+    """
+    bucket, key = _split(from_file)
+    try:
+        response = await client.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            raise ValueError(f"{from_file!r} does not exist") from e
+        raise
+
+    body = response["Body"]
+    try:
+        os.makedirs(os.path.dirname(to_file) or ".", exist_ok=True)
+        with open(to_file, "wb") as f:
+            while True:
+                chunk = await body.read(transfer._READ_SIZE)
+                if not chunk:
+                    break
+                await _run_blocking(f.write, chunk)
+    finally:
+        body.close()
+
+
+async def _copy_object(from_bucket: str, from_key: str, to_bucket: str, to_key: str, size: int,
+                       client, acl: str, part_size: int = transfer.DEFAULT_PART_SIZE,
+                       max_workers: int = transfer.DEFAULT_MAX_WORKERS) -> None:
+    """ Copy an S3 object server-side with concurrent UploadPartCopy requests.
+        See _transfer.copy_object
+    """
+    copy_source = {"Bucket": from_bucket, "Key": from_key}
+
+    async def _copy_part(upload_id: str, part_number: int, offset: int, length: int) -> Dict:
+        response = await client.upload_part_copy(Bucket=to_bucket, Key=to_key, UploadId=upload_id,
+                                                 PartNumber=part_number, CopySource=copy_source,
+                                                 CopySourceRange=f"bytes={offset}-{max(offset + length - 1, 0)}")
+        return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+    logger.info(f"Copying {size} bytes from 's3://{from_bucket}/{from_key}' to 's3://{to_bucket}/{to_key}' in parts")
+    await _multipart(to_bucket, to_key, size, _copy_part, client, acl, part_size, max_workers)
+
+
+async def ls(path: str, full_path: bool = False, recursive: bool = False,
+             **kwargs) -> List[str]:
+    """ List the contents of a local/s3 directory
+
+    Parameters
+    -----------
+    path : str
+        Local or S3 Path
+
+    full_path : bool
+        Include the full path, or just the path relative to `path`
+
+    recursive : bool
+        Recursively list within the given path
+
+    **kwargs
+        If path is an s3 path, client or extra args to be passed to get_client
+
+    Returns
+    --------
+    List[str]
+    """
+    if not s3.is_s3path(path):
+        return await _run_blocking(local.ls, path, full_path, recursive)
+
+    client = await get_client(**kwargs)
+    bucket, prefix = s3._list_prefix(path)
+
+    if recursive:
+        keys = [obj["Key"] async for obj in _iter_objects(path, client)]
+    else:
+        keys = []
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+            keys.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+            keys.extend(obj["Key"] for obj in page.get("Contents", []) if obj["Key"] != prefix)
+
+    if keys:
+        files = [f"s3://{bucket}/{key}" if full_path else key[len(prefix):] for key in keys]
+    elif await _head(path, client) is not None:
+        norm_path = s3._norm_s3_path(path)
+        files = ["s3://" + norm_path if full_path else os.path.basename(norm_path)]
+    else:
+        raise ValueError(f"{path!r} does not exist")
+
+    return sorted(files)
+
+
+async def rm(path: str, dry_run: bool = False, **kwargs) -> None:
+    """ Deletes a file or directory
+
+    Everything under an S3 prefix is deleted with concurrent DeleteObjects
+    batches
+
+    Parameters
+    -----------
+    path : str
+        File path to delete
+
+    dry_run : bool
+        Print out number of files to be deleted and exit. If False, numbe of
+        files to be deleted will be logged and files will be removed
+
+    **kwargs
+        If path is an s3 path, client or extra args to be passed to get_client
+
+    Returns
+    --------
+    None
+    """
+    if not s3.is_s3path(path):
+        return await _run_blocking(local.rm, path, dry_run)
+
+    client = await get_client(**kwargs)
+    bucket, prefix = s3._list_prefix(path)
+
+    # Directory markers are removed too but aren't counted as files
+    keys = [obj["Key"] async for obj in _iter_objects(path, client, directories=True)]
+    num_files = sum(1 for key in keys if not key.endswith("/"))
+
+    if not keys:
+        # Nothing under the prefix, so path should be a single file
+        if await _head(path, client) is None:
+            raise ValueError(f"{path!r} does not exist")
+        keys, num_files = [prefix.rstrip("/")], 1
+
+    if dry_run:
+        print(f"Deleting {path!r} would remove {num_files} file(s)")
+        return
+
+    logger.info(f"Removing {num_files} file(s) located at {path!r}")
+
+    async def _delete_batch(batch: List[str]) -> List[Dict]:
+        response = await client.delete_objects(
+            Bucket=bucket, Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+        )
+        return response.get("Errors", [])
+
+    batches = [keys[i: i + s3.DELETE_BATCH_SIZE] for i in range(0, len(keys), s3.DELETE_BATCH_SIZE)]
+    try:
+        results = await asyncio.gather(*(_delete_batch(batch) for batch in batches))
+    finally:
+        s3._invalidate(s3._norm_s3_path(path))
+
+    errors = [error for batch_errors in results for error in batch_errors]
+    if errors:
+        details = ", ".join(f"{e['Key']!r} ({e.get('Code')})" for e in errors[:10])
+        raise IOError(f"Failed to delete {len(errors)} of {len(keys)} key(s) from {bucket!r}: {details}")
+
+
+async def already_exists(path: str, **kwargs) -> bool:
+    """ Check if a file/directory already exists
+
+    Parameters
+    -----------
+    path : str
+        File / Directory path
+
+    **kwargs
+        If path is an s3 path, client or extra args to be passed to get_client
+
+    Returns
+    --------
+    bool
+    """
+    if not s3.is_s3path(path):
+        return local.already_exists(path)
+
+    client = await get_client(**kwargs)
+    bucket, prefix = s3._list_prefix(path)
+
+    async def _is_dir() -> bool:
+        response = await client.list_objects_v2(Bucket=bucket, Prefix=prefix, MaxKeys=1)
+        return response.get("KeyCount", 0) > 0
+
+    is_file, is_dir = await asyncio.gather(_head(path, client), _is_dir())
+    return is_file is not None or is_dir
+
+
+async def get_size(path: str, **kwargs) -> int:
+    """ Return size of file/directory in bytes
+
+    Parameters
+    -----------
+    path : str
+        File / Directory path
+
+    **kwargs
+        If path is an s3 path, client or extra args to be passed to get_client
+
+    Returns
+    --------
+    int
+    """
+    if not s3.is_s3path(path):
+        return await _run_blocking(local.get_size, path)
+
+    client = await get_client(**kwargs)
+    sizes = [obj["Size"] async for obj in _iter_objects(path, client)]
+    if sizes:
+        return sum(sizes)
+
+    head = await _head(path, client)
+    if head is None:
+        raise ValueError(f"{path!r} does not exist")
+    return head["ContentLength"]
+
+
+async def load_object(path: str, file_type: Optional[str] = None, **kwargs) -> Any:
+    """ Load a file into memory
+
+    S3 objects are read with a single GET request and deserialized in the
+    event loop's default executor, so parsing doesn't block other coroutines.
+    Parquet datasets, local files, S3 glob patterns and "directories" (paths
+    ending with "/") and loads with cache=True are handled by io.load_object
+    in the default executor.
+
+    Parameters
+    -----------
+    path : str
+        Path to the file. If file_type is not specified, an attempt will be
+        made to infer the file_type based on the extension.
+
+    file_type : str
+        Type of file to load. See io.load_object for the supported options
+
+    kwarg : Dict
+        client : aiobotocore S3 client
+            Used instead of the shared client if path is an s3path
+        compression : Union[str, Dict, None]
+            As in io.load_object
+        fs and the transfer arguments of io.load_object (part_size,
+        multipart_threshold, num_threads, max_workers, max_memory and
+        processes) are ignored when an S3 object is read with a single GET.
+        All other arguments are passed on as in io.load_object
+
+    Returns
+    --------
+    Any : Depends on the file_type specified
+    """
+    client = kwargs.pop("client", None)
+
+    if file_type is None:
+        file_type = _io._file_type_helper(path)
+
+    if file_type == "parquet" or not s3.is_s3path(path) or kwargs.get("cache") \
+            or patterns.has_magic(path) or path.endswith("/"):
+        return await _run_blocking(_io.load_object, path, file_type, **kwargs)
+
+    # Only meaningful to the blocking implementation
+    for arg in _IO_ONLY_LOAD_ARGS:
+        kwargs.pop(arg, None)
+
+    logger.info(f"Loading {path!r} from S3")
+    codec, _ = codecs.resolve(path, kwargs.pop("compression", "infer"))
+    client = await get_client(client)
+    data = await _get_bytes(path, client)
+    return await _run_blocking(_deserialize, data, file_type, codec, **kwargs)
+
+
+def _deserialize(data: bytes, file_type: str, codec: Optional[str], **kwargs) -> Any:
+    return _io._deserialize(_io._decompressed(transfer.BufferReader(data), codec), file_type, **kwargs)
+
+
+async def save_object(obj: object, path: str, file_type: Optional[str] = None,
+                      overwrite: bool = True, protocol: int = pickle.HIGHEST_PROTOCOL,
+                      **kwargs) -> None:
+    """ Save an object in memory to a file
+
+    Objects are serialized in the event loop's default executor. Parquet
+    datasets and local files are saved with io.save_object in the default
+    executor.
+
+    Parameters
+    -----------
+    obj : object
+        Python object in memory
+
+    path : str
+        Local or S3 path to save file. If file_type is not specified, an
+        attempt will be made to infer the file_type based on the extension.
+
+    file_type : str
+        Type of file to save. See io.save_object for the supported options
+
+    overwrite : bool
+        Should the file be overwritten if it already exists?
+
+    protocol : int
+        Used when calling pickle
+
+    kwargs : Dict
+        The following extra parameters can be passed:
+            client : aiobotocore S3 client
+                Used instead of the shared client when the path is an s3 path
+            acl : str
+                Used to set the Access Control List settings when writing to S3
+            part_size : int
+                Size in bytes of each part when a large payload is uploaded to
+                S3 in parts
+            multipart_threshold : int
+                Payloads at least this many bytes are uploaded to S3 in
+                concurrent parts
+            num_threads : int
+                Maximum number of parts uploaded to S3 at once
+            compression : Union[str, Dict, None]
+                As in io.save_object
+        All other arguments are passed on as in io.save_object
+
+    Returns
+    --------
+    None
+    """
+    client = kwargs.pop("client", None)
+
+    if file_type is None:
+        file_type = _io._file_type_helper(path)
+
+    if file_type == "parquet" or not s3.is_s3path(path):
+        return await _run_blocking(_io.save_object, obj, path, file_type, overwrite, protocol, **kwargs)
+
+    acl = kwargs.pop("acl", "bucket-owner-full-control")
+    codec, level = codecs.resolve(path, kwargs.pop("compression", "infer"))
+    multipart_args = _io._pop_multipart_args(kwargs)
+    client = await get_client(client)
+
+    if not overwrite and await already_exists(path, client=client):
+        raise ValueError(f"overwrite set to False and {path!r} already exists")
+
+    data = await _run_blocking(_serialize, obj, file_type, protocol, codec, level, **kwargs)
+
+    logger.info("Saving object to S3")
+    try:
+        await _put_bytes(data, path, client, acl,
+                         part_size=multipart_args.get("part_size", transfer.DEFAULT_PART_SIZE),
+                         multipart_threshold=multipart_args.get("multipart_threshold",
+                                                                transfer.DEFAULT_MULTIPART_THRESHOLD),
+                         max_workers=multipart_args.get("num_threads", transfer.DEFAULT_MAX_WORKERS))
+    finally:
+        s3._invalidate(s3._norm_s3_path(path))
+
+
+def _serialize(obj: object, file_type: str, protocol: int, codec: Optional[str], level: Optional[int],
+               **kwargs) -> bytes:
+    data = _io._serialize(obj, file_type, protocol, **kwargs)
+    if isinstance(data, str):
+        data = data.encode()
+    if codec is not None:
+        data = codecs.compress(data, codec, level)
+    return data
+
+
+async def _run_blocking(fun: Callable, *args, **kwargs) -> Any:
+    """ Run a blocking function in the event loop's default executor
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(fun, *args, **kwargs))
+
+
+def _split(path: str) -> Tuple[str, str]:
+    bucket, _, key = s3._norm_s3_path(path).partition("/")
+    return bucket, key
+
+
+def _join(path: str, name: str) -> str:
+    return path.rstrip("/") + "/" + name
+
+
+async def _iter_objects(path: str, client, directories: bool = False):
+    """ Yield the listing entry of every object under path. See _s3._iter_objects
+    """
+    bucket, prefix = s3._list_prefix(path)
+    paginator = client.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if directories or not obj["Key"].endswith("/"):
+                yield obj
+
+
+async def _head(path: str, client) -> Optional[Dict]:
+    """ Return the HEAD response of an object, or None if it doesn't exist
+    """
+    bucket, key = _split(path)
+    if not key:
+        return None
+    try:
+        return await client.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+async def _get_bytes(path: str, client) -> bytes:
+    bucket, key = _split(path)
+    try:
+        response = await client.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            raise ValueError(f"{path!r} does not exist") from e
+        raise
+    body = response["Body"]
+    try:
+        return await body.read()
+    finally:
+        body.close()
+
+
+async def _put_bytes(data: Union[bytes, bytearray], path: str, client, acl: str,
+                     part_size: int = transfer.DEFAULT_PART_SIZE,
+                     multipart_threshold: int = transfer.DEFAULT_MULTIPART_THRESHOLD,
+                     max_workers: int = transfer.DEFAULT_MAX_WORKERS) -> None:
+    """ Upload data with a single PUT, or in concurrent parts if it is at least
+        multipart_threshold bytes. See _transfer.upload_bytes
+    """
+    bucket, key = _split(path)
+    if len(data) < multipart_threshold:
+        await client.put_object(Bucket=bucket, Key=key, Body=bytes(data), ACL=acl)
+        return
+
+    view = memoryview(data)
+
+    async def _read_part(offset: int, length: int) -> bytes:
+        return bytes(view[offset: offset + length])
+
+    await _upload_parts(bucket, key, len(data), _read_part, client, acl, part_size, max_workers)
+
+
+async def _upload_parts(bucket: str, key: str, size: int, read_part: Callable, client, acl: str,
+                        part_size: int = transfer.DEFAULT_PART_SIZE,
+                        max_workers: int = transfer.DEFAULT_MAX_WORKERS) -> None:
+    """ Upload size bytes in concurrent parts, each read with
+        await read_part(offset, length) only once it is about to be sent
+    """
+    async def _upload_part(upload_id: str, part_number: int, offset: int, length: int) -> Dict:
+        response = await client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                            PartNumber=part_number, Body=await read_part(offset, length))
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    await _multipart(bucket, key, size, _upload_part, client, acl, part_size, max_workers)
+
+
+async def _multipart(bucket: str, key: str, size: int, send_part: Callable, client, acl: str,
+                     part_size: int, max_workers: int) -> None:
+    """ Run a multipart upload, sending each part with
+        await send_part(upload_id, part_number, offset, length) with at most
+        max_workers parts at once. The upload is aborted if any part fails
+    """
+    if part_size < transfer.MIN_PART_SIZE:
+        raise ValueError(f"part_size must be at least {transfer.MIN_PART_SIZE} bytes. {part_size!r} passed")
+
+    part_size = transfer._fit_part_size(size, part_size)
+    semaphore = asyncio.Semaphore(max_workers)
+
+    mpu = await client.create_multipart_upload(Bucket=bucket, Key=key, ACL=acl)
+    upload_id = mpu["UploadId"]
+
+    async def _send(part_number: int, offset: int) -> Dict:
+        async with semaphore:
+            return await send_part(upload_id, part_number, offset, min(part_size, size - offset))
+
+    tasks = [asyncio.ensure_future(_send(i + 1, offset))
+             for i, offset in enumerate(range(0, max(size, 1), part_size))]
+    try:
+        parts = await asyncio.gather(*tasks)
+        await client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                               MultipartUpload={"Parts": parts})
+    except BaseException:
+        logger.warning(f"Aborting multipart upload to 's3://{bucket}/{key}'")
+        for task in tasks:
+            task.cancel()
+        # Parts still in flight would otherwise be stored after the abort
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
@@ -0,0 +1,276 @@
+import os
+import sys
+import time
+import asyncio
+import subprocess
+
+import pytest
+
+pytest.importorskip("aiobotocore")
+# The async client can't be intercepted by moto's mock_s3, so a moto server is used
+pytest.importorskip("moto.server")
+
+import boto3
+import pandas as pd
+
+from dna_util.io import aio
+from dna_util.io import _retry as retry
+from dna_util.io import _metrics as metrics
+
+test_bucket_name = "test-bucket"
+port = 5557
+endpoint_url = f"http://127.0.0.1:{port}"
+files = {
+    "foo/bar.txt": "This is test file bar",
+    "foo/fizz/buzz.txt": "This is test file buzz"
+}
+
+
+@pytest.fixture(scope="module")
+def moto_server():
+    env = dict(os.environ, AWS_ACCESS_KEY_ID="foo", AWS_SECRET_ACCESS_KEY="bar")
+    proc = subprocess.Popen([sys.executable, "-m", "moto.server", "s3", "-p", str(port)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        client = boto3.client("s3", endpoint_url=endpoint_url, region_name="us-east-1",
+                              aws_access_key_id="foo", aws_secret_access_key="bar")
+        for _ in range(100):
+            try:
+                client.list_buckets()
+                break
+            except Exception:
+                time.sleep(0.1)
+        yield client
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+@pytest.fixture
+def s3_client(moto_server):
+    moto_server.create_bucket(Bucket=test_bucket_name)
+    for f, data in files.items():
+        moto_server.put_object(Bucket=test_bucket_name, Key=f, Body=data)
+
+    yield moto_server
+
+    objects = moto_server.list_objects_v2(Bucket=test_bucket_name).get("Contents", [])
+    for obj in objects:
+        moto_server.delete_object(Bucket=test_bucket_name, Key=obj["Key"])
+    moto_server.delete_bucket(Bucket=test_bucket_name)
+
+
+def run(coro_fun, *args, **kwargs):
+    """ Run an aio function against the moto server on a fresh event loop
+    """
+    async def _main():
+        try:
+            return await coro_fun(*args, endpoint_url=endpoint_url, region_name="us-east-1",
+                                  aws_access_key_id="foo", aws_secret_access_key="bar", **kwargs)
+        finally:
+            await aio.close_clients()
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_main())
+    finally:
+        loop.close()
+
+
+async def with_client(coro_fun, *args, endpoint_url, region_name, aws_access_key_id,
+                      aws_secret_access_key, **kwargs):
+    client = await aio.get_client(endpoint_url=endpoint_url, region_name=region_name,
+                                  aws_access_key_id=aws_access_key_id,
+                                  aws_secret_access_key=aws_secret_access_key)
+    return await coro_fun(*args, client=client, **kwargs)
+
+
+class _SlowDown(object):
+    """ Stands in for the aiohttp response of a throttled request
+    """
+    status_code = 503
+    raw_headers = []
+
+    async def read(self):
+        return (b"<?xml version='1.0' encoding='UTF-8'?><Error><Code>SlowDown</Code>"
+                b"<Message>Injected</Message></Error>")
+
+
+class TestAio(object):
+    def test_ls(self, s3_client):
+        path = f"s3://{test_bucket_name}/foo"
+
+        assert run(aio.ls, path) == ["bar.txt", "fizz/"]
+        assert run(aio.ls, path, recursive=True) == ["bar.txt", "fizz/buzz.txt"]
+        assert run(aio.ls, path + "/bar.txt", full_path=True) == [path + "/bar.txt"]
+        with pytest.raises(ValueError):
+            run(aio.ls, path + "/missing")
+
+    def test_already_exists_get_size(self, s3_client):
+        path = f"s3://{test_bucket_name}/foo"
+
+        assert run(aio.already_exists, path)
+        assert run(aio.already_exists, path + "/bar.txt")
+        assert not run(aio.already_exists, path + "/missing.txt")
+        assert run(aio.get_size, path) == 43
+        assert run(aio.get_size, path + "/bar.txt") == 21
+
+    def test_save_load_object(self, s3_client):
+        path = f"s3://{test_bucket_name}/tmp/obj.pkl"
+        obj = {"a": [1, 2, 3]}
+
+        run(with_client, aio.save_object, obj, path)
+        assert run(with_client, aio.load_object, path) == obj
+
+        df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+        run(with_client, aio.save_object, df, path.replace(".pkl", ".csv"), index=False)
+        assert run(with_client, aio.load_object, path.replace(".pkl", ".csv")).equals(df)
+
+        with pytest.raises(ValueError):
+            run(with_client, aio.save_object, obj, path, overwrite=False)
+
+    def test_load_object_io_args(self, s3_client):
+        from s3fs.core import S3FileSystem
+
+        path = f"s3://{test_bucket_name}/tmp/obj.pkl"
+        obj = {"a": [1, 2, 3]}
+        run(with_client, aio.save_object, obj, path)
+
+        # Transfer settings of io.load_object don't reach the deserializer
+        assert run(with_client, aio.load_object, path, part_size=8 << 20, num_threads=4, cache=False) == obj
+
+        # Patterns, "directories" and cached loads go through io.load_object
+        fs = S3FileSystem(key="foo", secret="bar",
+                          client_kwargs={"endpoint_url": endpoint_url, "region_name": "us-east-1"})
+        assert run(with_client, aio.load_object, f"s3://{test_bucket_name}/foo/b*.txt",
+                   file_type="raw", fs=fs) == files["foo/bar.txt"].encode()
+        assert run(with_client, aio.load_object, f"s3://{test_bucket_name}/foo/fizz/",
+                   file_type="raw", fs=fs) == files["foo/fizz/buzz.txt"].encode()
+        assert run(with_client, aio.load_object, path, cache=True, fs=fs) == obj
+
+    def test_deserialize_off_loop(self, s3_client, monkeypatch):
+        import threading
+        from dna_util.io import _io
+
+        threads = []
+        deserialize = _io._deserialize
+        monkeypatch.setattr(_io, "_deserialize",
+                            lambda *args, **kwargs: threads.append(threading.get_ident()) or deserialize(*args, **kwargs))
+
+        path = f"s3://{test_bucket_name}/tmp/obj.json"
+        run(with_client, aio.save_object, {"a": 1}, path)
+        assert run(with_client, aio.load_object, path) == {"a": 1}
+        assert threads and threading.get_ident() not in threads
+
+    def test_save_load_compressed(self, s3_client):
+        import gzip
+        path = f"s3://{test_bucket_name}/tmp/obj.json.gz"
+
+        run(with_client, aio.save_object, {"a": 1}, path)
+
+        body = s3_client.get_object(Bucket=test_bucket_name, Key="tmp/obj.json.gz")["Body"].read()
+        assert gzip.decompress(body) == b'{"a": 1}'
+        assert run(with_client, aio.load_object, path) == {"a": 1}
+
+    def test_save_object_multipart(self, s3_client):
+        path = f"s3://{test_bucket_name}/tmp/large.pkl"
+        data = os.urandom(11 * 2 ** 20)
+
+        run(with_client, aio.save_object, data, path, file_type="raw",
+            part_size=5 * 2 ** 20, multipart_threshold=5 * 2 ** 20)
+
+        assert s3_client.get_object(Bucket=test_bucket_name, Key="tmp/large.pkl")["Body"].read() == data
+
+    def test_cp_rm(self, s3_client, tmpdir):
+        from_path = f"s3://{test_bucket_name}/foo"
+        calls = []
+
+        run(aio.cp, from_path, f"s3://{test_bucket_name}/copy", progress=lambda *args: calls.append(args))
+        assert run(aio.ls, f"s3://{test_bucket_name}/copy/foo", recursive=True) == ["bar.txt", "fizz/buzz.txt"]
+        assert calls[-1] == (2, 2, 43)
+
+        run(aio.cp, from_path, str(tmpdir), include_folder_name=False)
+        assert tmpdir.join("fizz", "buzz.txt").read() == "This is test file buzz"
+
+        run(aio.cp, str(tmpdir), f"s3://{test_bucket_name}/up", include_folder_name=False)
+        assert run(aio.get_size, f"s3://{test_bucket_name}/up") == 43
+
+        run(aio.rm, f"s3://{test_bucket_name}/copy")
+        assert not run(aio.already_exists, f"s3://{test_bucket_name}/copy")
+
+    def test_cp_multipart(self, s3_client, tmpdir):
+        data = os.urandom(11 * 2 ** 20)
+        s3_client.put_object(Bucket=test_bucket_name, Key="big/data.bin", Body=data)
+        parts = {"part_size": 5 * 2 ** 20, "multipart_threshold": 5 * 2 ** 20}
+
+        # Copied server-side in parts, as a single CopyObject is limited to 5GB
+        run(aio.cp, f"s3://{test_bucket_name}/big/data.bin", f"s3://{test_bucket_name}/copy/data.bin", **parts)
+        head = s3_client.head_object(Bucket=test_bucket_name, Key="copy/data.bin")
+        assert head["ETag"].strip('"').endswith("-3")
+
+        # Streamed to disk, and uploaded in parts read from disk
+        local_path = str(tmpdir.join("data.bin"))
+        run(aio.cp, f"s3://{test_bucket_name}/copy/data.bin", local_path, **parts)
+        assert tmpdir.join("data.bin").read_binary() == data
+
+        run(aio.cp, local_path, f"s3://{test_bucket_name}/up/data.bin", **parts)
+        assert s3_client.get_object(Bucket=test_bucket_name, Key="up/data.bin")["Body"].read() == data
+        head = s3_client.head_object(Bucket=test_bucket_name, Key="up/data.bin")
+        assert head["ETag"].strip('"').endswith("-3")
+
+    def test_shared_client(self, s3_client):
+        async def _clients():
+            return await asyncio.gather(*(aio.get_client(endpoint_url=endpoint_url) for _ in range(10)))
+
+        loop = asyncio.new_event_loop()
+        try:
+            clients = loop.run_until_complete(_clients())
+            loop.run_until_complete(aio.close_clients())
+        finally:
+            loop.close()
+
+        assert all(client is clients[0] for client in clients)
+
+    def test_closed_loop_clients_dropped(self, s3_client):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(aio.get_client(endpoint_url=endpoint_url))
+        loop.close()
+        assert any(client_loop is loop for client_loop, _ in aio._clients.values())
+
+        run(aio.get_size, f"s3://{test_bucket_name}/foo")
+        assert not any(client_loop is loop for client_loop, _ in aio._clients.values())
+
+    def test_retry_policy_and_metrics(self, s3_client):
+        policy = retry.RetryPolicy(base_delay=0)
+        retry.set_retry_policy(policy)
+        sink = metrics.enable_metrics()
+        calls = []
+
+        def _throttle(**kwargs):
+            calls.append(1)
+            return _SlowDown() if len(calls) <= 2 else None
+
+        async def _main():
+            client = await aio.get_client(endpoint_url=endpoint_url, region_name="us-east-1",
+                                          aws_access_key_id="foo", aws_secret_access_key="bar")
+            client.meta.events.register_first("before-send.s3.HeadObject", _throttle)
+            try:
+                return await client.head_object(Bucket=test_bucket_name, Key="foo/bar.txt")
+            finally:
+                client.meta.events.unregister("before-send.s3.HeadObject", _throttle)
+                await aio.close_clients()
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(_main())["ContentLength"] == 21
+        finally:
+            loop.close()
+            metrics.disable_metrics()
+            retry.set_retry_policy()
+
+        assert len(calls) == 3
+        assert policy.retries["throttle"] == 2
+        assert policy.token_bucket.throttles == 2
+        stats = sink.snapshot()[("request", "HeadObject", "s3", None)]
+        assert stats["count"] == 3
+        assert stats["errors"] == 2
@@ -3,14 +3,19 @@ import os
 import pytest
 import json
 import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from s3fs.core import S3FileSystem
 import boto3
 import moto
+from botocore.awsrequest import AWSResponse
 
 from dna_util import io
 import dna_util.io._s3 as s3
 import dna_util.io._local as local
+import dna_util.io._object_cache as object_cache_module
 
 test_bucket_name = "test-bucket"
 files = {
@@ -89,6 +94,49 @@ def sample_dict(sample_local_dir, s3_fs):
 
 
 
+def test_exists_many(sample_local_dir, sample_dict, s3_fs):
+    paths = [
+        os.path.join(sample_local_dir, "io_tests/dict/dict.json"),
+        os.path.join(sample_local_dir, "io_tests/dict/missing.json"),
+        f"s3://{test_bucket_name}/tests/dict/dict.pkl",
+        f"s3://{test_bucket_name}/tests/dict/missing.pkl",
+    ]
+
+    assert io.exists_many(paths, fs=s3_fs) == dict(zip(paths, [True, False, True, False]))
+
+
+def test_cp_many_manifest(s3_fs, tmpdir):
+    manifest = tmpdir.join("manifest.csv")
+    manifest.write(
+        "# src,dst\n"
+        f"s3://{test_bucket_name}/foo/bar.txt,{tmpdir.join('bar.txt')}\n"
+        "\n"
+        f"s3://{test_bucket_name}/foo/fizz/buzz.txt\ts3://{test_bucket_name}/copy/buzz.txt\n"
+    )
+
+    statuses = io.cp_many(str(manifest), fs=s3_fs)
+
+    assert [status.error for status in statuses] == [None, None]
+    assert tmpdir.join("bar.txt").read() == files["foo/bar.txt"]
+    assert io.load_object(f"s3://{test_bucket_name}/copy/buzz.txt", file_type="raw", fs=s3_fs) == files["foo/fizz/buzz.txt"].encode()
+
+    manifest.write("only-one-path\n")
+    with pytest.raises(ValueError):
+        io.cp_many(str(manifest), fs=s3_fs)
+
+
+def test_cp_many_compressed_manifest(s3_fs, tmpdir):
+    import gzip
+
+    manifest = tmpdir.join("pairs.csv.gz")
+    manifest.write_binary(gzip.compress(f"s3://{test_bucket_name}/foo/bar.txt,{tmpdir.join('bar.txt')}\n".encode()))
+
+    statuses = io.cp_many(str(manifest), fs=s3_fs)
+
+    assert [status.error for status in statuses] == [None]
+    assert tmpdir.join("bar.txt").read() == files["foo/bar.txt"]
+
+
 class TestSaveObject(object):
     def test_save_dict_as_json_local(self, sample_local_dir, sample_dict):
         test_path = os.path.join(sample_local_dir, "io_tests/dict/dict.json")
@@ -190,4 +238,532 @@ class TestLoadObject(object):
         path = os.path.join(sample_local_dir, "io_tests/dict/dict.json")
 
         with pytest.raises(ValueError):
-            io.load_object(path, file_type="foobar")
\ No newline at end of file
+            io.load_object(path, file_type="foobar")
+
+    def test_load_ranged_s3(self, s3_fs):
+        obj = {"data": os.urandom(6 * 2 ** 20)}
+        path = f"s3://{test_bucket_name}/tests/large.pkl"
+
+        with s3_fs.open(path, "wb") as f:
+            f.write(pickle.dumps(obj))
+
+        load_obj = io.load_object(path, fs=s3_fs, part_size=2 ** 20,
+                                  multipart_threshold=2 ** 20, num_threads=4)
+
+        assert load_obj == obj
+
+        raw = io.load_object(path, file_type="raw", fs=s3_fs,
+                             part_size=2 ** 20, multipart_threshold=2 ** 20)
+
+        assert raw == pickle.dumps(obj)
+
+
+@pytest.yield_fixture
+def object_cache():
+    io.clear_object_cache()
+    yield
+    io.clear_object_cache()
+    io.set_object_cache_size(object_cache_module.DEFAULT_MAX_BYTES)
+
+
+class GetCounter(object):
+    """ Records the If-None-Match header of every GetObject request, and
+        answers them with status instead of sending them if it is set
+    """
+    def __init__(self):
+        self.conditions = []
+        self.status = None
+
+    def __call__(self, request, **kwargs):
+        self.conditions.append(request.headers.get("If-None-Match"))
+        if self.status is not None:
+            return AWSResponse(request.url, self.status, {}, _Raw(b""))
+
+
+class _Raw(object):
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+@pytest.yield_fixture
+def count_gets(s3_fs):
+    counter = GetCounter()
+    events = s3.get_fs(s3_fs).s3.meta.events
+    events.register_first("before-send.s3.GetObject", counter)
+    yield counter
+    # s3fs shares clients between instances
+    events.unregister("before-send.s3.GetObject", counter)
+
+
+class TestObjectCache(object):
+    def test_repeated_load_s3(self, s3_fs, sample_dict, object_cache, count_gets):
+        path = f"s3://{test_bucket_name}/tests/dict/dict.pkl"
+
+        first = io.load_object(path, cache=True, fs=s3_fs)
+        second = io.load_object(path, cache=True, fs=s3_fs)
+
+        assert first == sample_dict
+        assert second is first
+        assert len(count_gets.conditions) == 2
+        assert count_gets.conditions[0] is None and count_gets.conditions[1] is not None
+        stats = io.object_cache_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_not_modified(self, s3_fs, sample_dict, object_cache, count_gets):
+        path = f"s3://{test_bucket_name}/tests/dict/dict.json"
+        first = io.load_object(path, cache=True, fs=s3_fs)
+
+        count_gets.status = 304
+
+        assert io.load_object(path, cache=True, fs=s3_fs) is first
+        assert io.object_cache_stats()["hits"] == 1
+
+    def test_changed_s3(self, s3_fs, object_cache):
+        path = f"s3://{test_bucket_name}/tests/cached.json"
+
+        io.save_object({"version": 1}, path, fs=s3_fs)
+        assert io.load_object(path, cache=True, fs=s3_fs) == {"version": 1}
+        io.save_object({"version": 2}, path, fs=s3_fs)
+        assert io.load_object(path, cache=True, fs=s3_fs) == {"version": 2}
+        assert io.object_cache_stats()["misses"] == 2
+
+    def test_changed_local(self, tmpdir, object_cache):
+        path = str(tmpdir.join("cached.json"))
+
+        io.save_object({"version": 1}, path)
+        first = io.load_object(path, cache=True)
+        assert io.load_object(path, cache=True) is first
+
+        io.save_object({"version": 22}, path)
+        assert io.load_object(path, cache=True) == {"version": 22}
+
+    def test_coalesced(self, tmpdir, object_cache, monkeypatch):
+        path = str(tmpdir.join("cached.json"))
+        io.save_object({"a": 1}, path)
+
+        loading = threading.Event()
+        release = threading.Event()
+        load = local.load_object_if_changed
+
+        def _slow_load(*args):
+            loading.set()
+            release.wait(5)
+            return load(*args)
+
+        monkeypatch.setattr(local, "load_object_if_changed", _slow_load)
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(io.load_object, path, cache=True)]
+            loading.wait(5)
+            futures += [executor.submit(io.load_object, path, cache=True) for _ in range(3)]
+            while io.object_cache_stats()["coalesced"] < 3:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert all(result is results[0] for result in results)
+        assert io.object_cache_stats()["misses"] == 1
+
+    def test_eviction(self, tmpdir, object_cache):
+        paths = [str(tmpdir.join(f"{i}.raw")) for i in range(3)]
+        for path in paths:
+            io.save_object(b"x" * 100, path, file_type="raw")
+        io.set_object_cache_size(250)
+
+        for path in paths:
+            io.load_object(path, file_type="raw", cache=True)
+
+        stats = io.object_cache_stats()
+        assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 200, 1)
+
+    def test_unsupported(self, tmpdir):
+        with pytest.raises(ValueError):
+            io.load_object(str(tmpdir.join("data.csv")), cache=True, chunksize=10)
+
+
+def _require_codec(codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    elif codec == "lz4":
+        pytest.importorskip("lz4.frame")
+
+
+class TestCompression(object):
+    @pytest.mark.parametrize("suffix,codec", [(".gz", "gzip"), (".bz2", "bz2"), (".zst", "zstd"), (".lz4", "lz4")])
+    def test_round_trip(self, s3_fs, tmpdir, suffix, codec):
+        import pandas as pd
+        _require_codec(codec)
+
+        df = pd.DataFrame({"a": range(1000), "b": [f"row {i % 10}" for i in range(1000)]})
+        obj = {"foo": ["bar"] * 1000}
+        for root in (str(tmpdir), f"s3://{test_bucket_name}/tests"):
+            io.save_object(df, f"{root}/data.csv{suffix}", fs=s3_fs, index=False)
+            io.save_object(obj, f"{root}/data.pkl{suffix}", fs=s3_fs)
+            io.save_object(obj, f"{root}/data.json{suffix}", fs=s3_fs)
+
+            assert io.load_object(f"{root}/data.csv{suffix}", fs=s3_fs).equals(df)
+            assert io.load_object(f"{root}/data.pkl{suffix}", fs=s3_fs) == obj
+            assert io.load_object(f"{root}/data.json{suffix}", fs=s3_fs) == obj
+            assert io.get_size(f"{root}/data.json{suffix}", fs=s3_fs) < len(json.dumps(obj))
+
+        chunks = list(io.load_object(f"s3://{test_bucket_name}/tests/data.csv{suffix}", fs=s3_fs, chunksize=300))
+        assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+
+    def test_interoperable(self, tmpdir):
+        import gzip
+
+        path = str(tmpdir.join("data.json.gz"))
+        io.save_object({"a": 1}, path, compression={"method": "gzip", "level": 1})
+        with gzip.open(path, "rt") as f:
+            assert json.load(f) == {"a": 1}
+
+        with gzip.open(str(tmpdir.join("lines.txt.gz")), "wb") as f:
+            f.write(b"foo\nbar")
+        assert io.load_object(str(tmpdir.join("lines.txt.gz"))) == b"foo\nbar"
+
+    def test_explicit_compression(self, tmpdir):
+        path = str(tmpdir.join("data.bin"))
+
+        io.save_object(b"x" * 1000, path, file_type="raw", compression="bz2")
+        assert tmpdir.join("data.bin").size() < 1000
+        assert io.load_object(path, file_type="raw", compression="bz2") == b"x" * 1000
+        assert io.load_object(path, file_type="raw", compression=None) != b"x" * 1000
+
+        # A compression suffix can be ignored
+        io.save_object({"a": 1}, str(tmpdir.join("plain.json.gz")), compression=None)
+        assert tmpdir.join("plain.json.gz").read() == '{"a": 1}'
+
+    def test_stream_compressed(self, s3_fs):
+        chunks = [os.urandom(2 ** 20) for _ in range(6)]
+        path = f"s3://{test_bucket_name}/tests/stream.bin.gz"
+
+        io.save_object(iter(chunks), path, file_type="raw", fs=s3_fs, part_size=5 * 2 ** 20)
+
+        assert io.load_object(path, file_type="raw", fs=s3_fs) == b"".join(chunks)
+
+    def test_invalid(self, tmpdir):
+        with pytest.raises(ValueError):
+            io.save_object({"a": 1}, str(tmpdir.join("data.json")), compression="snappy")
+        with pytest.raises(ValueError):
+            io.load_object(str(tmpdir.join("data.parquet")), compression="gzip")
+
+
+@pytest.fixture
+def require_pickle5():
+    if pickle.HIGHEST_PROTOCOL < 5:
+        pytest.importorskip("pickle5")
+
+
+class TestPickle5(object):
+    def test_round_trip(self, s3_fs, tmpdir, require_pickle5):
+        import numpy as np
+        import pandas as pd
+
+        obj = {
+            "weights": np.arange(2 ** 16, dtype="float64").reshape(256, 256),
+            "fortran": np.asfortranarray(np.ones((300, 200), dtype="int32")),
+            "df": pd.DataFrame({"a": np.arange(50000), "b": np.linspace(0, 1, 50000)}),
+            "small": np.arange(3),
+        }
+        for path in (str(tmpdir.join("model.pkl5")), f"s3://{test_bucket_name}/tests/model.pkl5"):
+            io.save_object(obj, path, fs=s3_fs)
+            loaded = io.load_object(path, fs=s3_fs, multipart_threshold=2 ** 20, part_size=2 ** 20)
+
+            assert np.array_equal(loaded["weights"], obj["weights"])
+            assert np.array_equal(loaded["fortran"], obj["fortran"])
+            assert loaded["fortran"].flags.f_contiguous
+            assert loaded["df"].equals(obj["df"])
+            assert np.array_equal(loaded["small"], obj["small"])
+
+        # Local files are mapped rather than read, so arrays view the mapping
+        loaded = io.load_object(str(tmpdir.join("model.pkl5")))
+        assert not loaded["weights"].flags.writeable
+        assert loaded["weights"].ctypes.data % 64 == 0
+
+    def test_out_of_band(self, tmpdir, require_pickle5):
+        import numpy as np
+
+        obj = [np.zeros(2 ** 17, dtype="uint8"), np.zeros(100, dtype="uint8")]
+        path = str(tmpdir.join("data.pkl5"))
+
+        io.save_object(obj, path)
+        with open(path, "rb") as f:
+            assert f.read(8) == b"DNAPKL5\x00"
+            assert int.from_bytes(f.read(8)[4:], "little") == 1
+
+        io.save_object(obj, path, min_buffer_size=2 ** 18)
+        with open(path, "rb") as f:
+            assert int.from_bytes(f.read(16)[12:], "little") == 0
+        assert all(np.array_equal(a, b) for a, b in zip(io.load_object(path), obj))
+
+    def test_not_a_container(self, tmpdir, require_pickle5):
+        path = str(tmpdir.join("data.pkl"))
+        io.save_object({"a": 1}, path)
+
+        with pytest.raises(ValueError):
+            io.load_object(path, file_type="pickle5")
+
+
+@pytest.yield_fixture(params=["orjson", "ujson", "json"])
+def json_backend(request):
+    import dna_util.io._json as json_module
+
+    pytest.importorskip(request.param)
+    json_module.set_backend(request.param)
+    yield request.param
+    json_module.set_backend()
+
+
+class TestJsonLines(object):
+    def test_round_trip(self, s3_fs, tmpdir, json_backend):
+        records = [{"id": i, "name": f"événement {i}", "tags": ["a"] * (i % 3), "score": i / 7} for i in range(250)]
+        for path in (str(tmpdir.join("events.jsonl")), f"s3://{test_bucket_name}/tests/events.ndjson.gz"):
+            io.save_object(records, path, fs=s3_fs)
+
+            assert io.load_object(path, fs=s3_fs) == records
+            assert list(io.iter_records(path, chunk_size=100, fs=s3_fs)) == records
+
+            frames = list(io.load_object(path, fs=s3_fs, chunksize=100))
+            assert [len(frame) for frame in frames] == [100, 100, 50]
+            assert frames[2]["id"].tolist() == list(range(200, 250))
+
+    def test_save_frames(self, s3_fs, json_backend):
+        import pandas as pd
+
+        df = pd.DataFrame({"a": range(5), "b": list("vwxyz")})
+        path = f"s3://{test_bucket_name}/tests/frame.jsonl"
+
+        io.save_object(df, path, fs=s3_fs)
+        assert pd.concat(io.load_object(path, fs=s3_fs, chunksize=2), ignore_index=True).equals(df)
+
+        # Streamed records and DataFrames can be mixed
+        io.save_object(iter([{"a": 0, "b": "v"}, df.iloc[1:]]), path, fs=s3_fs)
+        assert io.load_object(path, fs=s3_fs) == df.to_dict("records")
+
+    def test_non_finite_floats(self, tmpdir, json_backend):
+        import pandas as pd
+
+        path = tmpdir.join("floats.jsonl")
+        records = [{"a": float("nan"), "b": float("inf"), "c": [-float("inf"), 1.5], "d": "x"}]
+
+        # Written the same way whichever backend is installed
+        io.save_object(records, str(path))
+        assert path.read_binary() == b'{"a":null,"b":null,"c":[null,1.5],"d":"x"}\n'
+
+        io.save_object(pd.DataFrame({"a": [1.0, float("nan")]}), str(path))
+        assert path.read_binary() == b'{"a":1.0}\n{"a":null}\n'
+
+    def test_blank_lines_and_errors(self, tmpdir, json_backend):
+        path = tmpdir.join("events.jsonl")
+        path.write('{"a": 1}\n\n{"a": 2}\n')
+
+        assert io.load_object(str(path)) == [{"a": 1}, {"a": 2}]
+
+        with pytest.raises(TypeError):
+            io.save_object({"a": 1}, str(path))
+
+
+class TestLoadFiles(object):
+    def test_directory(self, s3_fs, tmpdir):
+        import pandas as pd
+
+        parts = [pd.DataFrame({"a": range(i * 10, i * 10 + 10)}) for i in range(12)]
+        tmpdir.ensure("export/day=0", dir=True)
+        tmpdir.ensure("export/day=1", dir=True)
+        for root in (str(tmpdir.join("export")), f"s3://{test_bucket_name}/export"):
+            for i, part in enumerate(parts):
+                io.save_object(part, f"{root}/day={i % 2}/part-{i:02d}.csv", fs=s3_fs, index=False)
+            io.save_object(b"", f"{root}/_SUCCESS", fs=s3_fs, file_type="raw")
+
+            df = io.load_object(f"{root}/", fs=s3_fs, max_workers=4)
+            expected = pd.concat([parts[i] for i in sorted(range(12), key=lambda i: (i % 2, i))], ignore_index=True)
+            assert df.equals(expected)
+
+            df = io.load_object(f"{root}/day=0/part-0[0-4].csv", fs=s3_fs)
+            assert df["a"].tolist() == list(range(0, 10)) + list(range(20, 30)) + list(range(40, 50))
+
+    def test_plain_key_is_not_listed(self, s3_fs, monkeypatch):
+        import pandas as pd
+
+        def _list(*args, **kwargs):
+            raise AssertionError("listed")
+
+        path = f"s3://{test_bucket_name}/spark/out.csv"
+        io.save_object(pd.DataFrame({"a": [1]}), f"{path}/part-0.csv", fs=s3_fs, index=False)
+        monkeypatch.setattr(s3, "_iter_objects", _list)
+        monkeypatch.setattr(s3, "is_dir", _list)
+
+        assert io.load_object(f"s3://{test_bucket_name}/foo/bar.txt", fs=s3_fs, file_type="raw") == \
+            files["foo/bar.txt"].encode()
+        with pytest.raises(ValueError):
+            io.load_object(path, fs=s3_fs)
+
+        monkeypatch.undo()
+        assert io.load_object(f"{path}/", fs=s3_fs)["a"].tolist() == [1]
+
+    def test_combine(self, s3_fs, tmpdir):
+        root = f"s3://{test_bucket_name}/records"
+        for i in range(3):
+            io.save_object([{"id": i}], f"{root}/{i}.jsonl", fs=s3_fs)
+            io.save_object({"id": i}, f"{root}/{i}.json", fs=s3_fs)
+
+        assert io.load_object(f"{root}/*.jsonl", fs=s3_fs) == [{"id": 0}, {"id": 1}, {"id": 2}]
+        assert io.load_object(f"{root}/*.json", fs=s3_fs) == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+        with pytest.raises(ValueError):
+            io.load_object(f"{root}/*.json", fs=s3_fs, cache=True)
+        with pytest.raises(ValueError):
+            io.load_object(str(tmpdir.join("*.csv")))
+
+    def test_processes_and_max_memory(self, tmpdir):
+        import pandas as pd
+
+        root = tmpdir.mkdir("export")
+        for i in range(4):
+            io.save_object(pd.DataFrame({"a": [i] * 100}), str(root.join(f"part-{i}.csv.gz")), index=False)
+
+        expected = [i for i in range(4) for _ in range(100)]
+        assert io.load_object(str(root), processes=2)["a"].tolist() == expected
+        # Smaller than any file: loaded one at a time
+        assert io.load_object(str(root), max_memory=1)["a"].tolist() == expected
+
+
+class TestMany(object):
+    def test_round_trip(self, s3_fs, tmpdir):
+        objs = {
+            f"s3://{test_bucket_name}/many/market-{i}.pkl": {"market": i, "rates": list(range(i))} for i in range(20)
+        }
+        objs[str(tmpdir.join("lookup.json"))] = {"a": 1}
+        done = []
+
+        assert io.save_many(objs, fs=s3_fs, num_threads=4) == [None] * len(objs)
+        assert io.load_many(list(objs), fs=s3_fs, progress=lambda *args: done.append(args)) == list(objs.values())
+        assert len(done) == len(objs) and done[-1][:2] == (len(objs), len(objs))
+
+    def test_shared_fs(self, s3_fs):
+        s3.clear_fs_registry()
+        fs = s3.get_fs()
+        objs = {f"s3://{test_bucket_name}/many/{i}.pkl": i for i in range(4)}
+
+        io.save_many(objs, num_threads=4)
+        assert io.load_many(list(objs), num_threads=4) == list(objs.values())
+        assert list(s3._fs_registry.values()) == [fs]
+
+    def test_errors(self, s3_fs):
+        from dna_util.io._transfer import TransferError
+
+        paths = [f"s3://{test_bucket_name}/foo/bar.txt", f"s3://{test_bucket_name}/foo/missing.txt"]
+        with pytest.raises(TransferError) as err:
+            io.load_many(paths, fs=s3_fs, file_type="raw")
+        assert list(err.value.errors) == [paths[1]]
+
+        results = io.load_many(paths, fs=s3_fs, file_type="raw", return_exceptions=True)
+        assert results[0] == files["foo/bar.txt"].encode()
+        assert isinstance(results[1], Exception)
+
+        results = io.save_many([(paths[1], b"data"), (f"s3://{test_bucket_name}/no-type", b"data")],
+                               fs=s3_fs, return_exceptions=True)
+        assert results[0] is None and isinstance(results[1], ValueError)
+
+
+class TestStreaming(object):
+
+    def test_iter_object_s3(self, s3_fs):
+        data = os.urandom(2 ** 20 + 10)
+        path = f"s3://{test_bucket_name}/tests/stream.bin"
+        with s3_fs.open(path, "wb") as f:
+            f.write(data)
+
+        chunks = list(io.iter_object(path, chunk_size=2 ** 18, fs=s3_fs))
+
+        assert max(len(c) for c in chunks) <= 2 ** 18
+        assert b"".join(chunks) == data
+
+        with pytest.raises(ValueError):
+            io.iter_object(f"s3://{test_bucket_name}/tests/missing.bin", fs=s3_fs)
+
+    def test_iter_lines(self, s3_fs, tmpdir):
+        lines = [f"line {i} é" for i in range(1000)]
+        local_path = tmpdir.join("lines.txt")
+        local_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        s3_path = f"s3://{test_bucket_name}/tests/lines.txt"
+        s3_fs.put(str(local_path), s3_path)
+
+        # Chunks smaller than a line, split inside multi-byte characters
+        assert list(io.iter_lines(str(local_path), chunk_size=7)) == lines
+        assert list(io.iter_lines(s3_path, chunk_size=7, fs=s3_fs)) == lines
+
+        gz_path = f"s3://{test_bucket_name}/tests/lines.txt.gz"
+        io.save_object("\n".join(lines) + "\n", gz_path, file_type="raw", fs=s3_fs)
+        assert s3_fs.cat(gz_path[5:])[:2] == b"\x1f\x8b"
+        assert list(io.iter_lines(gz_path, chunk_size=7, fs=s3_fs)) == lines
+        assert list(io.iter_lines(s3_path, compression=None, fs=s3_fs)) == lines
+
+    def test_load_csv_chunks(self, s3_fs):
+        import pandas as pd
+
+        df = pd.DataFrame({"a": range(100), "b": [f"row {i}" for i in range(100)]})
+        path = f"s3://{test_bucket_name}/tests/data.csv"
+        io.save_object(df, path, fs=s3_fs, index=False)
+
+        chunks = list(io.load_object(path, fs=s3_fs, chunksize=30))
+
+        assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+        assert pd.concat(chunks, ignore_index=True).equals(df)
+
+    def test_save_stream_local(self, tmpdir):
+        import pandas as pd
+
+        path = str(tmpdir.join("stream.csv"))
+        frames = (pd.DataFrame({"a": [i, i + 1]}) for i in range(0, 6, 2))
+
+        io.save_object(frames, path, index=False)
+
+        assert tmpdir.join("stream.csv").read() == "a\n0\n1\n2\n3\n4\n5\n"
+
+        io.save_object((s for s in ["foo", b"bar"]), path, file_type="raw")
+        assert tmpdir.join("stream.csv").read() == "foobar"
+
+        with pytest.raises(ValueError):
+            io.save_object(iter([b"foo"]), path, file_type="json")
+
+    def test_save_stream_local_failure(self, tmpdir):
+        path = tmpdir.join("stream.bin")
+        path.write_binary(b"original")
+
+        def chunks():
+            yield b"partial"
+            raise RuntimeError("producer failed")
+
+        with pytest.raises(RuntimeError):
+            io.save_object(chunks(), str(path), file_type="raw")
+
+        assert path.read_binary() == b"original"
+        assert tmpdir.listdir() == [path]
+
+    def test_save_stream_s3_multipart(self, s3_fs):
+        chunks = [os.urandom(2 ** 20) for _ in range(12)]
+        path = f"s3://{test_bucket_name}/tests/stream.bin"
+
+        io.save_object(iter(chunks), path, file_type="raw", fs=s3_fs,
+                       part_size=5 * 2 ** 20, num_threads=2)
+
+        assert s3_fs.cat(path) == b"".join(chunks)
+        # 3 parts of a multipart upload
+        assert s3_fs.info(path, refresh=True)["ETag"].strip('"').endswith("-3")
+
+    def test_save_stream_s3_abort(self, s3_fs):
+        path = f"s3://{test_bucket_name}/tests/failed.bin"
+
+        def chunks():
+            for _ in range(6):
+                yield os.urandom(2 ** 20)
+            raise RuntimeError("producer failed")
+
+        with pytest.raises(RuntimeError):
+            io.save_object(chunks(), path, file_type="raw", fs=s3_fs, part_size=5 * 2 ** 20)
+
+        assert not s3_fs.exists(path)
+        assert not s3_fs.s3.list_multipart_uploads(Bucket=test_bucket_name).get("Uploads")
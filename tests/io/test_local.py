@@ -106,3 +106,62 @@ class TestGetSize(object):
     def test_get_size_dir(self, sample_dir):
         fpath = os.path.join(sample_dir, "foo")
         assert local.get_size(fpath) == 43
+
+    def test_du(self, sample_dir):
+        fpath = os.path.join(sample_dir, "foo")
+        assert local.du(fpath) == {"bar.txt": 21, "fizz/": 22}
+        assert local.du(fpath, depth=2) == {"bar.txt": 21, "fizz/buzz.txt": 22}
+
+    def test_du_file(self, sample_dir):
+        fpath = os.path.join(sample_dir, "foo", "bar.txt")
+        assert local.du(fpath) == {"bar.txt": 21}
+
+
+class TestGlob(object):
+
+    def test_ls_glob(self, sample_dir):
+        foo_dir = os.path.join(sample_dir, "foo")
+        assert local.ls(os.path.join(foo_dir, "*")) == ["bar.txt", "fizz/"]
+        assert local.ls(os.path.join(foo_dir, "*"), recursive=True) == ["bar.txt", "fizz/buzz.txt"]
+        assert local.ls(os.path.join(foo_dir, "**", "b*.txt")) == ["bar.txt", "fizz/buzz.txt"]
+        assert local.ls(os.path.join(foo_dir, "*.csv")) == []
+
+    def test_get_size_glob(self, sample_dir):
+        assert local.get_size(os.path.join(sample_dir, "foo", "*")) == 43
+        assert local.get_size(os.path.join(sample_dir, "foo", "f*", "*.txt")) == 22
+
+    def test_cp_rm_glob(self, sample_dir, tmpdir):
+        local.cp(os.path.join(sample_dir, "foo", "**", "*.txt"), str(tmpdir))
+        assert local.ls(str(tmpdir), recursive=True) == ["bar.txt", "fizz/buzz.txt"]
+
+        with pytest.raises(ValueError):
+            local.cp(os.path.join(sample_dir, "foo", "*.txt"), str(tmpdir), overwrite=False)
+
+        local.rm(os.path.join(str(tmpdir), "f*"))
+        assert local.ls(str(tmpdir), recursive=True) == ["bar.txt"]
+
+    def test_literal_names(self, tmpdir):
+        tmpdir.join("report[1].csv").write("abc")
+        tmpdir.join("report1.csv").write("abcdef")
+        literal = os.path.join(str(tmpdir), "report[1].csv")
+
+        # An existing file is taken literally instead of as a pattern matching report1.csv
+        assert local.get_size(literal) == 3
+        assert local.ls(os.path.join(str(tmpdir), "report[[]?].csv")) == ["report[1].csv"]
+
+        local.rm(literal)
+        assert local.ls(str(tmpdir)) == ["report1.csv"]
+
+    def test_relative_pattern(self, tmpdir, monkeypatch):
+        src = tmpdir.mkdir("src")
+        src.join("a.csv").write("a")
+        src.mkdir("sub").join("b.csv").write("b")
+        dst = tmpdir.mkdir("dst")
+        monkeypatch.chdir(src)
+
+        # Rooted at the current directory rather than at "/"
+        assert local.ls("*.csv") == ["a.csv"]
+        assert local.ls("*/*.csv") == ["sub/b.csv"]
+
+        local.cp("*/*.csv", str(dst))
+        assert local.ls(str(dst), recursive=True) == ["sub/b.csv"]
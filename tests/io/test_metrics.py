@@ -0,0 +1,112 @@
+import logging
+
+import pytest
+
+from s3fs.core import S3FileSystem
+import boto3
+import moto
+
+from dna_util import io
+import dna_util.io._metrics as metrics
+
+test_bucket_name = "test-bucket"
+
+
+@pytest.yield_fixture
+def s3_fs():
+    try:
+        m = moto.mock_s3()
+        m.start()
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=test_bucket_name)
+        client.put_object(Bucket=test_bucket_name, Key="foo/bar.txt", Body="This is test file bar")
+
+        fs = S3FileSystem(anon=False)
+        # get_fs leaves filesystems passed to it alone
+        metrics.install(fs.s3)
+        yield fs
+    finally:
+        m.stop()
+
+
+@pytest.yield_fixture
+def sink():
+    sink = io.enable_metrics(io.PrometheusSink())
+    yield sink
+    io.disable_metrics()
+
+
+class TestMetrics(object):
+    def test_load_save_object(self, s3_fs, sink):
+        path = f"s3://{test_bucket_name}/tmp/obj.pkl"
+        obj = {"a": list(range(100))}
+
+        io.save_object(obj, path, overwrite=False, fs=s3_fs)
+        assert io.load_object(path, fs=s3_fs) == obj
+
+        stats = sink.snapshot()
+        saved = stats[("operation", "save_object", "s3", "pickle")]
+        loaded = stats[("operation", "load_object", "s3", "pickle")]
+        assert saved["count"] == loaded["count"] == 1
+        assert saved["bytes_out"] == loaded["bytes_in"] > 0
+        assert set(saved["phases"]) == set(loaded["phases"]) == {"serialize", "transfer"}
+        assert sum(loaded["buckets"]) == 1
+        # The existence check of save_object is attributed to save_object
+        assert not any(key[1] == "already_exists" for key in stats)
+        assert stats[("request", "PutObject", "s3", None)]["count"] == 1
+
+    def test_many(self, s3_fs, sink):
+        objs = {f"s3://{test_bucket_name}/many/{i}.pkl": list(range(i)) for i in range(5)}
+
+        io.save_many(objs, fs=s3_fs)
+        io.load_many(list(objs), fs=s3_fs)
+
+        stats = sink.snapshot()
+        saved = stats[("operation", "save_many", "s3", None)]
+        loaded = stats[("operation", "load_many", "s3", None)]
+        assert saved["count"] == loaded["count"] == 1
+        assert saved["bytes_out"] == loaded["bytes_in"] > 0
+        assert set(saved["phases"]) == {"serialize", "transfer"}
+        # The objects are only counted as part of save_many/load_many
+        assert not any(key[1] in ("save_object", "load_object") for key in stats)
+
+    def test_errors_and_local(self, tmpdir, sink):
+        path = str(tmpdir.join("data.json"))
+
+        io.save_object({"a": 1}, path)
+        with pytest.raises(ValueError):
+            io.save_object({"a": 1}, path, overwrite=False)
+
+        stats = sink.snapshot()[("operation", "save_object", "local", "json")]
+        assert stats["count"] == 2
+        assert stats["errors"] == 1
+        assert stats["bytes_out"] == len('{"a": 1}')
+
+    def test_cp_bytes(self, s3_fs, tmpdir, sink):
+        io.cp(f"s3://{test_bucket_name}/foo", str(tmpdir), fs=s3_fs)
+
+        assert sink.snapshot()[("operation", "cp", "s3", None)]["bytes_in"] == 21
+
+    def test_prometheus(self, s3_fs, sink):
+        io.ls(f"s3://{test_bucket_name}/foo", fs=s3_fs)
+        text = sink.render()
+
+        assert "# TYPE dna_util_io_seconds histogram" in text
+        assert 'dna_util_io_total{operation="ls",backend="s3",file_type=""} 1' in text
+        assert 'dna_util_io_seconds_bucket{operation="ls",backend="s3",file_type="",le="+Inf"} 1' in text
+        assert 'dna_util_s3_request_total{operation="ListObjectsV2"}' in text
+
+    def test_logging_sink(self, tmpdir, caplog):
+        sink = io.enable_metrics(io.LoggingSink())
+        try:
+            with caplog.at_level(logging.INFO, logger=metrics.__name__):
+                io.save_object(b"data", str(tmpdir.join("data.raw")), file_type="raw")
+        finally:
+            io.disable_metrics(sink)
+
+        assert any("save_object (local, raw) ok" in message for message in caplog.messages)
+
+    def test_disabled(self):
+        assert not metrics.enabled()
+        assert metrics.measure("load_object", "s3") is metrics._NULL
+        assert metrics.phase("serialize") is metrics._NULL
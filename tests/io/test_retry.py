@@ -0,0 +1,178 @@
+import pytest
+
+from s3fs.core import S3FileSystem
+import boto3
+import moto
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import (ClientError, EndpointConnectionError, NoCredentialsError,
+                                 ParamValidationError, ReadTimeoutError)
+
+import dna_util.io._s3 as s3
+import dna_util.io._retry as retry
+
+test_bucket_name = "test-bucket"
+
+
+@pytest.yield_fixture
+def s3_fs():
+    try:
+        m = moto.mock_s3()
+        m.start()
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=test_bucket_name)
+        client.put_object(Bucket=test_bucket_name, Key="foo/bar.txt", Body="This is test file bar")
+
+        fs = S3FileSystem(anon=False)
+        # get_fs leaves filesystems passed to it alone
+        retry.install(fs.s3)
+        yield fs
+    finally:
+        m.stop()
+
+
+@pytest.yield_fixture
+def policy():
+    # No delays so retries don't slow the tests down
+    policy = retry.RetryPolicy(base_delay=0)
+    retry.set_retry_policy(policy)
+    yield policy
+    retry.set_retry_policy()
+
+
+class _Raw(object):
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+class FaultInjector(object):
+    """ Fails the first num_faults requests of an operation with the given
+        status and error code before letting them through to moto
+    """
+    def __init__(self, client, operation, num_faults, status=503, code="SlowDown"):
+        self.num_faults = num_faults
+        self.status = status
+        self.code = code
+        self.calls = 0
+        self.events = client.meta.events
+        self.event_name = f"before-send.s3.{operation}"
+        self.events.register_first(self.event_name, self)
+
+    def remove(self):
+        self.events.unregister(self.event_name, self)
+
+    def __call__(self, request, **kwargs):
+        self.calls += 1
+        if self.calls > self.num_faults:
+            return None
+        body = (f"<?xml version='1.0' encoding='UTF-8'?><Error><Code>{self.code}</Code>"
+                f"<Message>Injected</Message></Error>").encode()
+        return AWSResponse(request.url, self.status, {}, _Raw(body))
+
+
+@pytest.yield_fixture
+def inject_faults(s3_fs):
+    # s3fs shares clients between instances, so injectors must not outlive the test
+    injectors = []
+
+    def _inject(operation, num_faults, **kwargs):
+        injectors.append(FaultInjector(s3_fs.s3, operation, num_faults, **kwargs))
+        return injectors[-1]
+
+    yield _inject
+    for injector in injectors:
+        injector.remove()
+
+
+class TestRetryPolicy(object):
+    def test_retries_throttling(self, s3_fs, policy, inject_faults):
+        faults = inject_faults("HeadObject", 3)
+
+        response = s3_fs.s3.head_object(Bucket=test_bucket_name, Key="foo/bar.txt")
+
+        assert response["ContentLength"] == 21
+        assert faults.calls == 4
+        stats = retry.retry_stats()
+        assert stats["throttle_retries"] == 3
+        assert stats["throttles"] == 3
+        assert stats["rate_limit"] is not None
+
+    def test_attempts_per_error_class(self, s3_fs, inject_faults):
+        retry.set_retry_policy(retry.RetryPolicy(max_attempts={"server": 2}, base_delay=0))
+        try:
+            faults = inject_faults("GetObject", 10, status=500, code="InternalError")
+            with pytest.raises(ClientError):
+                s3_fs.s3.get_object(Bucket=test_bucket_name, Key="foo/bar.txt")
+            assert faults.calls == 2
+            assert retry.retry_stats()["server_retries"] == 1
+            assert retry.retry_stats()["failures"] == 1
+        finally:
+            retry.set_retry_policy()
+
+    def test_no_retry_on_client_errors(self, s3_fs, policy):
+        with pytest.raises(ClientError):
+            s3_fs.s3.head_object(Bucket=test_bucket_name, Key="missing.txt")
+        assert sum(policy.retries.values()) == 0
+
+    def test_covers_io_functions(self, s3_fs, policy, inject_faults):
+        inject_faults("GetObject", 2)
+
+        with s3.load_object(f"s3://{test_bucket_name}/foo/bar.txt", fs=s3_fs) as f:
+            assert f.read() == b"This is test file bar"
+        assert policy.retries["throttle"] == 2
+
+    def test_install_idempotent(self, s3_fs, policy, inject_faults):
+        retry.install(s3_fs.s3)
+        inject_faults("HeadObject", 1)
+
+        s3_fs.s3.head_object(Bucket=test_bucket_name, Key="foo/bar.txt")
+        assert policy.retries["throttle"] == 1
+
+
+class TestTokenBucket(object):
+    def test_throttle_and_recover(self):
+        bucket = retry.TokenBucket(min_rate=5, max_rate=100)
+        assert bucket.rate is None
+
+        bucket.rate = 80
+        bucket.throttled()
+        assert bucket.rate == 40
+        for _ in range(10):
+            bucket.throttled()
+        assert bucket.rate == 5
+
+        while bucket.rate is not None:
+            bucket.succeeded()
+        assert bucket.throttles == 11
+
+    def test_acquire_waits(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(retry.time, "sleep", lambda seconds: sleeps.append(seconds))
+        bucket = retry.TokenBucket(min_rate=5)
+        bucket.rate = 5
+
+        monkeypatch.setattr(retry.time, "monotonic", lambda: 0.0)
+        bucket._last_refill = 0.0
+        bucket._tokens = 1.0
+        bucket.acquire()
+        assert sleeps == []
+
+        # The bucket is empty and refills at 5 tokens per second
+        clock = iter([0.0, 0.2])
+        monkeypatch.setattr(retry.time, "monotonic", lambda: next(clock))
+        bucket.acquire()
+        assert sleeps == [pytest.approx(0.2)]
+
+    def test_classify(self):
+        assert retry.classify(503, "SlowDown") == "throttle"
+        assert retry.classify(400, "Throttling") == "throttle"
+        assert retry.classify(500, "InternalError") == "server"
+        assert retry.classify(404, "NoSuchKey") is None
+        assert retry.classify(exception=EndpointConnectionError(endpoint_url="x")) == "connection"
+        assert retry.classify(exception=ReadTimeoutError(endpoint_url="x")) == "connection"
+        assert retry.classify(exception=ValueError()) is None
+        # Configuration mistakes aren't retried
+        assert retry.classify(exception=NoCredentialsError()) is None
+        assert retry.classify(exception=ParamValidationError(report="x")) is None
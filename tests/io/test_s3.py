@@ -1,4 +1,5 @@
 import os
+import re
 import pytest
 import json
 import pickle
@@ -8,6 +9,8 @@ import boto3
 import moto
 
 import dna_util.io._s3 as s3
+import dna_util.io._metadata as metadata
+import dna_util.io._disk_cache as disk_cache
 
 test_bucket_name = "test-bucket"
 files = {
@@ -81,6 +84,326 @@ def test_simple(s3_fs):
         assert out == data
 
 
+class TestGetFs(object):
+    def test_shared_instance(self, s3_fs):
+        s3.clear_fs_registry()
+        fs = s3.get_fs()
+        assert s3.get_fs() is fs
+        assert s3.get_fs(anon=True) is not fs
+
+    def test_passed_fs(self, s3_fs):
+        assert s3.get_fs(s3_fs) is s3_fs
+
+        # s3fs shares clients between instances with the same credentials
+        own_fs = S3FileSystem(key="own", secret="own")
+        assert s3.get_fs(own_fs) is own_fs
+        assert not getattr(own_fs.s3, "_dna_util_retry", False)
+        assert not getattr(own_fs.s3, "_dna_util_metrics", False)
+
+    def test_listings_survive_calls(self, s3_fs):
+        s3.clear_fs_registry()
+        fs = s3.get_fs()
+        fs.dirs["other-bucket/listed"] = []
+        assert s3.get_fs() is fs
+        assert "other-bucket/listed" in fs.dirs
+
+    def test_no_stale_sizes(self, s3_fs):
+        path = f"s3://{test_bucket_name}/foo/bar.txt"
+        assert s3.ls(f"s3://{test_bucket_name}/foo") == ["bar.txt", "fizz/"]
+        assert s3.already_exists(path)
+
+        # Rewritten by someone else: the listings above mustn't size the read
+        boto3.client("s3").put_object(Bucket=test_bucket_name, Key="foo/bar.txt", Body="A longer test file bar")
+        assert s3.load_object(path).read() == b"A longer test file bar"
+
+    def test_clear_registry(self, s3_fs):
+        fs = s3.get_fs()
+        s3.clear_fs_registry()
+        assert s3.get_fs() is not fs
+
+
+class TestExistsMany(object):
+    def test_exists_many(self, s3_fs):
+        client = boto3.client("s3")
+        for i in range(10):
+            client.put_object(Bucket=test_bucket_name, Key=f"many/file{i}.txt", Body="x")
+        paths = [f"s3://{test_bucket_name}/many/file{i}.txt" for i in range(0, 14, 2)]
+        paths += [
+            f"s3://{test_bucket_name}/foo/fizz",
+            f"s3://{test_bucket_name}/foo/bar.txt",
+            f"s3://{test_bucket_name}/foo/missing.txt",
+            f"s3://{test_bucket_name}",
+        ]
+
+        listings = []
+        s3_fs.s3.meta.events.register("before-send.s3.ListObjectsV2", lambda **kw: listings.append(1))
+        try:
+            exists = s3.exists_many(paths, s3_fs)
+        finally:
+            s3_fs.s3.meta.events.unregister("before-send.s3.ListObjectsV2")
+
+        assert list(exists) == paths
+        assert [exists[p] for p in paths[:7]] == [True] * 5 + [False] * 2
+        assert exists[f"s3://{test_bucket_name}/foo/fizz"]
+        assert exists[f"s3://{test_bucket_name}/foo/bar.txt"]
+        assert not exists[f"s3://{test_bucket_name}/foo/missing.txt"]
+        assert exists[f"s3://{test_bucket_name}"]
+        # One listing for each group of paths sharing a directory
+        assert len(listings) == 2
+
+    def test_sparse_keys_use_heads(self, s3_fs, monkeypatch):
+        client = boto3.client("s3")
+        for i in range(50):
+            client.put_object(Bucket=test_bucket_name, Key=f"sparse/file{i:02d}.txt", Body="x")
+        monkeypatch.setattr(s3, "EXISTS_LIST_PAGE_SIZE", 10)
+        checked = []
+        already_exists = s3.already_exists
+        monkeypatch.setattr(s3, "already_exists", lambda path, fs: checked.append(path) or already_exists(path, fs))
+
+        listings = []
+        # Ranged listings made by exists_many, not the full ones made by s3fs
+        handler = lambda params, **kw: "StartAfter" in params and listings.append(params["StartAfter"])
+        s3_fs.s3.meta.events.register("before-parameter-build.s3.ListObjectsV2", handler)
+        try:
+            # Far apart: the first page only answers two paths, the rest are checked individually
+            sparse = [f"s3://{test_bucket_name}/sparse/file{i:02d}.txt" for i in (0, 25, 49)]
+            missing = sparse[0] + ".missing"
+            assert s3.exists_many(sparse + [missing], s3_fs) == {**{path: True for path in sparse}, missing: False}
+            assert listings == ["sparse/file00.tx"]
+            assert sorted(checked) == sparse[1:]
+
+            # Close together: answered by listings alone, each starting at the next path
+            del listings[:], checked[:]
+            dense = [f"s3://{test_bucket_name}/sparse/file{i:02d}.txt" for i in range(20, 36)]
+            assert all(s3.exists_many(dense, s3_fs).values())
+            # file29.txt is answered by the second page, which could hold a "file29.txt/" prefix
+            assert listings == ["sparse/file20.tx", "sparse/file29.tx"]
+            assert checked == []
+        finally:
+            s3_fs.s3.meta.events.unregister("before-parameter-build.s3.ListObjectsV2", handler)
+
+    def test_cp_overwrite_check(self, s3_fs):
+        from_path = f"s3://{test_bucket_name}/foo"
+        to_path = f"s3://{test_bucket_name}/copy"
+        s3.cp(from_path, to_path, include_folder_name=False, fs=s3_fs)
+
+        with pytest.raises(ValueError):
+            s3.cp(from_path, to_path, overwrite=False, include_folder_name=False, fs=s3_fs)
+
+
+class TestS3Glob(object):
+    @pytest.fixture
+    def partitions(self, s3_fs):
+        client = boto3.client("s3")
+        for part in ["x/date=2026-10-01", "x/date=2026-10-02", "y/date=2026-09-30"]:
+            for i in range(2):
+                client.put_object(Bucket=test_bucket_name, Key=f"data/{part}/part-{i}.parquet", Body="abc")
+        return f"s3://{test_bucket_name}/data"
+
+    def test_ls_glob(self, s3_fs, partitions):
+        listings = []
+        s3_fs.s3.meta.events.register("before-send.s3.ListObjectsV2", lambda **kw: listings.append(kw))
+        try:
+            files = s3.ls(f"{partitions}/*/date=2026-10-*/part-*.parquet", fs=s3_fs)
+        finally:
+            s3_fs.s3.meta.events.unregister("before-send.s3.ListObjectsV2")
+
+        assert files == [f"x/date=2026-10-0{d}/part-{i}.parquet" for d in (1, 2) for i in range(2)]
+        # One listing per level per matching prefix, narrowed by the literal start, and
+        # one to check the pattern isn't the literal name of an object
+        assert len(listings) == 6
+        assert sum(bool(re.search("date%3D2026-10-(&|$)", listing["request"].url)) for listing in listings) == 2
+
+        assert s3.ls(f"{partitions}/*/date=2026-10-*", fs=s3_fs) == ["x/date=2026-10-01/", "x/date=2026-10-02/"]
+        assert s3.ls(f"{partitions}/y/*", recursive=True, full_path=True, fs=s3_fs) == [
+            f"{partitions}/y/date=2026-09-30/part-0.parquet", f"{partitions}/y/date=2026-09-30/part-1.parquet"
+        ]
+        assert s3.ls(f"{partitions}/**/part-1.parquet", fs=s3_fs) == [
+            "x/date=2026-10-01/part-1.parquet", "x/date=2026-10-02/part-1.parquet", "y/date=2026-09-30/part-1.parquet"
+        ]
+        assert s3.ls(f"{partitions}/z*/*", fs=s3_fs) == []
+
+    def test_literal_names(self, s3_fs, partitions):
+        client = boto3.client("s3")
+        client.put_object(Bucket=test_bucket_name, Key="data/x/report[1].csv", Body="abc")
+
+        # An existing key is taken literally instead of as a pattern
+        assert s3.get_size(f"{partitions}/x/report[1].csv", fs=s3_fs) == 3
+        # Escaped pattern characters match themselves
+        assert s3.ls(f"{partitions}/x/report[[]?].csv", fs=s3_fs) == ["report[1].csv"]
+
+        s3.rm(f"{partitions}/x/report[1].csv", fs=s3_fs)
+        assert s3.ls(f"{partitions}/x", recursive=True, fs=s3_fs) == [
+            f"date=2026-10-0{d}/part-{i}.parquet" for d in (1, 2) for i in range(2)
+        ]
+
+    def test_get_size_rm_glob(self, s3_fs, partitions):
+        assert s3.get_size(f"{partitions}/*/date=2026-10-*", fs=s3_fs) == 12
+
+        s3.rm(f"{partitions}/x/date=2026-10-0[2-9]", fs=s3_fs)
+        assert s3.ls(partitions, recursive=True, fs=s3_fs) == [
+            "x/date=2026-10-01/part-0.parquet", "x/date=2026-10-01/part-1.parquet",
+            "y/date=2026-09-30/part-0.parquet", "y/date=2026-09-30/part-1.parquet"
+        ]
+
+    def test_cp_glob(self, s3_fs, partitions, tmpdir):
+        s3.cp(f"{partitions}/*/date=2026-10-01/part-0.parquet", str(tmpdir), fs=s3_fs)
+        assert tmpdir.join("x", "date=2026-10-01", "part-0.parquet").read() == "abc"
+
+        to_path = f"s3://{test_bucket_name}/copy"
+        s3.cp(f"{partitions}/x/*", to_path, fs=s3_fs)
+        assert s3.ls(to_path, recursive=True, fs=s3_fs) == [
+            f"date=2026-10-0{d}/part-{i}.parquet" for d in (1, 2) for i in range(2)
+        ]
+        with pytest.raises(ValueError):
+            s3.cp(f"{partitions}/x/*", to_path, overwrite=False, fs=s3_fs)
+
+        s3.cp(os.path.join(str(tmpdir), "*"), f"s3://{test_bucket_name}/up", fs=s3_fs)
+        assert s3.ls(f"s3://{test_bucket_name}/up", recursive=True, fs=s3_fs) == ["x/date=2026-10-01/part-0.parquet"]
+
+        with pytest.raises(ValueError):
+            s3.cp(f"{partitions}/missing*", str(tmpdir), fs=s3_fs)
+
+
+class TestMetadataCache(object):
+    def test_repeated_checks_hit_cache(self, s3_fs):
+        metadata.enable_metadata_cache(ttl=60)
+        try:
+            path = f"s3://{test_bucket_name}/foo"
+            assert s3.already_exists(path, fs=s3_fs)
+            assert s3.already_exists(path, fs=s3_fs)
+            assert s3.is_dir(path, fs=s3_fs)
+            assert s3.is_dir(path, fs=s3_fs)
+
+            stats = metadata.metadata_cache_stats()
+            assert stats["hits"] == 2
+            assert stats["misses"] == 2
+        finally:
+            metadata.disable_metadata_cache()
+
+    def test_write_invalidates(self, s3_fs):
+        metadata.enable_metadata_cache(ttl=60)
+        try:
+            path = f"s3://{test_bucket_name}/cache/new.txt"
+            assert not s3.already_exists(path, fs=s3_fs)
+
+            s3.save_object("hello", path, fs=s3_fs)
+
+            assert s3.already_exists(path, fs=s3_fs)
+            assert metadata.metadata_cache_stats()["invalidations"] == 1
+        finally:
+            metadata.disable_metadata_cache()
+
+    def test_expired_entries(self):
+        cache = metadata.MetadataCache(ttl=0)
+        assert cache.get_or_fetch("exists", "bucket/key", lambda: True)
+        assert not cache.get_or_fetch("exists", "bucket/key", lambda: False)
+        assert cache.stats()["hits"] == 0
+
+    def test_fetch_overlapping_invalidate_not_stored(self):
+        cache = metadata.MetadataCache(ttl=60)
+
+        def fetch():
+            # A write to the parent lands while the request is in flight
+            cache.invalidate("bucket")
+            return False
+
+        assert not cache.get_or_fetch("exists", "bucket/key", fetch)
+        assert cache.get_or_fetch("exists", "bucket/key", lambda: True)
+        assert cache.get_or_fetch("exists", "bucket/key", lambda: False)
+        assert cache.stats()["hits"] == 1
+
+
+class TestDiskCache(object):
+    def test_load_object_hits_cache(self, s3_fs, tmpdir):
+        disk_cache.enable_disk_cache(str(tmpdir))
+        try:
+            path = f"s3://{test_bucket_name}/foo/bar.txt"
+            assert s3.load_object(path, fs=s3_fs).read() == b"This is test file bar"
+            assert s3.load_object(path, fs=s3_fs).read() == b"This is test file bar"
+
+            stats = disk_cache.disk_cache_stats()
+            assert (stats["hits"], stats["misses"]) == (1, 1)
+            assert stats["bytes_hit"] == stats["bytes_downloaded"] == stats["bytes"] == 21
+
+            # A changed object has a new ETag
+            s3_fs.s3.put_object(Bucket=test_bucket_name, Key="foo/bar.txt", Body=b"changed")
+            assert s3.load_object(path, fs=s3_fs).read() == b"changed"
+            assert disk_cache.disk_cache_stats()["misses"] == 2
+        finally:
+            disk_cache.disable_disk_cache()
+
+    def test_ttl_and_invalidation(self, s3_fs, tmpdir):
+        disk_cache.enable_disk_cache(str(tmpdir), ttl=60)
+        try:
+            path = f"s3://{test_bucket_name}/foo/bar.txt"
+            s3.load_object(path, fs=s3_fs).close()
+
+            # Changes made elsewhere aren't seen until the ttl expires...
+            s3_fs.s3.put_object(Bucket=test_bucket_name, Key="foo/bar.txt", Body=b"changed")
+            assert s3.load_object(path, fs=s3_fs).read() == b"This is test file bar"
+
+            # ...but writes through dna_util invalidate the ETag
+            s3.save_object("saved", path, fs=s3_fs)
+            assert s3.load_object(path, fs=s3_fs).read() == b"saved"
+        finally:
+            disk_cache.disable_disk_cache()
+
+    def test_prefix_invalidation(self, s3_fs, tmpdir):
+        disk_cache.enable_disk_cache(str(tmpdir), ttl=60)
+        try:
+            paths = [f"s3://{test_bucket_name}/foo/bar.txt", f"s3://{test_bucket_name}/foo/fizz/buzz.txt"]
+            for path in paths:
+                s3.load_object(path, fs=s3_fs).close()
+                s3_fs.s3.put_object(Bucket=test_bucket_name, Key=path.split("/", 3)[3], Body=b"changed")
+
+            disk_cache.invalidate(f"{test_bucket_name}/foo/")
+            for path in paths:
+                assert s3.load_object(path, fs=s3_fs).read() == b"changed"
+        finally:
+            disk_cache.disable_disk_cache()
+
+    def test_eviction_scans_only_over_limit(self, s3_fs, tmpdir, monkeypatch):
+        disk_cache.enable_disk_cache(str(tmpdir), max_bytes=30)
+        try:
+            cache = disk_cache.get_cache()
+            scans = []
+            scan = cache._scan
+            monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+
+            s3.load_object(f"s3://{test_bucket_name}/foo/bar.txt", fs=s3_fs).close()
+            assert scans == []
+            s3.load_object(f"s3://{test_bucket_name}/foo/fizz/buzz.txt", fs=s3_fs).close()
+            assert scans == [1]
+            assert cache._total_bytes == 22
+        finally:
+            disk_cache.disable_disk_cache()
+
+    def test_eviction(self, s3_fs, tmpdir):
+        disk_cache.enable_disk_cache(str(tmpdir), max_bytes=30)
+        try:
+            s3.load_object(f"s3://{test_bucket_name}/foo/bar.txt", fs=s3_fs).close()
+            s3.load_object(f"s3://{test_bucket_name}/foo/fizz/buzz.txt", fs=s3_fs).close()
+
+            stats = disk_cache.disk_cache_stats()
+            assert stats["evictions"] == 1
+            assert (stats["entries"], stats["bytes"]) == (1, 22)
+        finally:
+            disk_cache.disable_disk_cache()
+
+    def test_cp_through_cache(self, s3_fs, tmpdir):
+        disk_cache.enable_disk_cache(str(tmpdir.join("cache")))
+        try:
+            for i in range(2):
+                s3.cp(f"s3://{test_bucket_name}/foo", str(tmpdir.join(f"copy{i}")), fs=s3_fs)
+                assert tmpdir.join(f"copy{i}", "foo", "fizz", "buzz.txt").read() == "This is test file buzz"
+
+            stats = disk_cache.disk_cache_stats()
+            assert (stats["hits"], stats["misses"]) == (2, 2)
+        finally:
+            disk_cache.disable_disk_cache()
+
+
 class TestS3IsDir(object):
     def test_is_dir(self, s3_fs):
         
@@ -183,6 +506,22 @@ class TestS3Cp(object):
 
         assert s3_fs.cat(bar_path) == b"This is test file bar"
 
+    def test_s3_s3_cp_multipart(self, s3_fs):
+        data = os.urandom(11 * 2 ** 20)
+        with s3_fs.open(f"{test_bucket_name}/large/data.bin", "wb") as f:
+            f.write(data)
+
+        from_path = f"s3://{test_bucket_name}/large"
+        to_path = f"s3://{test_bucket_name}/large_copy"
+
+        s3.cp(from_path + "/data.bin", to_path + "/data.bin", fs=s3_fs,
+              part_size=5 * 2 ** 20, multipart_threshold=5 * 2 ** 20)
+        assert s3_fs.cat(to_path + "/data.bin") == data
+
+        s3.cp(from_path, to_path, fs=s3_fs,
+              part_size=5 * 2 ** 20, multipart_threshold=5 * 2 ** 20)
+        assert s3_fs.cat(to_path + "/large/data.bin") == data
+
     def test_s3_local_cp_file(self, s3_fs, tmpdir):
         from_path = f"s3://{test_bucket_name}/foo/bar.txt"
         to_path = tmpdir.join("foobar.txt")
@@ -211,6 +550,64 @@ class TestS3Cp(object):
         assert bar_path.read() == "This is test file bar"
         assert buzz_path.read() == "This is test file buzz"
 
+    def test_s3_local_cp_dir_progress(self, s3_fs, tmpdir):
+        from_path = f"s3://{test_bucket_name}/foo"
+        calls = []
+
+        s3.cp(from_path, tmpdir, fs=s3_fs, progress=lambda *args: calls.append(args))
+
+        assert calls[-1] == (2, 2, 43)
+
+
+class TestCpMany(object):
+    def test_mixed_directions(self, s3_fs, tmpdir):
+        local_file = tmpdir.join("local.txt")
+        local_file.write("This is a local file")
+        pairs = [
+            (f"s3://{test_bucket_name}/foo/bar.txt", f"s3://{test_bucket_name}/copies/bar.txt"),
+            (f"s3://{test_bucket_name}/foo/fizz/buzz.txt", str(tmpdir.join("a/b/buzz.txt"))),
+            (str(local_file), f"s3://{test_bucket_name}/copies/local.txt"),
+            (str(local_file), str(tmpdir.join("c/local.txt"))),
+            (f"s3://{test_bucket_name}/foo/missing.txt", str(tmpdir.join("missing.txt"))),
+        ]
+        calls = []
+
+        statuses = s3.cp_many(pairs, fs=s3_fs, progress=lambda *args: calls.append(args))
+
+        assert [(status.src, status.dst) for status in statuses] == pairs
+        assert [status.size for status in statuses] == [21, 22, 20, 20, None]
+        assert all(status.error is None for status in statuses[:4])
+        assert isinstance(statuses[4].error, FileNotFoundError)
+        assert s3_fs.cat(f"{test_bucket_name}/copies/bar.txt") == b"This is test file bar"
+        assert s3_fs.cat(f"{test_bucket_name}/copies/local.txt") == b"This is a local file"
+        assert tmpdir.join("a/b/buzz.txt").read() == "This is test file buzz"
+        assert tmpdir.join("c/local.txt").read() == "This is a local file"
+        assert calls[-1][:2] == (5, 5)
+
+    def test_no_overwrite(self, s3_fs):
+        pairs = [
+            (f"s3://{test_bucket_name}/foo/bar.txt", f"s3://{test_bucket_name}/foo/fizz/buzz.txt"),
+            (f"s3://{test_bucket_name}/foo/bar.txt", f"s3://{test_bucket_name}/foo/new.txt"),
+        ]
+
+        statuses = s3.cp_many(pairs, overwrite=False, fs=s3_fs)
+
+        assert isinstance(statuses[0].error, ValueError)
+        assert statuses[1].error is None
+        assert s3_fs.cat(f"{test_bucket_name}/foo/fizz/buzz.txt") == b"This is test file buzz"
+        assert s3_fs.cat(f"{test_bucket_name}/foo/new.txt") == b"This is test file bar"
+
+    def test_multipart(self, s3_fs):
+        data = os.urandom(6 * 2 ** 20)
+        with s3_fs.open(f"{test_bucket_name}/large/data.bin", "wb") as f:
+            f.write(data)
+
+        statuses = s3.cp_many([(f"s3://{test_bucket_name}/large/data.bin", f"s3://{test_bucket_name}/large/copy.bin")],
+                              fs=s3_fs, part_size=5 * 2 ** 20, multipart_threshold=5 * 2 ** 20)
+
+        assert statuses[0].error is None
+        assert s3_fs.cat(f"{test_bucket_name}/large/copy.bin") == data
+
 
 class TestS3Ls(object):
 
@@ -281,6 +678,27 @@ class TestS3Ls(object):
 
         assert s3.ls(path, full_path=True, fs=s3_fs) == expected_lst
 
+    def test_ls_sharded(self, s3_fs):
+        keys = [f"hive/date=2020-01-{d:02d}/part-{p}.csv" for d in range(1, 31) for p in range(3)]
+        keys += ["hive/a.txt", "hive/date=2020-01-01.txt", "hive/date=2020-01-02/sub/x.csv"]
+        for key in keys:
+            s3_fs.s3.put_object(Bucket=test_bucket_name, Key=key, Body=b"x")
+        s3_fs.s3.put_object(Bucket=test_bucket_name, Key="hive/date=2020-01-03/", Body=b"")
+
+        path = f"s3://{test_bucket_name}/hive"
+        expected = sorted(key[len("hive/"):] for key in keys)
+
+        assert s3.ls(path, recursive=True, fs=s3_fs) == expected
+        # Few threads expand a second level of sub-prefixes
+        for num_threads in (4, 64):
+            listed = [obj["Key"] for obj in s3._iter_objects(path, s3_fs, num_threads=num_threads)]
+            assert listed == sorted(keys)
+            listed = [obj["Key"] for obj in s3._iter_objects(path, s3_fs, directories=True,
+                                                                num_threads=num_threads)]
+            assert listed == sorted(keys + ["hive/date=2020-01-03/"])
+
+        assert s3.get_size(path, fs=s3_fs) == len(keys)
+
 
 class TestS3Rm(object):
     def test_rm_file_dry_run(self, s3_fs, capfd):
@@ -301,6 +719,33 @@ class TestS3Rm(object):
 
         assert out == f"Deleting 's3://{test_bucket_name}/foo' would remove 2 file(s)\n"
 
+    def test_rm_file(self, s3_fs):
+        path = f"s3://{test_bucket_name}/foo/bar.txt"
+
+        s3.rm(path, fs=s3_fs)
+
+        assert not s3.already_exists(path, fs=s3_fs)
+        assert s3.already_exists(f"s3://{test_bucket_name}/foo/fizz/buzz.txt", fs=s3_fs)
+
+    def test_rm_dir_batches(self, s3_fs, monkeypatch):
+        path = f"s3://{test_bucket_name}/foo"
+        monkeypatch.setattr(s3, "DELETE_BATCH_SIZE", 1)
+
+        s3.rm(path, fs=s3_fs)
+
+        assert not s3.already_exists(path, fs=s3_fs)
+
+    def test_rm_reports_failed_keys(self, s3_fs, monkeypatch):
+        path = f"s3://{test_bucket_name}/foo"
+
+        def fail(Bucket, Delete, **kwargs):
+            return {"Errors": [{"Key": obj["Key"], "Code": "AccessDenied"} for obj in Delete["Objects"]]}
+
+        monkeypatch.setattr(s3_fs.s3, "delete_objects", fail)
+
+        with pytest.raises(IOError, match="Failed to delete 2 of 2"):
+            s3.rm(path, fs=s3_fs)
+
 
 class TestSaveObject(object):
     def test_save_dict(self, s3_fs):
@@ -327,7 +772,42 @@ class TestSaveObject(object):
 
         assert d == new_d
 
+    def test_save_multipart(self, s3_fs):
+        path = f"s3://{test_bucket_name}/save_object/large.bin"
+        obj = os.urandom(11 * 2 ** 20)
+
+        s3.save_object(obj, path, fs=s3_fs, part_size=5 * 2 ** 20,
+                       multipart_threshold=5 * 2 ** 20, num_threads=3)
+
+        assert s3_fs.cat(path) == obj
+
+    def test_save_multipart_text(self, s3_fs):
+        path = f"s3://{test_bucket_name}/save_object/large.txt"
+        # 3MB of characters, but 6MB once encoded
+        obj = "\u00e9" * (3 * 2 ** 20)
+
+        s3.save_object(obj, path, fs=s3_fs, part_size=5 * 2 ** 20,
+                       multipart_threshold=5 * 2 ** 20)
 
+        assert s3_fs.cat(path) == obj.encode()
+        head = s3_fs.s3.head_object(Bucket=test_bucket_name, Key="save_object/large.txt")
+        assert head["ETag"].strip('"').endswith("-2")
+
+    def test_save_multipart_aborts_on_failure(self, s3_fs, monkeypatch):
+        path = f"s3://{test_bucket_name}/save_object/failed.bin"
+
+        def fail(**kwargs):
+            raise IOError("connection reset")
+
+        monkeypatch.setattr(s3_fs.s3, "upload_part", fail)
+
+        with pytest.raises(IOError):
+            s3.save_object(b"a" * 2 ** 20, path, fs=s3_fs, part_size=5 * 2 ** 20,
+                           multipart_threshold=2 ** 20)
+
+        uploads = s3_fs.s3.list_multipart_uploads(Bucket=test_bucket_name)
+        assert not uploads.get("Uploads")
+        assert not s3.already_exists(path, fs=s3_fs)
 
 
 class TestLoadObject(object):
@@ -361,4 +841,17 @@ class TestS3GetSize(object):
 
     def test_get_size_dir(self, s3_fs):
         path = f"s3://{test_bucket_name}/foo"
-        assert s3.get_size(path, fs=s3_fs) == 43
\ No newline at end of file
+        assert s3.get_size(path, fs=s3_fs) == 43
+
+    def test_get_size_root_dir(self, s3_fs):
+        path = f"s3://{test_bucket_name}/foo/fizz/"
+        assert s3.get_size(path, fs=s3_fs) == 22
+
+    def test_du(self, s3_fs):
+        path = f"s3://{test_bucket_name}/foo"
+        assert s3.du(path, fs=s3_fs) == {"bar.txt": 21, "fizz/": 22}
+        assert s3.du(path, depth=2, fs=s3_fs) == {"bar.txt": 21, "fizz/buzz.txt": 22}
+
+    def test_du_file(self, s3_fs):
+        path = f"s3://{test_bucket_name}/foo/bar.txt"
+        assert s3.du(path, fs=s3_fs) == {"bar.txt": 21}
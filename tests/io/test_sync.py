@@ -0,0 +1,104 @@
+import pytest
+
+from s3fs.core import S3FileSystem
+import boto3
+import moto
+
+from dna_util import io
+
+test_bucket_name = "test-bucket"
+files = {
+    "foo/bar.txt": "This is test file bar",
+    "foo/fizz/buzz.txt": "This is test file buzz"
+}
+
+
+@pytest.yield_fixture
+def s3_fs():
+    # writable local S3 system
+    try:
+        m = moto.mock_s3()
+        m.start()
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=test_bucket_name, ACL="public-read")
+
+        for f, data in files.items():
+            client.put_object(Bucket=test_bucket_name, Key=f, Body=data)
+
+        yield S3FileSystem(anon=False)
+    finally:
+        m.stop()
+
+
+@pytest.fixture
+def sample_dir(tmpdir):
+    foo_dir = tmpdir.mkdir("foo")
+    foo_dir.join("bar.txt").write("This is test file bar")
+    foo_dir.mkdir("fizz").join("buzz.txt").write("This is test file buzz")
+    return foo_dir
+
+
+class TestSync(object):
+    def test_local_s3_sync(self, sample_dir, s3_fs):
+        to_path = f"s3://{test_bucket_name}/sync"
+
+        summary = io.sync(str(sample_dir), to_path, fs=s3_fs)
+        assert summary["files_copied"] == 2
+        assert s3_fs.cat(f"{to_path}/fizz/buzz.txt") == b"This is test file buzz"
+
+        summary = io.sync(str(sample_dir), to_path, fs=s3_fs)
+        assert summary["files_copied"] == 0
+        assert summary["files_skipped"] == 2
+        assert summary["bytes_skipped"] == 43
+
+        sample_dir.join("bar.txt").write("This is changed file bar")
+        summary = io.sync(str(sample_dir), to_path, fs=s3_fs)
+        assert summary["files_copied"] == 1
+        assert s3_fs.cat(f"{to_path}/bar.txt") == b"This is changed file bar"
+
+    def test_s3_local_sync_etag(self, s3_fs, tmpdir):
+        from_path = f"s3://{test_bucket_name}/foo"
+
+        io.sync(from_path, str(tmpdir), fs=s3_fs)
+        assert tmpdir.join("fizz/buzz.txt").read() == "This is test file buzz"
+
+        # Same size but different content is only detected by the etag
+        tmpdir.join("bar.txt").write("This is test file BAR")
+        assert io.sync(from_path, str(tmpdir), fs=s3_fs)["files_copied"] == 0
+        assert io.sync(from_path, str(tmpdir), compare="etag", fs=s3_fs)["files_copied"] == 1
+        assert tmpdir.join("bar.txt").read() == "This is test file bar"
+
+    def test_s3_s3_sync_delete(self, s3_fs):
+        from_path = f"s3://{test_bucket_name}/foo"
+        to_path = f"s3://{test_bucket_name}/sync2"
+        s3_fs.touch(f"{test_bucket_name}/sync2/extra.txt")
+
+        summary = io.sync(from_path, to_path, delete=True, fs=s3_fs)
+
+        assert summary["files_copied"] == 2
+        assert summary["files_deleted"] == 1
+        assert io.ls(to_path, recursive=True, fs=s3_fs) == ["bar.txt", "fizz/buzz.txt"]
+
+    def test_s3_s3_sync_multipart(self, s3_fs):
+        data = b"x" * (11 * 2 ** 20)
+        s3_fs.s3.put_object(Bucket=test_bucket_name, Key="large/data.bin", Body=data)
+
+        summary = io.sync(f"s3://{test_bucket_name}/large", f"s3://{test_bucket_name}/large-copy", fs=s3_fs,
+                          part_size=5 * 2 ** 20, multipart_threshold=5 * 2 ** 20)
+
+        assert summary["files_copied"] == 1
+        head = s3_fs.s3.head_object(Bucket=test_bucket_name, Key="large-copy/data.bin")
+        assert head["ContentLength"] == len(data)
+        # Copied in parts rather than with a single CopyObject
+        assert head["ETag"].strip('"').endswith("-3")
+
+    def test_local_local_sync(self, sample_dir, tmpdir):
+        to_path = tmpdir.join("copy")
+
+        assert io.sync(str(sample_dir), str(to_path))["files_copied"] == 2
+        assert io.sync(str(sample_dir), str(to_path), compare="mtime")["files_copied"] == 0
+        assert to_path.join("fizz", "buzz.txt").read() == "This is test file buzz"
+
+    def test_invalid_compare(self, sample_dir, tmpdir):
+        with pytest.raises(ValueError):
+            io.sync(str(sample_dir), str(tmpdir), compare="hash")
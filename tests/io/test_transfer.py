@@ -0,0 +1,98 @@
+import pytest
+
+from botocore.exceptions import ClientError
+
+import dna_util.io._transfer as transfer
+import dna_util.io._retry as retry
+
+
+def throttle_error():
+    return ClientError({"Error": {"Code": "SlowDown", "Message": "Please reduce your request rate"},
+                        "ResponseMetadata": {"HTTPStatusCode": 503}}, "CopyObject")
+
+
+class TestRunTransfers(object):
+    def test_results_and_progress(self):
+        calls = []
+        transfers = [transfer.Transfer(f"file{i}", lambda x: x * 2, (i,), 10) for i in range(20)]
+
+        results = transfer.run_transfers(transfers, max_workers=8,
+                                         progress=lambda *args: calls.append(args))
+
+        assert results == [i * 2 for i in range(20)]
+        assert len(calls) == 20
+        assert calls[-1] == (20, 20, 200)
+
+    def test_retry_throttled(self, monkeypatch):
+        monkeypatch.setattr(transfer.time, "sleep", lambda _: None)
+        policy = retry.RetryPolicy(max_attempts={"throttle": 3})
+        monkeypatch.setattr(retry, "_policy", policy)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                try:
+                    raise throttle_error()
+                except ClientError as e:
+                    # s3fs wraps botocore errors
+                    raise IOError("Copy failed") from e
+            return "ok"
+
+        # Requests are retried by the clients' policy, so transfers aren't rerun by default
+        with pytest.raises(transfer.TransferError):
+            transfer.run_transfers([transfer.Transfer("a", flaky, (), 1)])
+        assert len(attempts) == 1
+
+        assert transfer.run_transfers([transfer.Transfer("a", flaky, (), 1)], retries=5) == ["ok"]
+        assert len(attempts) == 3
+        assert policy.retries["throttle"] == 1
+
+        # The policy's attempt limit bounds retries
+        calls = []
+
+        def throttled():
+            calls.append(1)
+            raise throttle_error()
+
+        with pytest.raises(transfer.TransferError):
+            transfer.run_transfers([transfer.Transfer("b", throttled, (), 1)], retries=5)
+        assert len(calls) == 3
+
+    def test_errors_collected(self, monkeypatch):
+        monkeypatch.setattr(transfer.time, "sleep", lambda _: None)
+        attempts = []
+
+        def fail(name):
+            attempts.append(name)
+            raise ValueError(name)
+
+        transfers = [transfer.Transfer("good", lambda: 1, (), 1),
+                     transfer.Transfer("bad", fail, ("bad",), 1)]
+
+        with pytest.raises(transfer.TransferError) as exc_info:
+            transfer.run_transfers(transfers)
+
+        assert list(exc_info.value.errors) == ["bad"]
+        # Non-transient errors aren't retried
+        assert attempts == ["bad"]
+
+    def test_throttle_reduces_concurrency(self):
+        limiter = transfer.AdaptiveLimiter(max_workers=64, min_workers=4)
+        limiter.limit = 32
+
+        limiter.throttled()
+        assert limiter.limit == 16
+
+        for _ in range(10):
+            limiter.throttled()
+        assert limiter.limit == 4
+
+    def test_transient_errors(self):
+        assert retry.is_throttle_error(throttle_error())
+        assert retry.is_transient_error(throttle_error())
+        assert not retry.is_transient_error(
+            ClientError({"Error": {"Code": "NoSuchKey"}, "ResponseMetadata": {"HTTPStatusCode": 404}},
+                        "GetObject")
+        )
+        assert not retry.is_transient_error(ValueError())